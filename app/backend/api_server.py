@@ -1,80 +1,268 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, g, jsonify, redirect, request
 from flask_cors import CORS
-from multiprocessing import Process, Value, freeze_support, Manager
-from pip_window import start_pip_window
-from muse_streaming import start_muse_inference
+from multiprocessing import freeze_support
+from config_loader import load_config
+from focus_history import FocusHistory
+from metrics import REGISTRY
+from pip_renderer import PipRenderer
+from push_stream import FocusStreamServer
+from shared_state import ResultSnapshot
+import sys
 import threading
+import time
+import uuid
 
 app = Flask(__name__)
 CORS(app)
 
-pip_process = None
-should_stop = Value('b', False)
 
-# Shared state (only used within main process + muse thread)
-manager = Manager()
-latest_focus_data = manager.dict({
+# Latest result: each one is published as a whole, so readers never see a
+# half-updated one. Replaced by a SharedMemorySnapshot in production mode,
+# where inference runs in its own process
+latest_focus_data = ResultSnapshot({
     "class_label": None,
     "probabilities": {},
     "reg_output": [0.4, 0.3, 0.2, 0.1],
     "timestamp": None
 })
 
+# ETags are "<prefix>-<snapshot version>"; the prefix keeps tags from an
+# earlier server run (whose versions also started at 0) from matching
+etag_prefix = uuid.uuid4().hex[:8]
+
+# Pushes every new result to subscribers (SSE on its own port, see
+# push_stream.py); set up from cfg.server by start_focus_stream()
+focus_stream = None
+
+# Floating PiP window: one process, started on the first /start_pip (or with
+# the server, see server.pip_prespawn), then only shown and hidden. It reads
+# the push stream (stream_url is set by start_focus_stream)
+pip_renderer = PipRenderer(
+    window_title="Focus Graph",
+    update_interval=250,  # One result per hop
+    max_points=120,  # Last 30 s
+)
+
+# Fixed-memory history of results for graphs, per device (None = single headset)
+focus_history = {}
+
+# Set in production mode; its process exports the streaming pipeline metrics
+inference_supervisor = None
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "api_request_duration_seconds", "Time to handle an API request", ["endpoint"]
+)
+REQUESTS = REGISTRY.counter(
+    "api_requests_total", "API requests by endpoint and status", ["endpoint", "status"]
+)
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    endpoint = request.endpoint or "unmatched"
+    start = g.get("request_start")
+    if start is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+    REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    return response
+
+
+def on_result(snapshot):
+    """Called with every published result by the inference thread (debug mode)"""
+    on_results([snapshot])
+
+
+def on_results(snapshots):
+    """
+    Batch of published results (the supervisor's, in production): one history
+    write per device, and only each device's newest result goes to the push
+    stream, which only ever sends subscribers the latest one per device
+    """
+    latest = {}
+    for snapshot in snapshots:
+        latest.setdefault(snapshot.get("device"), []).append(snapshot)
+    for device, device_snapshots in latest.items():
+        if device not in focus_history:
+            focus_history[device] = FocusHistory(list(device_snapshots[0]["probabilities"]))
+        focus_history[device].extend(device_snapshots)
+        if focus_stream is not None:
+            focus_stream.publish(device_snapshots[-1])
+
+
 @app.route("/focus_data", methods=["GET"])
 def get_focus_data():
-    """Frontend polls this endpoint to get latest focus level"""
-    return jsonify(dict(latest_focus_data))
-
-
-def run_pip_window():
-    """Launch floating PiP window (polls HTTP for live data)"""
-    start_pip_window(
-        window_title="Focus Graph",
-        update_interval=1000,
-        max_points=20,
-        stop_flag=should_stop,
-        api_url="http://127.0.0.1:5001/focus_data"
-    )
+    """
+    Latest focus level snapshot (polling; see focus_stream for push updates).
+    Serves the JSON encoded at publish time, with an ETag so clients polling
+    faster than results arrive get a bodiless 304.
+    """
+    version, payload = latest_focus_data.read_bytes()
+    etag = f"{etag_prefix}-{version}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(payload, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"  # Always revalidate
+    return response
+
+
+@app.route("/focus_stream", methods=["GET"])
+def get_focus_stream():
+    """Push updates: redirects EventSource clients to the SSE stream"""
+    if focus_stream is None:
+        return {"error": "push stream not running"}, 503
+    host = request.host.rsplit(":", 1)[0]
+    return redirect(f"http://{host}:{focus_stream.port}{focus_stream.path}", code=307)
+
+
+@app.route("/focus_history", methods=["GET"])
+def get_focus_history():
+    """
+    Downsampled history: ?from=&to= (unix seconds, default: everything),
+    &buckets= (default 300) and &device= when running several headsets
+    """
+    start = request.args.get("from", type=float)
+    stop = request.args.get("to", type=float)
+    buckets = min(request.args.get("buckets", default=300, type=int), 10_000)
+
+    history = focus_history.get(request.args.get("device"))
+    if history is None:
+        return {"from": start, "to": stop, "points": 0, "timestamp": [], "count": []}
+    return jsonify(history.query(start, stop, buckets))
+
+
+@app.route("/focus_data/<device>", methods=["GET"])
+def get_device_focus_data(device):
+    """Latest result of one headset when running several (muse.devices)"""
+    data = latest_focus_data.get(device)
+    if data is None:
+        return {"error": f"unknown device {device}"}, 404
+    return jsonify(data)
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Prometheus text format: API metrics + streaming pipeline metrics"""
+    text = REGISTRY.render()
+    if inference_supervisor is not None:
+        text += inference_supervisor.metrics_text()
+    return Response(text, mimetype="text/plain; version=0.0.4")
 
 
 @app.route("/start_pip", methods=["POST"])
 def start_pip():
-    """Start the PIP visualization"""
-    global pip_process, should_stop
-    if pip_process and pip_process.is_alive():
+    """Show the PIP visualization (returns before the window is up)"""
+    if pip_renderer.visible:
         return {"status": "already running"}
-
-    should_stop.value = False
-    pip_process = Process(target=run_pip_window)
-    pip_process.start()
+    pip_renderer.show()
     return {"status": "started"}
 
 
 @app.route("/stop_pip", methods=["POST"])
 def stop_pip():
-    """Stop the PIP window cleanly"""
-    global pip_process, should_stop
-    if pip_process and pip_process.is_alive():
-        should_stop.value = True
-        pip_process.join(timeout=5)
-        if pip_process.is_alive():
-            pip_process.terminate()
-            pip_process.join()
-        pip_process = None
+    """Hide the PIP window; its process stays up for the next /start_pip"""
+    if pip_renderer.visible:
+        pip_renderer.hide()
         return {"status": "stopped"}
     return {"status": "no window running"}
 
 
-if __name__ == "__main__":
-    freeze_support()
+@app.route("/configure_pip", methods=["POST"])
+def configure_pip():
+    """JSON body with any of window_title, update_interval (ms), max_points"""
+    body = request.get_json(silent=True) or {}
+    options = {}
+    try:
+        if "window_title" in body:
+            options["window_title"] = str(body["window_title"])
+        for key, minimum in (("update_interval", 10), ("max_points", 2)):
+            if key in body:
+                options[key] = int(body[key])
+                if options[key] < minimum:
+                    raise ValueError(f"{key} must be at least {minimum}")
+    except (TypeError, ValueError) as e:
+        return {"error": str(e)}, 400
+    pip_renderer.configure(**options)
+    return {"status": "configured", "options": options}
+
+
+def run_inference(cfg):
+    """Inference thread of debug mode: torch/brainflow load here, not before the API is up"""
+    from muse_streaming import start_muse_inference
+
+    start_muse_inference(latest_focus_data, cfg=cfg, on_result=on_result)
+
+
+def start_focus_stream(cfg):
+    """Push stream on cfg.server.stream_host/stream_port, and the PiP window reading it"""
+    global focus_stream
+    host = cfg.server.get("stream_host") or cfg.server.host
+    focus_stream = FocusStreamServer(host=host, port=cfg.server.stream_port).start()
+
+    # The PiP runs on this machine: a wildcard bind is reached over loopback
+    local_host = "127.0.0.1" if host in ("0.0.0.0", "::", "") else host
+    pip_renderer.configure(stream_url=f"http://{local_host}:{focus_stream.port}{focus_stream.path}")
+    if cfg.server.get("pip_prespawn"):
+        pip_renderer.start()
 
-    # Start Muse inference thread
+
+def serve_debug(cfg):
+    """Flask dev server, inference in a thread of this process"""
+    start_focus_stream(cfg)
     inference_thread = threading.Thread(
-        target=start_muse_inference,
-        args=(latest_focus_data,),
+        target=run_inference,
+        args=(cfg,),
         daemon=True
     )
     inference_thread.start()
 
-    print("✅ Flask API running at http://127.0.0.1:5001")
-    app.run(port=5001, debug=True, use_reloader=False)
+    print(f"✅ Flask API running at http://{cfg.server.host}:{cfg.server.port}")
+    app.run(host=cfg.server.host, port=cfg.server.port, debug=True, use_reloader=False)
+
+
+def serve_production(cfg, overrides):
+    """
+    waitress serves the API from a thread pool while acquisition + inference
+    run in a supervised child process, so request latency doesn't depend on
+    how busy the model is. The child publishes each result into shared
+    memory (read lock-free by the routes) and forwards it to on_results here.
+    """
+    global latest_focus_data, inference_supervisor
+    from waitress import serve
+    from inference_process import InferenceSupervisor
+    from shared_state import SharedMemorySnapshot
+
+    start_focus_stream(cfg)
+    latest_focus_data = SharedMemorySnapshot(initial=latest_focus_data.read())
+    inference_supervisor = InferenceSupervisor(
+        latest_focus_data,
+        on_results=on_results,
+        overrides=overrides,
+        restart_delay=cfg.server.restart_delay,
+    ).start()
+
+    print(f"✅ API running at http://{cfg.server.host}:{cfg.server.port} (waitress, {cfg.server.threads} threads)")
+    try:
+        serve(app, host=cfg.server.host, port=cfg.server.port, threads=cfg.server.threads)
+    finally:
+        inference_supervisor.stop()
+        latest_focus_data.close()
+
+
+if __name__ == "__main__":
+    freeze_support()
+
+    # Hydra overrides, e.g. `python api_server.py server.mode=production`
+    overrides = sys.argv[1:]
+    cfg = load_config(overrides=overrides)
+
+    if cfg.server.mode == "production":
+        serve_production(cfg, overrides)
+    else:
+        serve_debug(cfg)
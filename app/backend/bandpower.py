@@ -0,0 +1,116 @@
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+# Same bands BrainFlow's DataFilter.get_avg_band_powers uses
+BANDS = (
+    ("Delta", 2.0, 4.0),
+    ("Theta", 4.0, 8.0),
+    ("Alpha", 8.0, 13.0),
+    ("Beta", 13.0, 30.0),
+    ("Gamma", 30.0, 45.0),
+)
+BAND_NAMES = [name for name, _, _ in BANDS]
+
+WELCH_OVERLAP = 0.8  # Fraction of nfft shared by consecutive Welch segments
+
+
+class WelchPlan(NamedTuple):
+    nfft: int
+    hop: int
+    window: np.ndarray  # (nfft,) periodic Hann
+    band_weights: np.ndarray  # (n_bins, n_bands) trapezoid weights per band
+
+
+def nearest_power_of_two(value: int) -> int:
+    lower = 1 << (int(value).bit_length() - 1)
+    upper = lower << 1
+    return lower if value - lower < upper - value else upper
+
+
+def welch_nfft(n_samples: int, sampling_rate: int) -> int:
+    """Segment length BrainFlow picks: largest power of two that fits, capped at ~2 s"""
+    largest_fit = 1 << (int(n_samples).bit_length() - 1)
+    return min(largest_fit, 2 * nearest_power_of_two(sampling_rate))
+
+
+@lru_cache(maxsize=None)
+def welch_plan(sampling_rate: int, nfft: int) -> WelchPlan:
+    """
+    Precomputes everything that only depends on (sampling_rate, nfft):
+    the Hann window and a bins → bands weight matrix, so band integration is a
+    single matmul instead of a masked trapezoid per band.
+    """
+    i = np.arange(nfft)
+    window = 0.5 - 0.5 * np.cos(2.0 * np.pi * i / nfft)
+
+    freqs = np.arange(nfft // 2 + 1) * sampling_rate / nfft
+    band_weights = np.zeros((len(freqs), len(BANDS)))
+    for b, (_, low, high) in enumerate(BANDS):
+        # BrainFlow integrates from the first bin >= low through the first bin > high
+        start = np.searchsorted(freqs, low, side="left")
+        stop = min(np.searchsorted(freqs, high, side="right"), len(freqs) - 1)
+        spacing = np.diff(freqs[start : stop + 1])
+        band_weights[start:stop, b] += spacing / 2
+        band_weights[start + 1 : stop + 1, b] += spacing / 2
+
+    return WelchPlan(nfft, nfft - int(nfft * WELCH_OVERLAP), window, band_weights)
+
+
+def band_power_dict(avgs) -> dict:
+    """{"Delta": ..., ..., "Gamma": ...} from one row of relative band powers"""
+    return {name: float(avgs[b]) for b, name in enumerate(BAND_NAMES)}
+
+
+class BandPowerEngine:
+    """
+    Batched Welch bandpower extraction (Delta–Gamma).
+
+    Produces the same relative band powers as DataFilter.get_avg_band_powers
+    with apply_filter=False, but for a whole stack of windows per call.
+    """
+
+    def __init__(self, sampling_rate: int):
+        self.sampling_rate = sampling_rate
+
+    @property
+    def min_samples(self) -> int:
+        """Shortest window whose Welch segment puts at least one bin in every band"""
+        nfft = 2
+        while not (welch_plan(self.sampling_rate, nfft).band_weights.sum(axis=0) > 0).all():
+            nfft *= 2
+        return nfft
+
+    def band_powers(self, windows: np.ndarray):
+        """
+        Args:
+            windows: (channels, samples) or (n_windows, channels, samples)
+
+        Returns:
+            (avgs, stds): arrays of shape (..., 5), one row per window.
+                avgs are relative powers averaged over channels; stds are the
+                channel spread divided by each band's mean, like BrainFlow.
+        """
+        windows = np.asarray(windows, dtype=np.float64)
+        plan = welch_plan(
+            self.sampling_rate, welch_nfft(windows.shape[-1], self.sampling_rate)
+        )
+        n_segments = (windows.shape[-1] - plan.nfft) // plan.hop + 1
+        idx = np.arange(n_segments)[:, None] * plan.hop + np.arange(plan.nfft)
+
+        # (..., channels, segments, nfft) → mean periodogram per channel
+        psd = self._periodogram(windows[..., idx], plan).mean(axis=-2)
+        return self._aggregate(psd @ plan.band_weights)
+
+    @staticmethod
+    def _periodogram(segments: np.ndarray, plan: WelchPlan) -> np.ndarray:
+        # Absolute PSD scaling is irrelevant: powers are normalized below
+        return np.abs(np.fft.rfft(segments * plan.window, axis=-1)) ** 2
+
+    @staticmethod
+    def _aggregate(powers: np.ndarray):
+        """(..., channels, bands) absolute powers → relative avgs/stds over channels"""
+        mean = powers.mean(axis=-2)
+        std = powers.std(axis=-2)
+        return mean / mean.sum(axis=-1, keepdims=True), std / mean
@@ -0,0 +1,65 @@
+import threading
+from collections import deque
+
+
+class DropOldestQueue:
+    """
+    Bounded thread-safe FIFO between pipeline stages.
+
+    put() never blocks: when the queue is full the oldest item is discarded,
+    so a slow consumer always picks up the freshest data instead of working
+    through a backlog. Once closed and drained, get() keeps returning None.
+    """
+
+    def __init__(self, maxsize: int = 1):
+        if maxsize <= 0:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+        self.maxsize = maxsize
+        self._items = deque()
+        self._cond = threading.Condition()
+        self.closed = False
+        self.put_count = 0  # Items ever offered
+        self.dropped = 0  # Items discarded to make room for newer ones
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+    def put(self, item):
+        """Append item, dropping the oldest one if the queue is full"""
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self.put_count += 1
+            self._cond.notify()
+
+    def get(self, timeout: float = None):
+        """Oldest item, or None on timeout / once closed and empty"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self.closed, timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        """No more items will be put; wakes up waiting consumers"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    @property
+    def drained(self) -> bool:
+        """Closed and nothing left to get"""
+        with self._cond:
+            return self.closed and not self._items
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "depth": len(self._items),
+                "maxsize": self.maxsize,
+                "put": self.put_count,
+                "dropped": self.dropped,
+            }
@@ -1,17 +1,18 @@
-from hydra import initialize, compose
-from omegaconf import OmegaConf
 from pathlib import Path
 import os
 
-def load_config(config_name="main_config.yaml"):
+def load_config(config_name="main_config.yaml", overrides=None):
+    from hydra import initialize, compose  # Only paid by processes that load a config
+
     # Detect true project root
     project_root = Path(__file__).resolve().parents[2]  # ✅ this points to project root
     config_dir = project_root / "configs"
 
-    rel_config_dir = os.path.relpath(config_dir, Path.cwd())
+    # Hydra resolves config_path relative to this module, not the working directory
+    rel_config_dir = os.path.relpath(config_dir, Path(__file__).resolve().parent)
 
     with initialize(config_path=rel_config_dir, version_base=None):
-        cfg = compose(config_name=Path(config_name).stem)
+        cfg = compose(config_name=Path(config_name).stem, overrides=list(overrides or []))
 
     # Normalize important paths to absolute
     if "inference" in cfg and "model_filepath" in cfg.inference:
@@ -19,6 +20,24 @@ def load_config(config_name="main_config.yaml"):
         if not model_path.is_absolute():
             cfg.inference.model_filepath = str((project_root / model_path).resolve())
 
+    if "inference" in cfg and cfg.inference.get("model_cache_dir"):
+        cache_path = Path(cfg.inference.model_cache_dir)
+        if not cache_path.is_absolute():
+            cfg.inference.model_cache_dir = str((project_root / cache_path).resolve())
+
+    if "muse" in cfg and cfg.muse.get("replay_file"):
+        replay_path = Path(cfg.muse.replay_file)
+        if not replay_path.is_absolute():
+            cfg.muse.replay_file = str((project_root / replay_path).resolve())
+
+    recording = cfg.get("muse", {}).get("recording")
+    if recording and recording.get("dir") and not Path(recording.dir).is_absolute():
+        recording.dir = str((project_root / recording.dir).resolve())
+
+    for device in cfg.get("muse", {}).get("devices") or []:
+        if device.get("replay_file") and not Path(device.replay_file).is_absolute():
+            device.replay_file = str((project_root / device.replay_file).resolve())
+
     if "training" in cfg and "data_dir" in cfg.training:
         data_path = Path(cfg.training.data_dir)
         if not data_path.is_absolute():
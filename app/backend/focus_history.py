@@ -0,0 +1,149 @@
+import threading
+
+import numpy as np
+
+from bandpower import BAND_NAMES
+from ring_buffer import RingBuffer
+
+# reg_output order (same as the training CSV columns)
+REG_NAMES = ["FO-NF", "FO-FA", "UF-NF", "UF-FA"]
+
+
+class FocusHistory:
+    """
+    Fixed-memory history of published results, queryable by time range.
+
+    Every result is stored as one column of a RingBuffer: timestamps in
+    float64, class probabilities / regression outputs / band powers in
+    float32. query() downsamples any time range to at most `buckets`
+    min/max/mean points with reduceat, so a day of results comes back as a
+    few hundred points without a Python loop over samples.
+    """
+
+    def __init__(self, labels, capacity: int = 24 * 3600 * 4):
+        """
+        Args:
+            labels: class labels, as in the "probabilities" dict of a result
+            capacity: results kept (default: one day at 4 results/s)
+        """
+        self.series = (
+            [("probabilities", label) for label in labels]
+            + [("reg_output", name) for name in REG_NAMES]
+            + [("band_powers", name) for name in BAND_NAMES]
+        )
+        self._timestamps = RingBuffer(1, capacity)
+        self._values = RingBuffer(len(self.series), capacity, dtype=np.float32)
+        self._timestamp_row = np.empty((1, 1))
+        self._value_row = np.empty((len(self.series), 1), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def append(self, snapshot: dict):
+        """Store one published result (timestamps must not go backwards)"""
+        if snapshot.get("timestamp") is None:
+            return
+        self._fill(self._value_row[:, 0], snapshot)
+        self._timestamp_row[0, 0] = snapshot["timestamp"]
+
+        with self._lock:
+            self._timestamps.extend(self._timestamp_row)
+            self._values.extend(self._value_row)
+
+    def extend(self, snapshots):
+        """Store several results in order, with one write per buffer (see append)"""
+        snapshots = [s for s in snapshots if s.get("timestamp") is not None]
+        if not snapshots:
+            return
+        values = np.empty((len(self.series), len(snapshots)), dtype=np.float32)
+        for j, snapshot in enumerate(snapshots):
+            self._fill(values[:, j], snapshot)
+        timestamps = np.array([[s["timestamp"] for s in snapshots]])
+
+        with self._lock:
+            self._timestamps.extend(timestamps)
+            self._values.extend(values)
+
+    def _fill(self, column, snapshot: dict):
+        """One result's values, in self.series order (NaN where missing)"""
+        reg_output = snapshot.get("reg_output") or []
+        for i, (group, name) in enumerate(self.series):
+            if group == "reg_output":
+                index = REG_NAMES.index(name)
+                value = reg_output[index] if index < len(reg_output) else None
+            else:
+                value = (snapshot.get(group) or {}).get(name)
+            column[i] = np.nan if value is None else value
+
+    def query(self, start: float = None, stop: float = None, buckets: int = 300) -> dict:
+        """
+        Results with start <= timestamp <= stop, downsampled into `buckets`
+        equal-width time buckets (empty buckets are omitted).
+
+        Returns:
+            {"from", "to", "points", "timestamp": [mean time per bucket],
+             "count": [...], "probabilities" / "reg_output" / "band_powers":
+             {name: {"min": [...], "max": [...], "mean": [...]}}}
+        """
+        with self._lock:
+            timestamps, values = [np.empty(0)], [self._values.segments()[0][:, :0]]
+            for t, v in zip(self._timestamps.segments(), self._values.segments()):
+                t = t[0]
+                lo = 0 if start is None else np.searchsorted(t, start, side="left")
+                hi = len(t) if stop is None else np.searchsorted(t, stop, side="right")
+                timestamps.append(t[lo:hi])
+                values.append(v[:, lo:hi])
+            # Views are only valid under the lock: copy the selection out once
+            t = np.concatenate(timestamps)
+            values = np.concatenate(values, axis=1)
+        if len(t):
+            start = t[0] if start is None else start
+            stop = t[-1] if stop is None else stop
+
+        result = {"from": start, "to": stop, "points": len(t)}
+        if len(t) == 0:
+            starts = np.empty(0, dtype=np.intp)
+        else:
+            # First sample of each bucket; keep buckets that got any samples
+            edges = np.linspace(start, stop, max(buckets, 1) + 1)[:-1]
+            bucket_starts = np.searchsorted(t, edges, side="left")
+            ends = np.append(bucket_starts[1:], len(t))
+            starts = bucket_starts[bucket_starts < ends]
+
+        if len(starts):
+            counts = np.diff(np.append(starts, len(t)))
+            mins = np.fmin.reduceat(values, starts, axis=1)  # fmin/fmax skip NaN
+            maxs = np.fmax.reduceat(values, starts, axis=1)
+            sums = np.add.reduceat(values, starts, axis=1)
+            n_valid = np.broadcast_to(counts, sums.shape).astype(np.float32)
+
+            # Missing fields (NaN) are rare: redo only the series they touch
+            missing = np.isnan(sums).any(axis=1)
+            if missing.any():
+                valid = ~np.isnan(values[missing])
+                n_valid[missing] = np.add.reduceat(valid, starts, axis=1)
+                sums[missing] = np.add.reduceat(
+                    np.where(valid, values[missing], 0), starts, axis=1
+                )
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = sums / n_valid
+            bucket_times = np.add.reduceat(t, starts) / counts
+        else:
+            counts = bucket_times = np.empty(0)
+            means = mins = maxs = np.empty((len(self.series), 0))
+
+        result["timestamp"] = bucket_times.tolist()
+        result["count"] = counts.tolist()
+        for i, (group, name) in enumerate(self.series):
+            result.setdefault(group, {})[name] = {
+                "min": _json_list(mins[i]),
+                "max": _json_list(maxs[i]),
+                "mean": _json_list(means[i]),
+            }
+        return result
+
+
+def _json_list(values: np.ndarray) -> list:
+    """NaN (no data in the bucket) → None, since JSON has no NaN"""
+    return [None if v != v else v for v in values.tolist()]
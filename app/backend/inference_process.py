@@ -0,0 +1,159 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+
+from metrics import REGISTRY
+from shared_state import SharedMemorySnapshot
+
+RESTARTS = REGISTRY.counter(
+    "inference_process_restarts_total", "Times the inference process was restarted"
+)
+
+
+def _inference_main(snapshot: SharedMemorySnapshot, results, overrides, metrics, metrics_interval):
+    """Child process: acquisition + inference, publishing into shared memory"""
+    # Imported here so the API process never loads torch/brainflow for this
+    from config_loader import load_config
+    from muse_streaming import start_muse_inference
+
+    def export_metrics():
+        while True:
+            metrics.publish({"text": REGISTRY.render()})
+            time.sleep(metrics_interval)
+
+    threading.Thread(target=export_metrics, name="metrics-export", daemon=True).start()
+
+    def on_result(result):
+        try:
+            results.put_nowait(result)
+        except queue.Full:
+            pass  # API side is behind; the snapshot is still current
+
+    start_muse_inference(snapshot, cfg=load_config(overrides=overrides), on_result=on_result)
+
+
+class InferenceSupervisor:
+    """
+    Runs start_muse_inference in a dedicated process and restarts it when it
+    exits or crashes, so PyTorch/NumPy work never competes with request
+    handling for the API process's GIL.
+
+    Results reach the API process two ways:
+    - `snapshot` (SharedMemorySnapshot): latest result, read by the routes
+    - `on_results(results)`: called in the API process with every result
+      (history, push stream), fed through a bounded multiprocessing queue
+      and handed over in batches every `drain_interval` seconds, so the API
+      process wakes up a few times a second instead of once per result
+
+    The child's metrics (see metrics.py) are rendered into a second shared
+    memory block every `metrics_interval` seconds; metrics_text() reads them.
+    """
+
+    def __init__(
+        self,
+        snapshot: SharedMemorySnapshot,
+        on_results=None,
+        overrides=None,
+        restart_delay: float = 2.0,
+        queue_size: int = 256,
+        metrics_interval: float = 1.0,
+        drain_interval: float = 0.05,
+    ):
+        """
+        Args:
+            snapshot: shared memory block the child publishes into
+            on_results: callback for each batch of results (list), run in a
+                supervisor thread
+            overrides: Hydra overrides for the child's load_config()
+            restart_delay: seconds to wait before restarting a dead child
+            queue_size: results buffered for on_results before dropping
+            metrics_interval: seconds between exports of the child's metrics
+            drain_interval: seconds between batches handed to on_results
+        """
+        self.snapshot = snapshot
+        self.on_results = on_results
+        self.drain_interval = drain_interval
+        self.overrides = list(overrides or [])
+        self.restart_delay = restart_delay
+        self.restarts = 0
+        self.metrics_interval = metrics_interval
+        self.metrics = SharedMemorySnapshot(capacity=256 * 1024, initial={"text": ""})
+
+        self._ctx = mp.get_context("spawn")  # No forked torch/brainflow state
+        self.queue_size = queue_size
+        self._results = self._ctx.Queue(queue_size)
+        self._process = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._supervise, name="inference-supervisor", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        process = self._process
+        if process is not None and process.is_alive():
+            process.terminate()
+            process.join(timeout)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.metrics.close()
+
+    def metrics_text(self) -> str:
+        """Prometheus text of the inference process, as of its last export"""
+        return self.metrics.get("text", "")
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def _supervise(self):
+        while not self._stop.is_set():
+            self._process = self._ctx.Process(
+                target=_inference_main,
+                args=(
+                    self.snapshot,
+                    self._results,
+                    self.overrides,
+                    self.metrics,
+                    self.metrics_interval,
+                ),
+                name="muse-inference",
+                daemon=True,
+            )
+            self._process.start()
+            print(f"🧠 Inference process started (pid {self._process.pid})")
+
+            while not self._stop.is_set() and self._process.is_alive():
+                self._stop.wait(self.drain_interval)
+                self._drain()
+            self._drain()
+
+            if self._stop.is_set():
+                break
+            self.restarts += 1
+            RESTARTS.inc()
+            print(
+                f"⚠️ Inference process exited (code {self._process.exitcode}), "
+                f"restarting in {self.restart_delay}s..."
+            )
+            self._stop.wait(self.restart_delay)
+
+    def _drain(self):
+        """Hand everything queued so far to on_results, as one batch"""
+        results = []
+        try:
+            while len(results) < self.queue_size:
+                results.append(self._results.get_nowait())
+        except queue.Empty:
+            pass
+        if results and self.on_results is not None:
+            try:
+                self.on_results(results)
+            except Exception as e:
+                print(f"❌ on_results failed: {e}")
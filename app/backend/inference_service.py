@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+import torch
+
+
+class InferenceService:
+    """
+    Micro-batching front end for MultiTaskEEGModel.
+
+    Any number of producers (live streams, replay jobs, API handlers) call
+    submit()/predict() with one 11-feature vector each. A worker thread
+    gathers requests until `max_batch_size` are waiting or the oldest has
+    waited `max_latency` seconds, runs a single forward_constant() for the
+    batch and hands each producer its row back, so per-call PyTorch overhead
+    is paid once per batch instead of once per prediction.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_batch_size: int = 32,
+        max_latency: float = 0.005,
+        n_features: int = 11,
+    ):
+        """
+        Args:
+            model: MultiTaskEEGModel in eval mode
+            max_batch_size: run as soon as this many requests are waiting
+            max_latency: ...or once the oldest request has waited this long (s)
+            n_features: model input channels
+        """
+        if max_batch_size <= 0:
+            raise ValueError(f"max_batch_size must be positive, got {max_batch_size}")
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+
+        self._pending = deque()  # (features, n_samples, submitted_at, future)
+        self._cond = threading.Condition()
+        self._running = False
+        self._worker = None
+
+        # Preallocated batch input
+        self._feature_tensor = torch.zeros(max_batch_size, n_features)
+        self._feature_array = self._feature_tensor.numpy()
+        self._lengths = torch.zeros(max_batch_size)
+
+        # Monitoring (updated by the worker, read by stats())
+        self._stats_lock = threading.Lock()
+        self.batch_size_counts = Counter()  # batch size → number of forwards
+        self.queue_delays = deque(maxlen=10_000)  # Recent submit → forward delays (s)
+        self.n_requests = 0
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+        self._worker = threading.Thread(
+            target=self._run, name="inference-service", daemon=True
+        )
+        self._worker.start()
+        return self
+
+    def stop(self):
+        """Finishes every request already submitted, then stops the worker"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def submit(self, features, n_samples: int) -> Future:
+        """
+        Queues one prediction.
+
+        Args:
+            features: (11,) model input (copied, so the caller may reuse it)
+            n_samples: length of the window the features describe
+
+        Returns:
+            Future resolving to (probs, reg_out): softmax probabilities
+            (n_classes,) and regression outputs (n_outputs,) as tensors.
+        """
+        future = Future()
+        item = (np.array(features, dtype=np.float32), n_samples, time.perf_counter(), future)
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("InferenceService is not running; call start() first")
+            self._pending.append(item)
+            self._cond.notify()
+        return future
+
+    def predict(self, features, n_samples: int, timeout: float = None):
+        """submit() and wait for the result"""
+        return self.submit(features, n_samples).result(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or not self._running)
+                if not self._pending:
+                    return  # Stopped and drained
+
+                # Collect until the batch is full or the oldest request is due
+                deadline = self._pending[0][2] + self.max_latency
+                while self._running and len(self._pending) < self.max_batch_size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                n = min(len(self._pending), self.max_batch_size)
+                batch = [self._pending.popleft() for _ in range(n)]
+
+            self._forward(batch)
+
+    def _forward(self, batch):
+        n = len(batch)
+        started = time.perf_counter()
+        for row, (features, n_samples, _, _) in enumerate(batch):
+            self._feature_array[row] = features
+            self._lengths[row] = n_samples
+        with self._stats_lock:
+            self.queue_delays.extend(started - item[2] for item in batch)
+            self.batch_size_counts[n] += 1
+            self.n_requests += n
+
+        try:
+            with torch.no_grad():
+                class_out, reg_out = self.model.forward_constant(
+                    self._feature_tensor[:n], self._lengths[:n]
+                )
+                probs = torch.softmax(class_out, dim=1)
+        except Exception as e:
+            for *_, future in batch:
+                future.set_exception(e)
+            return
+
+        for row, (*_, future) in enumerate(batch):
+            future.set_result((probs[row], reg_out[row]))
+
+    def stats(self) -> dict:
+        """Batch-size histogram and queueing delay (submit → forward) percentiles"""
+        with self._stats_lock:
+            delays_ms = np.asarray(self.queue_delays) * 1e3
+            batch_sizes = dict(sorted(self.batch_size_counts.items()))
+            n_requests = self.n_requests
+        if len(delays_ms):
+            p50, p95, p99 = np.percentile(delays_ms, [50, 95, 99])
+            delay = {
+                "mean_ms": float(delays_ms.mean()),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "max_ms": float(delays_ms.max()),
+            }
+        else:
+            delay = {}
+        return {
+            "requests": n_requests,
+            "batches": sum(batch_sizes.values()),
+            "batch_sizes": batch_sizes,
+            "queue_delay": delay,
+        }
@@ -1,40 +1,113 @@
 from brainflow.board_shim import (
     BoardShim,
     BrainFlowInputParams,
-    BoardIds,
     BrainFlowPresets,
 )
-from brainflow.data_filter import (
-    DataFilter,
-    FilterTypes,
-    WindowOperations,
-    DetrendOperations,
-)
 import numpy as np
 import time
-import datetime
+import threading
 import torch
 from pathlib import Path
-from omegaconf import DictConfig
-import hydra
 import sys
+from bounded_queue import DropOldestQueue
 from config_loader import load_config
+from inference_service import InferenceService
+from metrics import REGISTRY
+from results_history import ResultsHistory
+from ring_buffer import RingBuffer
+from bandpower import BAND_NAMES, band_power_dict
+from preprocessing import PreprocessingPipeline
+from replay_board import ReplayBoard
+from session_recorder import SessionRecorder, result_row
+from shared_state import publish
 
 # Hack to get access to root directory
 project_root = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(project_root))
 from training.networks import MultiTaskEEGModel
 
+# Hot-path metrics (served at /metrics by api_server.py)
+SAMPLES_PULLED = REGISTRY.counter(
+    "muse_samples_pulled_total", "EEG samples read from the board"
+)
+BURSTS_REJECTED = REGISTRY.counter(
+    "muse_bursts_rejected_total",
+    "Bursts/windows dropped by preprocessing, by the stage that rejected them",
+    ["reason"],
+)
+ERRORS = REGISTRY.counter(
+    "muse_errors_total", "Board reads, filters and forwards that raised", ["stage"]
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "muse_stage_seconds", "Time spent per pipeline stage for each result", ["stage"]
+)
+RESULTS = REGISTRY.counter("muse_results_total", "Predictions produced")
+PUBLISH_LAG = REGISTRY.histogram(
+    "muse_publish_lag_seconds", "From a result being produced to it being published"
+)
+
 
 class MuseRealtimeInference:
     board: BoardShim
     boardId = 38
     con_port: str
 
-    def __init__(self, con_port, model, cfg):
+    # labels = list(self.cfg.model.labels.keys())
+    labels = [
+        "Focus-NotFatigued",
+        "Focus-Fatigued",
+        "UnFocus-NotFatigued",
+        "UnFocus-Fatigued",
+    ]
+
+    def __init__(self, con_port, model, cfg, inference_service=None):
         self.con_port = con_port
         self.model = model
         self.cfg = cfg
+        # Optional InferenceService shared with other producers (micro-batching)
+        self.inference_service = inference_service
+        self.clock = time  # Anything with sleep()/monotonic(), e.g. a ReplayClock
+
+        # Per-thread stage timings (see last_timings)
+        self._local = threading.local()
+
+        # Stage → stage queues of the pipelined mode (see queue_stats)
+        self.queues = {}
+
+        # Sliding-window acquisition state (see process_eeg_window)
+        self.eeg_buffer = None
+        self.aux_buffer = None
+        self._next_hop = 0.0
+
+        # Shared preprocessing (filter state is carried across bursts/hops)
+        self.pipeline = None
+
+        # Preallocated (batch=1, 11 features) model input, reused every prediction
+        self._feature_tensor = torch.zeros(1, 11)
+        self._feature_array = self._feature_tensor.numpy()
+
+        # Every result of run_realtime_inference, in fixed memory (older ones on disk)
+        history = self.cfg.muse.get("history") if self.cfg else None
+        self.results_history = ResultsHistory(
+            self.labels,
+            memory_rows=history.memory_rows if history else 4096,
+            spill_dir=history.spill_dir if history else None,
+        )
+
+    @property
+    def last_timings(self) -> dict:
+        """
+        Seconds spent per stage for the result being built (pull, filter, ...,
+        forward). Kept per thread so the pipelined stages don't mix them up.
+        """
+        if not hasattr(self._local, "timings"):
+            self._local.timings = {}
+        return self._local.timings
+
+    @last_timings.setter
+    def last_timings(self, timings: dict):
+        self._local.timings = timings
+
     def connect_muse(self):
         try:
             params = BrainFlowInputParams()
@@ -45,10 +118,19 @@ class MuseRealtimeInference:
         except Exception as e:
             return False
 
-    def process_eeg_burst(self, burst_duration: float = 1.0):
+    def connect_replay(self, replay_board: ReplayBoard):
+        """Stream from a ReplayBoard instead of the headset (load tests, profiling, CI)"""
+        self.board = replay_board
+        self.clock = replay_board.clock
+        return True
+
+    def process_eeg_burst(self, burst_duration: float = 1.0, wait: bool = True):
         """
         Collects and preprocesses a short EEG burst from the Muse 2 headset.
 
+        Waits `burst_duration` for new samples first, unless `wait` is False
+        (the first burst, when _wait_for_samples() already waited).
+
         Includes:
         - Bandpass (1–50 Hz) and notch (50/60 Hz) filtering
         - Amplitude & motion artifact rejection
@@ -65,13 +147,142 @@ class MuseRealtimeInference:
             or None if invalid / noisy burst.
         """
         # Wait for buffer to fill with new data
-        time.sleep(burst_duration)
+        if wait:
+            self.clock.sleep(burst_duration)
 
         # --- 🔹 1. Grab new board data ---
+        pulled = self._pull_board_data()
+        if pulled is None:
+            return None
+
+        eeg_data, aux_data = pulled
+        return self._process_block(eeg_data, aux_data)
+
+    def process_eeg_window(
+        self, window_duration: float = 2.0, hop_duration: float = 0.25
+    ):
+        """
+        Sliding-window alternative to process_eeg_burst().
+
+        New samples are pulled from the board every `hop_duration` seconds into
+        per-channel ring buffers, and the newest `window_duration` seconds are
+        processed. Consecutive windows overlap, so a fresh prediction is
+        available every hop instead of every full burst.
+
+        Until the buffer holds a full window, the first windows are the
+        samples received so far, once there are enough for a clean block
+        (PreprocessingPipeline.min_block_samples).
+
+        Returns:
+            Same dict as process_eeg_burst(), or None if invalid / noisy window,
+            or if the board ran out (exhausted replay) before a window filled.
+        """
+        sampling_rate = self.board.get_sampling_rate(self.boardId)
+        eeg_window = int(window_duration * sampling_rate)
+
+        if self.eeg_buffer is None:
+            self._init_window_buffers(window_duration)
+            self._next_hop = self.clock.monotonic()
+
+        while True:
+            self._wait_for_next_hop(hop_duration)
+
+            pulled = self._pull_board_data()
+            if pulled is None:
+                return None
+
+            eeg_data, aux_data = pulled
+            if eeg_data.shape[1] == 0 and getattr(self.board, "exhausted", False):
+                return None  # Nothing more will arrive; iter_clean_bursts stops
+            try:
+                eeg_data = self._get_pipeline().prefilter(eeg_data)
+            except Exception as e:
+                print(f"Filter error: {e}")
+                ERRORS.inc(stage="filter")
+                return None
+            self._buffer_samples(eeg_data, aux_data)
+
+            if len(self.eeg_buffer) >= self._first_window(eeg_window):
+                break
+
+        eeg_data, aux_data = self._latest_window(min(eeg_window, len(self.eeg_buffer)))
+        return self._process_block(eeg_data, aux_data, prefiltered=True)
+
+    def _first_window(self, eeg_window: int) -> int:
+        """Samples needed before the first (possibly partial) window is processed"""
+        return min(eeg_window, self._get_pipeline().min_block_samples)
+
+    def _wait_for_samples(self, n_samples: int, poll: float = 0.01):
+        """
+        Sleeps until the board has buffered `n_samples` EEG samples (or a
+        replay runs out), instead of a fixed warm-up delay.
+        """
+        while self.board.get_board_data_count() < n_samples:
+            if getattr(self.board, "exhausted", False):
+                return
+            self.clock.sleep(poll)
+
+    def _wait_for_next_hop(self, hop_duration: float):
+        """Deadline-based pacing so processing time does not drift the hop"""
+        self._next_hop += hop_duration
+        delay = self._next_hop - self.clock.monotonic()
+        if delay > 0:
+            self.clock.sleep(delay)
+        else:
+            self._next_hop = self.clock.monotonic()
+
+    def _buffer_samples(self, eeg_data: np.ndarray, aux_data: np.ndarray):
+        self.eeg_buffer.extend(eeg_data)
+        if aux_data.shape[0] == self.aux_buffer.n_channels:
+            self.aux_buffer.extend(aux_data)
+
+    def _latest_window(self, eeg_window: int):
+        """Copies of the newest EEG window and the aux samples covering it"""
+        eeg_data = self.eeg_buffer.latest(eeg_window)
+        aux_data = self.aux_buffer.latest(self.aux_buffer.capacity)
+        if aux_data.shape[1] == 0:
+            aux_data = np.zeros((6, eeg_data.shape[1]))
+        return eeg_data, aux_data
+
+    def _init_window_buffers(self, window_duration: float):
+        """Allocate ring buffers sized to one analysis window per preset"""
+        eeg_rate = self.board.get_sampling_rate(self.boardId)
+        n_eeg = len(self.board.get_eeg_channels(self.boardId))
+        self.eeg_buffer = RingBuffer(n_eeg, int(window_duration * eeg_rate))
+
+        aux_preset = BrainFlowPresets.AUXILIARY_PRESET
+        aux_rate = self.board.get_sampling_rate(self.boardId, aux_preset)
+        n_aux = self.board.get_num_rows(self.boardId, aux_preset)
+        self.aux_buffer = RingBuffer(n_aux, max(int(window_duration * aux_rate), 2))
+
+    def _reset_window_buffers(self):
+        self.eeg_buffer = None
+        self.aux_buffer = None
+
+    def _get_pipeline(self) -> PreprocessingPipeline:
+        """Streaming preprocessing pipeline for this board, built on first use"""
+        if self.pipeline is None:
+            settings = self.cfg.muse.get("preprocessing") if self.cfg else None
+            self.pipeline = PreprocessingPipeline(
+                self.board.get_sampling_rate(self.boardId),
+                settings=settings,
+                streaming=True,
+            )
+        return self.pipeline
+
+    def _pull_board_data(self):
+        """
+        Drains all samples buffered on the board since the last pull.
+
+        Returns:
+            (eeg_data, aux_data) tuple, or None if the board read failed.
+        """
+        start = time.perf_counter()
         try:
             data = self.board.get_board_data()
         except Exception as e:
             print(f"❌ Failed to read Muse data: {e}")
+            ERRORS.inc(stage="pull")
             return None
 
         eeg_channels = self.board.get_eeg_channels(self.boardId)
@@ -84,108 +295,44 @@ class MuseRealtimeInference:
         except Exception:
             aux_data = np.zeros((6, eeg_data.shape[1]))
 
-        # --- 🔹 2. Validate Data Shapes ---
-        if eeg_data.shape[1] < 32:
-            print(f"⚠️ Not enough EEG samples ({eeg_data.shape[1]}). Skipping burst.")
-            return None
-
-        # --- 🔹 3. Extract Gyro / Accel Means ---
-        if aux_data.shape[0] >= 6:
-            accel_data = aux_data[0:3, :]
-            gyro_data = aux_data[3:6, :]
-            gyro_mean = np.mean(gyro_data, axis=1)
-            accel_mean = np.mean(accel_data, axis=1)
-        else:
-            gyro_mean = np.zeros(3)
-            accel_mean = np.zeros(3)
+        self._add_timing("pull", time.perf_counter() - start)
+        SAMPLES_PULLED.inc(eeg_data.shape[1])
+        return eeg_data, aux_data
 
-        # --- 🔹 4. Filtering ---
-        eeg_data = np.ascontiguousarray(eeg_data)
-        sampling_rate = self.board.get_sampling_rate(self.boardId)
-
-        for ch in range(eeg_data.shape[0]):
-            try:
-                DataFilter.detrend(eeg_data[ch], DetrendOperations.CONSTANT.value)
-                DataFilter.perform_bandpass(
-                    eeg_data[ch],
-                    sampling_rate,
-                    1.0,
-                    50.0,
-                    2,
-                    FilterTypes.BUTTERWORTH.value,
-                    0,
-                )
-                # North America (60 Hz)
-                DataFilter.perform_bandstop(
-                    eeg_data[ch],
-                    sampling_rate,
-                    58.0,
-                    62.0,
-                    2,
-                    FilterTypes.BUTTERWORTH.value,
-                    0,
-                )
-                # Europe (50 Hz)
-                DataFilter.perform_bandstop(
-                    eeg_data[ch],
-                    sampling_rate,
-                    48.0,
-                    52.0,
-                    2,
-                    FilterTypes.BUTTERWORTH.value,
-                    0,
-                )
-            except Exception as e:
-                print(f"Filter error on channel {ch}: {e}")
-                return None
+    def _add_timing(self, stage: str, seconds: float):
+        self.last_timings[stage] = self.last_timings.get(stage, 0.0) + seconds
+        STAGE_SECONDS.observe(seconds, stage=stage)
 
-        # --- 🔹 5. Artifact Rejection ---
-        # remove amplitude spikes (>100 µV)
-        amplitude_mask = np.all(np.abs(eeg_data) < 250.0, axis=0)
-        eeg_data = eeg_data[:, amplitude_mask]
-
-        if eeg_data.shape[1] < 32:
-            print("⚠️ Burst rejected due to amplitude artifacts.")
-            return None
-
-        # Motion artifacts from accelerometer
-        accel_magnitude = np.linalg.norm(accel_data, axis=0)
-        delta_accel = np.diff(accel_magnitude)
-        motion_score = np.mean(np.abs(delta_accel))
-        if motion_score > 0.5:  # Adjust if too sensitive
-            print("⚠️  High motion detected — skipping burst.")
-            return None
-
-        # --- 🔹 6. Ensure Even-Length Array for Bandpower ---
-        if eeg_data.shape[1] % 2 == 1:
-            eeg_data = eeg_data[:, :-1]
-        eeg_data = np.ascontiguousarray(eeg_data)
+    def _process_block(
+        self, eeg_data: np.ndarray, aux_data: np.ndarray, prefiltered: bool = False
+    ):
+        """
+        Filtering, artifact rejection and bandpower for one block of raw samples.
 
-        # --- 🔹 7. Bandpower Extraction ---
+        Set `prefiltered` when the block already went through the filter bank
+        (the sliding-window path filters samples as they arrive).
+        """
         try:
-            avgs, stds = DataFilter.get_avg_band_powers(
-                eeg_data,
-                channels=np.arange(eeg_data.shape[0]),
-                sampling_rate=sampling_rate,
-                apply_filter=False,
+            burst = self._get_pipeline().run(
+                eeg_data, aux_data, prefiltered=prefiltered
             )
-            band_powers = {
-                "Delta": float(avgs[0]),
-                "Theta": float(avgs[1]),
-                "Alpha": float(avgs[2]),
-                "Beta": float(avgs[3]),
-                "Gamma": float(avgs[4]),
-            }
         except Exception as e:
-            print(f"❌ Bandpower calculation failed: {e}")
+            print(f"❌ Preprocessing failed: {e}")
+            ERRORS.inc(stage="preprocessing")
+            return None
+
+        for stage, seconds in self.pipeline.last_timings.items():
+            self._add_timing(stage, seconds)
+        if burst is None:
+            BURSTS_REJECTED.inc(reason=self.pipeline.last_rejection)
             return None
 
         # --- ✅ Return structured burst data ---
         return {
-            "eeg_data": eeg_data,
-            "band_powers": band_powers,
-            "gyro_mean": gyro_mean,
-            "accel_mean": accel_mean,
+            "eeg_data": burst["eeg_data"],
+            "band_powers": band_power_dict(burst["band_powers"][0]),
+            "gyro_mean": burst["gyro_mean"],
+            "accel_mean": burst["accel_mean"],
         }
 
     def get_clean_burst_data(self, duration_seconds=1.0):
@@ -193,94 +340,22 @@ class MuseRealtimeInference:
         Shorter version of get_avg_wave_data() for real-time inference.
         Performs filtering, motion rejection, and bandpower extraction.
         """
-        time.sleep(duration_seconds)
-        data = self.board.get_board_data()
-        eeg_data = data[self.board.get_eeg_channels(self.boardId)]
-        aux_data = self.board.get_board_data(preset=BrainFlowPresets.AUXILIARY_PRESET)
-
-        if eeg_data.shape[1] < 16:
-            print("⚠️ Not enough EEG samples.")
+        self.clock.sleep(duration_seconds)
+        pulled = self._pull_board_data()
+        if pulled is None:
             return None
 
-        if aux_data.shape[0] >= 6:
-            accel_data = aux_data[0:3, :]
-            gyro_data = aux_data[3:6, :]
-            gyro_mean = np.mean(gyro_data, axis=1)
-            accel_mean = np.mean(accel_data, axis=1)
-        else:
-            gyro_mean = [0, 0, 0]
-            accel_mean = [0, 0, 0]
-
-        sampling_rate = self.board.get_sampling_rate(self.boardId)
-        eeg_data = np.ascontiguousarray(eeg_data)
-
-        # Basic cleaning (bandpass + bandstop + detrend)
-        for ch in range(eeg_data.shape[0]):
-            DataFilter.detrend(eeg_data[ch], DetrendOperations.CONSTANT.value)
-            DataFilter.perform_bandpass(
-                eeg_data[ch],
-                sampling_rate,
-                1.0,
-                50.0,
-                2,
-                FilterTypes.BUTTERWORTH.value,
-                0,
-            )
-            DataFilter.perform_bandstop(
-                eeg_data[ch],
-                sampling_rate,
-                58.0,
-                62.0,
-                2,
-                FilterTypes.BUTTERWORTH.value,
-                0,
-            )
-            DataFilter.perform_bandstop(
-                eeg_data[ch],
-                sampling_rate,
-                48.0,
-                52.0,
-                2,
-                FilterTypes.BUTTERWORTH.value,
-                0,
-            )
-
-        # Artifact rejection
-        amplitude_mask = np.all(np.abs(eeg_data) < 100.0, axis=0)
-        eeg_data = eeg_data[:, amplitude_mask]
-        std_mask = np.std(eeg_data, axis=0) < np.percentile(
-            np.std(eeg_data, axis=0), 95
-        )
-        eeg_data = eeg_data[:, std_mask]
-
-        # Motion check
-        accel_magnitude = np.linalg.norm(accel_data, axis=0)
-        delta_accel = np.diff(accel_magnitude)
-        if np.mean(np.abs(delta_accel)) > 0.5:
-            print("⚠️ Motion too high, skipping burst.")
+        burst = self._process_block(*pulled)
+        if burst is None:
             return None
 
-        # Band powers
-        eeg_data = np.ascontiguousarray(
-            eeg_data[:, : int(sampling_rate * duration_seconds)]
-        )
-        avgs, _ = DataFilter.get_avg_band_powers(
-            eeg_data,
-            channels=np.arange(eeg_data.shape[0]),
-            sampling_rate=sampling_rate,
-            apply_filter=False,
+        return (
+            burst["eeg_data"],
+            burst["band_powers"],
+            burst["gyro_mean"],
+            burst["accel_mean"],
         )
 
-        band_powers = {
-            "Delta": avgs[0],
-            "Theta": avgs[1],
-            "Alpha": avgs[2],
-            "Beta": avgs[3],
-            "Gamma": avgs[4],
-        }
-
-        return eeg_data, band_powers, gyro_mean, accel_mean
-
     def predict_state(self, eeg_data, band_powers, gyro_mean, accel_mean):
         """
         Run inference on EEG data
@@ -297,47 +372,53 @@ class MuseRealtimeInference:
             reg_output: regression outputs
             feature_dict: dict with all features for logging
         """
-        # labels = list(self.cfg.model.labels.keys())
-        labels = [
-            "Focus-NotFatigued",
-            "Focus-Fatigued",
-            "UnFocus-NotFatigued",
-            "UnFocus-Fatigued",
-        ]
-
         # Model expects 11 channels: [Delta, Theta, Alpha, Beta, Gamma, GyroX, GyroY, GyroZ, AccelX, AccelY, AccelZ]
-        # Create feature array by repeating the scalar values across time samples
+        # Every time step is the same feature vector, so only the 11 values are
+        # fed in and the model pools over n_samples analytically
         n_samples = eeg_data.shape[1]
 
-        # Stack all 11 features
-        features = np.array(
-            [
-                np.full(n_samples, band_powers["Delta"]),
-                np.full(n_samples, band_powers["Theta"]),
-                np.full(n_samples, band_powers["Alpha"]),
-                np.full(n_samples, band_powers["Beta"]),
-                np.full(n_samples, band_powers["Gamma"]),
-                np.full(n_samples, gyro_mean[0]),
-                np.full(n_samples, gyro_mean[1]),
-                np.full(n_samples, gyro_mean[2]),
-                np.full(n_samples, accel_mean[0]),
-                np.full(n_samples, accel_mean[1]),
-                np.full(n_samples, accel_mean[2]),
-            ]
-        )  # Shape: (11, n_samples)
-
-        # Convert to tensor and add batch dimension
-        # Expected shape: (batch=1, 11 channels, n_samples)
-        x = torch.from_numpy(features).float().unsqueeze(0)
-
-        with torch.no_grad():
-            class_out, reg_out = self.model(x)
-            probs = torch.softmax(class_out, dim=1)
-            pred_class = torch.argmax(probs, dim=1)
-
-        class_probs = {label: float(p) for label, p in zip(labels, probs[0])}
-        class_label = labels[pred_class.item()]
-        reg_output = reg_out[0].cpu().numpy()
+        start = time.perf_counter()
+        # View into the reused input tensor
+        self.write_features(self._feature_array[0], band_powers, gyro_mean, accel_mean)
+        self._add_timing("tensor_build", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        if self.inference_service is not None:
+            # Batched with other producers' requests; includes the queueing delay
+            probs, reg_out = self.inference_service.predict(
+                self._feature_array[0], n_samples
+            )
+        else:
+            with torch.no_grad():
+                class_out, reg_out = self.model.forward_constant(
+                    self._feature_tensor, n_samples
+                )
+                probs, reg_out = torch.softmax(class_out, dim=1)[0], reg_out[0]
+        self._add_timing("forward", time.perf_counter() - start)
+
+        return self.decode_prediction(
+            probs, reg_out, band_powers, gyro_mean, accel_mean
+        )
+
+    @staticmethod
+    def write_features(features, band_powers, gyro_mean, accel_mean):
+        """Fills one (11,) model input row in place"""
+        features[0] = band_powers["Delta"]
+        features[1] = band_powers["Theta"]
+        features[2] = band_powers["Alpha"]
+        features[3] = band_powers["Beta"]
+        features[4] = band_powers["Gamma"]
+        features[5:8] = gyro_mean[:3]
+        features[8:11] = accel_mean[:3]
+
+    def decode_prediction(self, probs, reg_out, band_powers, gyro_mean, accel_mean):
+        """
+        Turns one row of softmax probabilities / regression outputs into
+        predict_state()'s (class_probs, class_label, reg_output, feature_dict)
+        """
+        class_probs = {label: float(p) for label, p in zip(self.labels, probs)}
+        class_label = self.labels[int(torch.argmax(probs))]
+        reg_output = reg_out.cpu().numpy()
 
         # Create feature dict in the same format as training data
         # FO-NF, FO-FA, UF-NF, UF-FA are placeholders (regression targets you'll fill later)
@@ -363,88 +444,55 @@ class MuseRealtimeInference:
         return class_probs, class_label, reg_output, feature_dict
 
     def run_realtime_inference(
-        self, burst_duration=1.0, max_iterations=None, save_csv=None
+        self, burst_duration=1.0, max_iterations=None, recorder=None
     ):
+        """
+        Prints every prediction of run_realtime_inference_generator() and keeps
+        it in results_history. With a SessionRecorder, each result is also
+        recorded as a Parquet row (buffered and written off this thread).
+        """
         if not self.board:
             print("Board not connected!")
             return
 
         print(f"Starting streaming with {burst_duration}s bursts...")
-        self.board.start_stream()
-        time.sleep(5)
-
-        if save_csv:
-            headers = "Delta,Theta,Alpha,Beta,Gamma,GyroX,GyroY,GyroZ,AccelX,AccelY,AccelZ,FO-NF,FO-FA,UF-NF,UF-FA,Label_Class"
-            with open(save_csv, "w") as f:
-                f.write(headers + "\n")
-
-        iteration = 0
         try:
-            while max_iterations is None or iteration < max_iterations:
-                burst = self.process_eeg_burst()
-                if burst is None:
-                    continue  # skip bad burst
+            for result in self.run_realtime_inference_generator(burst_duration):
+                row = result_row(result, self.labels)  # Flattened once for both
+                self.results_history.append_row(row)
+                if recorder is not None:
+                    recorder.append(row)
 
-                bp = burst["band_powers"]
-                feature_dict = burst["feature_dict"]
+                print(f"\n--- Iteration {result['iteration']} ---")
+                print(f"Predicted State: {result['class_label']}")
+                print(f"Probabilities: {result['class_probs']}")
+                print(f"Regression Output: {result['reg_output']}")
 
-                # inference
-                class_probs, class_label, reg_output, feature_dict = self.predict_state(
-                    None, bp, burst["gyro_mean"], burst["accel_mean"]
-                )
-
-                result = {
-                    "timestamp": time.time(),
-                    "iteration": iteration,
-                    "class_probs": class_probs,
-                    "class_label": class_label,
-                    "reg_output": reg_output.tolist(),
-                    "features": feature_dict,
-                }
-                self.results_history.append(result)
-
-                if save_csv:
-                    with open(save_csv, "a") as f:
-                        csv_line = ",".join(
-                            str(feature_dict[k])
-                            for k in [
-                                "Delta",
-                                "Theta",
-                                "Alpha",
-                                "Beta",
-                                "Gamma",
-                                "GyroX",
-                                "GyroY",
-                                "GyroZ",
-                                "AccelX",
-                                "AccelY",
-                                "AccelZ",
-                                "FO-NF",
-                                "FO-FA",
-                                "UF-NF",
-                                "UF-FA",
-                                "Label_Class",
-                            ]
-                        )
-                        f.write(csv_line + "\n")
-
-                print(f"\n--- Iteration {iteration} ---")
-                print(f"Predicted State: {class_label}")
-                print(f"Probabilities: {class_probs}")
-                print(f"Regression Output: {reg_output}")
-
-                iteration += 1
+                if max_iterations is not None and result["iteration"] + 1 >= max_iterations:
+                    break
 
         except KeyboardInterrupt:
             print("\nStopping inference...")
-        finally:
-            self.board.stop_stream()
 
-    def run_realtime_inference_generator(self, burst_duration: float = 1.0):
+    def run_realtime_inference_generator(
+        self,
+        burst_duration: float = 1.0,
+        hop_duration: float = None,
+        pipelined: bool = False,
+        queue_size: int = 1,
+    ):
         """
         Continuously yields inference results after fully processing EEG bursts
         (bandpass, artifact rejection, bandpower extraction, etc.).
 
+        If `hop_duration` is given, runs in sliding-window mode: each result is
+        computed from the newest `burst_duration` seconds and a new one is
+        emitted every `hop_duration` seconds (see process_eeg_window).
+
+        If `pipelined` is set, acquisition, DSP and inference run in their own
+        threads connected by drop-oldest queues of `queue_size` items (see
+        run_pipelined_inference_generator).
+
         Returns the same format as before:
             {
                 "timestamp": float,
@@ -452,30 +500,23 @@ class MuseRealtimeInference:
                 "class_probs": dict,
                 "class_label": str,
                 "reg_output": list,
-                "features": dict
+                "features": dict,
+                "timings": dict  # seconds per stage for this result
             }
         """
         if not self.board:
             print("⚠️ Board not connected!")
             return
 
-        print(f"🎧 Starting Muse streaming ({burst_duration}s bursts)...")
-        self.board.start_stream()
-        time.sleep(burst_duration * 2)
+        if pipelined:
+            yield from self.run_pipelined_inference_generator(
+                burst_duration, hop_duration, queue_size
+            )
+            return
 
         iteration = 0
         try:
-            while True:
-                # 🧠 Step 1 — Process a single burst of EEG data safely
-                burst = self.process_eeg_burst(burst_duration=burst_duration)
-
-                # If cleaning step rejected data (e.g. too noisy / motion artifact), skip
-                if burst is None or burst.get("eeg_data") is None:
-                    print(
-                        "⚠️ Skipping invalid EEG burst (empty or motion-contaminated)."
-                    )
-                    continue
-
+            for burst in self.iter_clean_bursts(burst_duration, hop_duration):
                 eeg_data = burst["eeg_data"]
                 band_powers = burst["band_powers"]
                 gyro_mean = burst["gyro_mean"]
@@ -488,43 +529,276 @@ class MuseRealtimeInference:
                     )
                 except Exception as e:
                     print(f"❌ Model inference failed: {e}")
+                    ERRORS.inc(stage="inference")
                     continue
 
                 # 🧾 Step 3 — Yield the structured result
-                yield {
-                    "timestamp": time.time(),
-                    "iteration": iteration,
-                    "class_probs": class_probs,
-                    "class_label": class_label,
-                    "reg_output": (
-                        reg_output.tolist()
-                        if hasattr(reg_output, "tolist")
-                        else reg_output
-                    ),
-                    "features": feature_dict,
-                }
+                yield self._make_result(
+                    iteration, class_probs, class_label, reg_output, feature_dict
+                )
 
                 iteration += 1
 
         except KeyboardInterrupt:
             print("🛑 Stopping Muse inference loop...")
 
+    def iter_clean_bursts(self, burst_duration: float = 1.0, hop_duration: float = None):
+        """
+        Starts the stream and yields every burst/window that survives
+        preprocessing (see process_eeg_burst / process_eeg_window), with its
+        stage timings in last_timings. Stops the stream when closed.
+        """
+        if hop_duration is None:
+            print(f"🎧 Starting Muse streaming ({burst_duration}s bursts)...")
+        else:
+            print(
+                f"🎧 Starting Muse streaming ({burst_duration}s windows every {hop_duration}s)..."
+            )
+        self.board.start_stream()
+        if self.pipeline is not None:
+            self.pipeline.reset()
+        if hop_duration is None:
+            # First burst as soon as there is enough for a clean block
+            self._wait_for_samples(self._get_pipeline().min_block_samples)
+        else:
+            self._reset_window_buffers()
+        wait = False
+
+        try:
+            while True:
+                # A non-looping replay has nothing more to give
+                if getattr(self.board, "exhausted", False):
+                    break
+                self.last_timings = {}
+
+                # 🧠 Process a single burst of EEG data safely
+                if hop_duration is None:
+                    burst = self.process_eeg_burst(burst_duration=burst_duration, wait=wait)
+                    wait = True
+                else:
+                    burst = self.process_eeg_window(
+                        window_duration=burst_duration, hop_duration=hop_duration
+                    )
+
+                # If cleaning step rejected data (e.g. too noisy / motion artifact), skip
+                if burst is None or burst.get("eeg_data") is None:
+                    print(
+                        "⚠️ Skipping invalid EEG burst (empty or motion-contaminated)."
+                    )
+                    continue
+
+                yield burst
+
+        finally:
+            print("⏹️  Stopping data stream...")
+            self.board.stop_stream()
+
+    def _make_result(self, iteration, class_probs, class_label, reg_output, feature_dict):
+        RESULTS.inc()
+        return {
+            "timestamp": time.time(),
+            "iteration": iteration,
+            "class_probs": class_probs,
+            "class_label": class_label,
+            "reg_output": (
+                reg_output.tolist() if hasattr(reg_output, "tolist") else reg_output
+            ),
+            "features": feature_dict,
+            "timings": dict(self.last_timings),
+        }
+
+    def run_pipelined_inference_generator(
+        self, burst_duration: float = 1.0, hop_duration: float = None, queue_size: int = 1
+    ):
+        """
+        Same results as run_realtime_inference_generator(), but acquisition,
+        DSP and inference each run in their own thread:
+
+            acquisition ─▶ [dsp queue] ─▶ DSP ─▶ [inference queue] ─▶ inference ─▶ [results queue] ─▶ caller
+
+        - acquisition: paces the board, pulls samples and runs the streaming
+          filter (it must see every sample to keep the filter state intact)
+        - DSP: artifact rejection and bandpower
+        - inference: predict_state
+
+        Every queue holds at most `queue_size` items and drops the oldest one
+        when full, so a slow forward pass or a slow consumer never delays the
+        next pull, and what gets published is always computed from the
+        freshest data. Rejected bursts simply don't reach the next stage.
+        Queue depths and drop counters are available from queue_stats().
+        """
+        self.queues = {
+            "dsp": DropOldestQueue(queue_size),
+            "inference": DropOldestQueue(queue_size),
+            "results": DropOldestQueue(queue_size),
+        }
+        stop = threading.Event()
+
+        print(f"🎧 Starting pipelined Muse streaming (queue size {queue_size})...")
+        self.board.start_stream()
+        self._get_pipeline().reset()
+        self._reset_window_buffers()
+
+        workers = [
+            threading.Thread(
+                target=self._acquisition_worker,
+                args=(self.queues["dsp"], stop, burst_duration, hop_duration),
+                name="muse-acquisition",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._dsp_worker,
+                args=(self.queues["dsp"], self.queues["inference"], stop),
+                name="muse-dsp",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._inference_worker,
+                args=(self.queues["inference"], self.queues["results"], stop),
+                name="muse-inference",
+                daemon=True,
+            ),
+        ]
+        for worker in workers:
+            worker.start()
+
+        results = self.queues["results"]
+        try:
+            while not results.drained:
+                result = results.get(timeout=0.1)
+                if result is not None:
+                    yield result
+
+        except KeyboardInterrupt:
+            print("🛑 Stopping Muse inference loop...")
+
         finally:
+            stop.set()
+            for queue in self.queues.values():
+                queue.close()
+            for worker in workers:
+                worker.join()
             print("⏹️  Stopping data stream...")
             self.board.stop_stream()
 
+    def queue_stats(self) -> dict:
+        """{queue: {"depth", "maxsize", "put", "dropped"}} of the pipelined mode"""
+        return {name: queue.stats() for name, queue in self.queues.items()}
+
+    def _acquisition_worker(self, out, stop, burst_duration, hop_duration):
+        """Pulls and stream-filters board data, emitting one block per burst/hop"""
+        try:
+            if hop_duration is None:
+                self._wait_for_samples(self.pipeline.min_block_samples)
+            else:
+                eeg_window = int(
+                    burst_duration * self.board.get_sampling_rate(self.boardId)
+                )
+                first_window = self._first_window(eeg_window)
+                self._init_window_buffers(burst_duration)
+                self._next_hop = self.clock.monotonic()
+            wait = False
+
+            while not stop.is_set() and not getattr(self.board, "exhausted", False):
+                self.last_timings = {}
+                if hop_duration is None:
+                    if wait:
+                        self.clock.sleep(burst_duration)
+                    wait = True
+                else:
+                    self._wait_for_next_hop(hop_duration)
+
+                pulled = self._pull_board_data()
+                if pulled is None:
+                    continue
+
+                eeg_data, aux_data = pulled
+                start = time.perf_counter()
+                try:
+                    eeg_data = self.pipeline.filter_bank.stream(eeg_data)
+                except Exception as e:
+                    print(f"Filter error: {e}")
+                    ERRORS.inc(stage="filter")
+                    continue
+                self._add_timing("filter", time.perf_counter() - start)
+
+                if hop_duration is not None:
+                    self._buffer_samples(eeg_data, aux_data)
+                    if len(self.eeg_buffer) < first_window:
+                        continue
+                    eeg_data, aux_data = self._latest_window(
+                        min(eeg_window, len(self.eeg_buffer))
+                    )
+
+                out.put((eeg_data, aux_data, self.last_timings))
+        finally:
+            out.close()
+
+    def _dsp_worker(self, inbox, out, stop):
+        """Artifact rejection and bandpower on prefiltered blocks"""
+        try:
+            while not stop.is_set() and not inbox.drained:
+                block = inbox.get(timeout=0.1)
+                if block is None:
+                    continue
+
+                eeg_data, aux_data, self.last_timings = block
+                burst = self._process_block(eeg_data, aux_data, prefiltered=True)
+                if burst is not None:
+                    out.put((burst, self.last_timings))
+        finally:
+            out.close()
+
+    def _inference_worker(self, inbox, out, stop):
+        """predict_state on every burst that made it through DSP"""
+        iteration = 0
+        try:
+            while not stop.is_set() and not inbox.drained:
+                item = inbox.get(timeout=0.1)
+                if item is None:
+                    continue
+
+                burst, self.last_timings = item
+                try:
+                    class_probs, class_label, reg_output, feature_dict = (
+                        self.predict_state(
+                            burst["eeg_data"],
+                            burst["band_powers"],
+                            burst["gyro_mean"],
+                            burst["accel_mean"],
+                        )
+                    )
+                except Exception as e:
+                    print(f"❌ Model inference failed: {e}")
+                    ERRORS.inc(stage="inference")
+                    continue
+
+                out.put(
+                    self._make_result(
+                        iteration, class_probs, class_label, reg_output, feature_dict
+                    )
+                )
+                iteration += 1
+        finally:
+            out.close()
+
     def disconnect_muse(self):
-        """Disconnect from Muse"""
+        """Disconnect from Muse, and drop results_history's temporary spill files"""
         if self.board:
             self.board.release_session()
             print("Disconnected from Muse")
+        self.results_history.close()
 
-    def save_results(self, filename: str):
-        """Save results history to file"""
+    def save_results(self, filename: str, chunk_rows: int = 4096):
+        """Save results history to a JSON list of flat rows, a chunk at a time"""
         import json
 
         with open(filename, "w") as f:
-            json.dump(self.results_history, f, indent=2)
+            f.write("[")
+            for start in range(0, len(self.results_history), chunk_rows):
+                rows = self.results_history.rows(start, start + chunk_rows)
+                f.write(("," if start else "") + ",\n".join(map(json.dumps, rows)))
+            f.write("]\n")
         print(f"Results saved to {filename}")
 
 
@@ -533,21 +807,7 @@ def main():
     cfg = load_config()
 
     # Load model
-    print("Loading model...")
-    model = MultiTaskEEGModel(
-        n_channels=cfg.model.n_channels,
-        hidden_dims=cfg.model.hidden_dims,
-        n_classes=cfg.model.n_classes,
-        n_outputs=cfg.model.n_outputs,
-    )
-
-    state_dict = torch.load(
-        cfg.inference.model_filepath, map_location=cfg.system.accelerator
-    )
-    new_state_dict = {k.replace("model.", ""): v for k, v in state_dict.items()}
-    model.load_state_dict(new_state_dict)
-    model.eval()
-    print("Model loaded successfully")
+    model = load_model(cfg, map_location=cfg.system.accelerator)
 
     # Initialize Muse interface
     # Or COM7
@@ -564,60 +824,95 @@ def main():
             print("Retrying in 2 seconds...")
             time.sleep(2)
 
-    # Run inference
+    # Run inference, recording every result to data/inference_results/session_<time>/
+    recorder = make_recorder(cfg, force=True)
     try:
         muse.run_realtime_inference(
             burst_duration=1.0,  # 1 second bursts
             max_iterations=None,  # Run indefinitely (use Ctrl+C to stop)
-            save_csv="realtime_inference.csv",  # Save in training format
+            recorder=recorder,
         )
     finally:
-        # Save results and disconnect
-        timestr = datetime.datetime.now()
-        muse.save_results(f"data/inference_results/inference_results_{timestr}.json")
+        recorder.close()  # Writes the rows still buffered
         muse.disconnect_muse()
 
 
+def make_recorder(cfg, force=False):
+    """SessionRecorder from `muse.recording` (None if disabled, unless `force`)"""
+    recording = cfg.muse.get("recording")
+    if recording is None or not (recording.enabled or force):
+        return None
+    return SessionRecorder(
+        recording.dir, recording.flush_rows, recording.flush_seconds
+    ).start()
+
+
 # at the bottom of muse_inference.py
 
 
-def start_muse_inference(latest_focus_data):
+def load_model(cfg, map_location="cpu"):
     """
-    Starts the Muse 2 realtime inference loop with a pre-trained multitask model.
-    All parameters are hardcoded (no hydra config required).
+    Builds MultiTaskEEGModel from cfg.model and loads cfg.inference.model_filepath
+    (through the converted copy in inference.model_cache_dir, if set)
     """
-    cfg = load_config()
+    print("Loading model...")
+    model = MultiTaskEEGModel.load(
+        Path(cfg.inference.model_filepath).resolve(),
+        map_location=map_location,
+        cache_dir=cfg.inference.get("model_cache_dir"),
+        n_channels=cfg.model.n_channels,
+        hidden_dims=cfg.model.hidden_dims,
+        n_classes=cfg.model.n_classes,
+        n_outputs=cfg.model.n_outputs,
+    )
+    print("✅ Model loaded successfully")
+    return model
 
-    # Hardcoded configuration TODO get from cfg
-    # COM_PORT = "/dev/ttyACM0"  # Or COM7
-    COM_PORT = cfg.muse.com_port
 
-    # Model architecture parameters
-    n_channels = 11
-    hidden_dims = [16, 32]
-    n_classes = 4
-    n_outputs = 4
+def start_muse_inference(latest_focus_data, cfg=None, on_result=None):
+    """
+    Starts the Muse 2 realtime inference loop with a pre-trained multitask model,
+    publishing every result into `latest_focus_data` (a shared_state snapshot,
+    or any dict) in one operation.
 
-    print("Loading model...")
-    model = MultiTaskEEGModel(
-        n_channels=n_channels,
-        hidden_dims=hidden_dims,
-        n_classes=n_classes,
-        n_outputs=n_outputs,
-    )
+    Uses load_config() unless a cfg is passed (e.g. by the benchmarks).
+    `on_result` is called with each published snapshot (e.g. to push it to
+    stream subscribers).
+    """
+    if cfg is None:
+        cfg = load_config()
+    model = load_model(cfg)
 
-    # Load state dict (with or without "model." prefix)
-    state_dict = torch.load(
-        Path(cfg.inference.model_filepath).resolve(), map_location="cpu"
-    )
-    new_state_dict = {k.replace("model.", ""): v for k, v in state_dict.items()}
-    model.load_state_dict(new_state_dict)
-    model.eval()
-    print("✅ Model loaded successfully")
+    if cfg.muse.get("devices"):
+        # Several headsets: one key per device (see session_manager.py)
+        from session_manager import start_multi_muse_inference
+
+        return start_multi_muse_inference(latest_focus_data, cfg, model, on_result)
+
+    inference_service = None
+    batching = cfg.inference.get("batching")
+    if batching and batching.enabled:
+        inference_service = InferenceService(
+            model, batching.max_batch_size, batching.max_latency_ms / 1e3
+        ).start()
 
     # Create Muse interface
-    muse = MuseRealtimeInference(con_port=cfg.muse.com_port, model=model, cfg=cfg)
+    muse = MuseRealtimeInference(
+        con_port=cfg.muse.com_port,
+        model=model,
+        cfg=cfg,
+        inference_service=inference_service,
+    )
     conn_status = False
+    if cfg.muse.get("replay_file"):
+        conn_status = muse.connect_replay(
+            ReplayBoard.from_file(
+                cfg.muse.replay_file,
+                speed=cfg.muse.replay_speed,
+                loop=cfg.muse.get("replay_loop", True),
+            )
+        )
+        print(f"🔁 Replaying {cfg.muse.replay_file} instead of the headset")
     while not conn_status:
         try:
             conn_status = muse.connect_muse()
@@ -628,12 +923,34 @@ def start_muse_inference(latest_focus_data):
 
     print("🎧 Starting Muse inference loop...")
 
+    recorder = make_recorder(cfg)
+
     # Stream inference results continuously
-    for result in muse.run_realtime_inference_generator(burst_duration=1.0):
-        latest_focus_data["class_label"] = result["class_label"]
-        latest_focus_data["probabilities"] = result["class_probs"]
-        latest_focus_data["reg_output"] = result["reg_output"]
-        latest_focus_data["timestamp"] = result["timestamp"]
+    try:
+        for result in muse.run_realtime_inference_generator(
+            burst_duration=cfg.muse.window_seconds,
+            hop_duration=cfg.muse.hop_seconds,
+            pipelined=cfg.muse.get("pipelined", False),
+            queue_size=cfg.muse.get("queue_size", 1),
+        ):
+            snapshot = {
+                "class_label": result["class_label"],
+                "probabilities": result["class_probs"],
+                "reg_output": result["reg_output"],
+                "band_powers": {name: result["features"][name] for name in BAND_NAMES},
+                "timestamp": result["timestamp"],
+            }
+            publish(latest_focus_data, snapshot)
+            PUBLISH_LAG.observe(time.time() - result["timestamp"])
+            if on_result is not None:
+                on_result(snapshot)
+            if recorder is not None:
+                recorder.append(result_row(result, muse.labels))
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if inference_service is not None:
+            inference_service.stop()
 
 
 if __name__ == "__main__":
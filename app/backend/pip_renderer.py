@@ -0,0 +1,134 @@
+import multiprocessing as mp
+import threading
+
+
+def _renderer_main(control, options):
+    """Child process: the PiP window, hidden until the first "show" """
+    # Imported here so the API process never loads Tk/matplotlib
+    from pip_window import start_pip_window
+
+    start_pip_window(control=control, visible=False, **options)
+
+
+class PipRenderer:
+    """
+    One long-lived PiP window process, shown and hidden over a control pipe.
+
+    Launching a process per /start_pip re-imports Tk, matplotlib and requests
+    and builds a new figure every time the overlay is toggled. Instead the
+    renderer is started once (lazily, or up front with start()) and keeps
+    its window, hidden, between uses: show(), hide() and configure() only
+    send a message (see start_pip_window's `control`), so they return in
+    microseconds whatever the window is doing. If the process dies, the
+    next show() starts a new one.
+
+    Messages from the window ("ready", "shown", "hidden", "closed", "error")
+    are kept in `state`; closing the window by hand only hides it.
+    """
+
+    def __init__(self, **options):
+        """
+        Args:
+            options: start_pip_window() arguments (window_title,
+                update_interval, max_points, stream_url)
+        """
+        self.options = options
+        self.state = None  # Last message from the window
+        self.error = None
+        self.starts = 0
+
+        self._ctx = mp.get_context("spawn")  # Tk must not inherit the server's threads
+        self._process = None
+        self._conn = None
+        self._wants_visible = False
+        self._lock = threading.Lock()  # Several server threads may send commands
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    @property
+    def visible(self) -> bool:
+        """Shown, or about to be (a "show" was sent and the window has not hidden since)"""
+        with self._lock:
+            self._receive()
+            return self.alive and self._wants_visible
+
+    def start(self):
+        """Start the renderer process (hidden) if it is not running"""
+        with self._lock:
+            self._start()
+        return self
+
+    def show(self):
+        with self._lock:
+            self._start()
+            self._send("show")
+            self._wants_visible = True
+
+    def hide(self):
+        with self._lock:
+            if self.alive:
+                self._send("hide")
+            self._wants_visible = False
+
+    def configure(self, **options):
+        """Change start_pip_window() options; applied live if the window is up"""
+        with self._lock:
+            self.options.update(options)
+            if self.alive:
+                self._send("configure", options)
+
+    def events(self) -> list:
+        """Messages received from the window since the last call"""
+        with self._lock:
+            return self._receive()
+
+    def close(self, timeout: float = 2.0):
+        with self._lock:
+            if self.alive:
+                self._send("quit")
+                self._process.join(timeout)
+                if self._process.is_alive():
+                    self._process.terminate()
+                    self._process.join()
+            self._process = None
+
+    def _start(self):
+        if self.alive:
+            return
+        self._conn, child_conn = self._ctx.Pipe()
+        self._process = self._ctx.Process(
+            target=_renderer_main,
+            args=(child_conn, self.options),
+            name="pip-renderer",
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        self._wants_visible = False
+        self.state = None
+        self.starts += 1
+        print(f"🖼️ PiP renderer started (pid {self._process.pid})")
+
+    def _send(self, command: str, options: dict = None):
+        try:
+            self._conn.send((command, options))
+        except (BrokenPipeError, OSError) as e:
+            print(f"⚠️ PiP renderer unreachable: {e}")
+
+    def _receive(self) -> list:
+        events = []
+        try:
+            while self._conn is not None and self._conn.poll():
+                event, detail = self._conn.recv()
+                events.append(event)
+                self.state = event
+                if event == "closed":
+                    self._wants_visible = False  # Closed by hand
+                elif event == "error":
+                    self.error = detail
+                    print(f"❌ PiP renderer failed: {detail}")
+        except (EOFError, OSError):
+            pass  # Process gone; the next show() restarts it
+        return events
@@ -1,18 +1,214 @@
+import json
+import threading
 import tkinter as tk
+from collections import deque
+
+import numpy as np
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 import requests
 
+from bounded_queue import DropOldestQueue
+from ring_buffer import RingBuffer
+
+
+class FocusFeed:
+    """
+    Results from the API's push stream (SSE, see push_stream.py), received
+    on a background thread.
+
+    One long-lived connection instead of a request per tick: the thread
+    parses each `data:` event into the latest-result queue, and the Tk loop
+    picks it up with latest(), which never blocks. If the stream drops, the
+    thread reports it once and reconnects every `retry` seconds, so a slow
+    or restarting backend never stalls rendering.
+    """
+
+    def __init__(self, stream_url: str, retry: float = 1.0, read_timeout: float = 30.0):
+        """
+        Args:
+            stream_url: SSE endpoint, e.g. http://127.0.0.1:5002/focus_stream
+            retry: seconds between reconnection attempts
+            read_timeout: give up on a silent connection after this long
+                (the server sends a keep-alive every 15 s)
+        """
+        self.stream_url = stream_url
+        self.retry = retry
+        self.read_timeout = read_timeout
+        self.received = 0
+        self._queue = DropOldestQueue(1)  # Only the newest result matters
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="pip-feed", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._queue.close()
+
+    def latest(self):
+        """Newest result received since the last call, or None"""
+        return self._queue.get(timeout=0)
+
+    def _run(self):
+        failing = False
+        while not self._stop.is_set():
+            try:
+                with requests.get(
+                    self.stream_url, stream=True, timeout=(2.0, self.read_timeout)
+                ) as response:
+                    response.raise_for_status()
+                    if failing:
+                        print(f"✅ PiP feed reconnected to {self.stream_url}")
+                        failing = False
+                    # chunk_size=1: hand over each event as soon as its line is complete
+                    for line in response.iter_lines(chunk_size=1):
+                        if self._stop.is_set():
+                            return
+                        if line.startswith(b"data:"):
+                            self._queue.put(json.loads(line[5:]))
+                            self.received += 1
+            except Exception as e:
+                if not failing:
+                    print(f"⚠️ PiP feed lost ({e}), retrying every {self.retry}s")
+                    failing = True
+            self._stop.wait(self.retry)
+
+
+class LiveGraph:
+    """
+    Scrolling line plot of the last `max_points` values of a few series.
+
+    Values live in a fixed-size RingBuffer and the lines are redrawn with
+    blitting: the axes background is cached after each full draw, and a
+    tick only restores it and draws the line artists. A full draw happens
+    only when the y-limits have to change, so the cost of a tick does not
+    depend on how long the session has run.
+
+    The y-limits follow the min/max of the visible values (tracked with
+    monotonic deques, O(1) per tick), with some slack so small fluctuations
+    don't force a full redraw every tick.
+    """
+
+    def __init__(self, canvas, ax, labels, colors, max_points: int, padding: float = 0.01):
+        self.canvas = canvas
+        self.ax = ax
+        self.max_points = max_points
+        self.padding = padding
+        self.values = RingBuffer(len(labels), max_points)
+        self._x = np.arange(max_points)
+        self._column = np.empty((len(labels), 1))
+        self._n = 0  # Values ever appended
+        self._min = deque()  # (index, value), increasing values
+        self._max = deque()  # (index, value), decreasing values
+        self._background = None
+
+        self.lines = [
+            ax.plot([], [], color=color, label=label, linewidth=2, animated=True)[0]
+            for label, color in zip(labels, colors)
+        ]
+        ax.set_xlim(0, max_points - 1)
+        ax.set_ylim(0, 1)
+        # Re-cache the background after every full draw (first show, resize, new limits)
+        self._draw_cid = canvas.mpl_connect("draw_event", self._on_draw)
+
+    def remove(self):
+        """Take the lines off the axes (e.g. to replace the graph)"""
+        self.canvas.mpl_disconnect(self._draw_cid)
+        for line in self.lines:
+            line.remove()
+
+    def append(self, values, draw: bool = True):
+        """Add one value per series and redraw the lines (unless `draw` is False)"""
+        self._column[:, 0] = values
+        self.values.extend(self._column)
+        self._track(self._min, self._column.min(), lambda old, new: old >= new)
+        self._track(self._max, self._column.max(), lambda old, new: old <= new)
+        self._n += 1
+
+        n = len(self.values)
+        visible = self.values.latest(n)
+        for line, series in zip(self.lines, visible):
+            line.set_data(self._x[-n:], series)
+
+        if not draw:
+            self._background = None  # Full draw when drawing resumes
+            return
+        if self._rescale() or self._background is None:
+            self.canvas.draw()  # _on_draw caches the background and draws the lines
+        else:
+            self._blit()
+
+    def _track(self, window, value, dominated):
+        """Sliding-window extreme: drop entries that can no longer be the min/max"""
+        while window and dominated(window[-1][1], value):
+            window.pop()
+        window.append((self._n, value))
+        if window[0][0] <= self._n - self.max_points:
+            window.popleft()
+
+    def _rescale(self) -> bool:
+        """Move the y-limits if the data left them or uses less than half of them"""
+        low, high = self._min[0][1], self._max[0][1]
+        bottom, top = self.ax.get_ylim()
+        span = high - low + 2 * self.padding
+        if bottom <= low and high <= top and span >= (top - bottom) / 2:
+            return False
+        margin = self.padding + (high - low) / 4
+        self.ax.set_ylim(low - margin, high + margin)
+        return True
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_lines()
+
+    def _blit(self):
+        self.canvas.restore_region(self._background)
+        self._draw_lines()
+        self.canvas.blit(self.ax.bbox)
+
+    def _draw_lines(self):
+        for line in self.lines:
+            self.ax.draw_artist(line)
+
+
 def start_pip_window(window_title="Live PiP Graph",
-                     update_interval=1000,
+                     update_interval=250,
                      max_points=10,
                      stop_flag=None,
-                     api_url="http://127.0.0.1:5001/focus_data"):
+                     stream_url="http://127.0.0.1:5002/focus_stream",
+                     control=None,
+                     visible=True,
+                     control_interval=20):
+    """
+    Runs the PiP window until it is closed, `stop_flag` is set, or a "quit"
+    command arrives.
+
+    `control` (a multiprocessing Connection, see pip_renderer.py) keeps the
+    window alive between uses: it is polled every `control_interval` ms for
+    (command, options) messages:
+
+        ("show", None) / ("hide", None)
+        ("configure", {"window_title", "update_interval", "max_points"})
+        ("quit", None)
 
-    root = tk.Tk()
+    and is sent ("ready" / "shown" / "hidden", None) as the window state
+    changes. Closing the window then only hides it (and sends "closed").
+    """
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        if control is not None:
+            control.send(("error", str(e)))
+        raise
     root.title(window_title)
     root.geometry("500x350")
     root.attributes("-topmost", True)
+    if not visible:
+        root.withdraw()
 
     text_var = tk.StringVar(value="Waiting for data...")
     label = tk.Label(root, textvariable=text_var,
@@ -29,61 +225,86 @@ def start_pip_window(window_title="Live PiP Graph",
     # 4 regression targets
     reg_labels = ["FO-NF", "FO-FA", "UF-NF", "UF-FA"]
     colors = ["lime", "orange", "cyan", "magenta"]
-    x_data = []
-    y_data = [[] for _ in range(4)]
 
-    lines = []
-    for i in range(4):
-        (line,) = ax.plot([], [], color=colors[i], label=reg_labels[i], linewidth=2)
-        lines.append(line)
-
-    ax.legend(facecolor="black", edgecolor="white", labelcolor="white")
     canvas = FigureCanvasTkAgg(fig, master=root)
     canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
+    def make_graph(max_points):
+        graph = LiveGraph(canvas, ax, reg_labels, colors, max_points)
+        ax.legend(facecolor="black", edgecolor="white", labelcolor="white")
+        return graph
+
+    graph = make_graph(max_points)
+    state = {"visible": visible, "update_interval": update_interval}
+
+    # Network I/O stays off the Tk thread
+    feed = FocusFeed(stream_url).start()
+
+    def quit_window():
+        feed.stop()
+        root.destroy()
+
+    def show():
+        root.deiconify()
+        root.lift()
+        state["visible"] = True
+        canvas.draw()
+        control.send(("shown", None))
+
+    def hide():
+        root.withdraw()
+        state["visible"] = False
+        control.send(("hidden", None))
+
+    def close_by_hand():
+        hide()
+        control.send(("closed", None))
+
+    def configure(options):
+        nonlocal graph
+        if "window_title" in options:
+            root.title(options["window_title"])
+        if "update_interval" in options:
+            state["update_interval"] = int(options["update_interval"])
+        if "max_points" in options:
+            graph.remove()
+            graph = make_graph(int(options["max_points"]))
+            canvas.draw()
+
+    def poll_control():
+        while control.poll():
+            command, options = control.recv()
+            if command == "show":
+                show()
+            elif command == "hide":
+                hide()
+            elif command == "configure":
+                configure(options or {})
+            elif command == "quit":
+                quit_window()
+                return
+        root.after(control_interval, poll_control)
+
     def update_graph():
         if stop_flag and stop_flag.value:
-            root.destroy()
+            quit_window()
             return
 
-        try:
-            response = requests.get(api_url, timeout=0.5)
-            if response.status_code == 200:
-                data = response.json()
-                reg_output = data.get("reg_output", [])
-
-                if reg_output and len(reg_output) == 4:
-                    # Append each reg_output channel
-                    x_data.append(len(x_data))
-                    for i in range(4):
-                        y_data[i].append(float(reg_output[i]))
-
-                    # Keep within rolling window
-                    x_disp = x_data[-max_points:]
-                    for i in range(4):
-                        y_disp = y_data[i][-max_points:]
-                        lines[i].set_data(x_disp, y_disp)
-
-                    # Auto scale based on small changes (micro fluctuations)
-                    all_vals = [v for ch in y_data for v in ch[-max_points:]]
-                    if all_vals:
-                        min_val = min(all_vals)
-                        max_val = max(all_vals)
-                        # Slight padding for readability
-                        ax.set_ylim(min_val - 0.01, max_val + 0.01)
-
-                    ax.relim()
-                    ax.autoscale_view(True, True, True)
-                    canvas.draw()
-
-                    label_text = f"{data.get('class_label', 'Unknown')} | " + \
-                                 " ".join([f"{lbl}:{reg_output[i]:.6f}" for i, lbl in enumerate(reg_labels)])
-                    text_var.set(label_text)
-
-        except Exception:
-            pass  # ignore connection hiccups
-
-        root.after(update_interval, update_graph)
+        data = feed.latest()
+        reg_output = data.get("reg_output") if data else None
+        if reg_output and len(reg_output) == 4:
+            # Hidden: keep the history current, but don't render
+            graph.append(reg_output, draw=state["visible"])
+
+            label_text = f"{data.get('class_label', 'Unknown')} | " + \
+                         " ".join([f"{lbl}:{reg_output[i]:.6f}" for i, lbl in enumerate(reg_labels)])
+            text_var.set(label_text)
+
+        root.after(state["update_interval"], update_graph)
 
+    if control is not None:
+        root.protocol("WM_DELETE_WINDOW", close_by_hand)
+        root.after(control_interval, poll_control)
+        control.send(("ready", None))
     root.after(update_interval, update_graph)
     root.mainloop()
@@ -0,0 +1,268 @@
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from bandpower import BANDS, BandPowerEngine
+from filter_bank import FilterBank
+
+# Used when no `muse.preprocessing` config is given
+DEFAULT_SETTINGS = {
+    "min_samples": 32,
+    "amplitude_threshold_uv": 100.0,
+    "variance_percentile": 95,
+    "motion_threshold": 0.5,
+}
+
+
+class FilterStage:
+    """
+    Detrend + bandpass + notch via the fused FilterBank: stream() for live
+    data, apply() per block otherwise (same detrend, see FilterBank)
+    """
+
+    name = "filter"
+
+    def __init__(self, sampling_rate: int, streaming: bool):
+        self.filter_bank = FilterBank(sampling_rate)
+        self.streaming = streaming
+
+    def __call__(self, burst: dict):
+        if burst["prefiltered"]:
+            return burst
+        if self.streaming:
+            burst["eeg_data"] = self.filter_bank.stream(burst["eeg_data"])
+        else:
+            burst["eeg_data"] = self.filter_bank.apply(burst["eeg_data"])
+        return burst
+
+
+class AmplitudeRejectionStage:
+    """Drops samples with eye blinks / spikes, then the noisiest samples by cross-channel std"""
+
+    name = "amplitude"
+
+    def __init__(self, threshold_uv: float, variance_percentile, min_samples: int):
+        self.threshold_uv = threshold_uv
+        self.variance_percentile = variance_percentile
+        self.min_samples = min_samples
+
+    def __call__(self, burst: dict):
+        eeg_data = burst["eeg_data"]
+        # Eye blinks can cause 100–300 µV spikes; remove extreme samples
+        eeg_data = eeg_data[:, np.all(np.abs(eeg_data) < self.threshold_uv, axis=0)]
+
+        if self.variance_percentile is not None and eeg_data.shape[1] > 0:
+            std_per_sample = np.std(eeg_data, axis=0)
+            cutoff = np.percentile(std_per_sample, self.variance_percentile)
+            eeg_data = eeg_data[:, std_per_sample < cutoff]
+
+        if eeg_data.shape[1] < self.min_samples:
+            print("⚠️ Burst rejected due to amplitude artifacts.")
+            return None
+
+        burst["eeg_data"] = eeg_data
+        return burst
+
+
+class MotionRejectionStage:
+    """Gyro/accel means, and rejection of bursts with too much head movement"""
+
+    name = "motion"
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+
+    def __call__(self, burst: dict):
+        aux_data = burst["aux_data"]
+        if aux_data.shape[0] < 6 or aux_data.shape[1] == 0:
+            burst["gyro_mean"] = np.zeros(3)
+            burst["accel_mean"] = np.zeros(3)
+            return burst
+
+        accel_data = aux_data[0:3, :]
+        gyro_data = aux_data[3:6, :]
+        burst["gyro_mean"] = np.mean(gyro_data, axis=1)
+        burst["accel_mean"] = np.mean(accel_data, axis=1)
+
+        # Average absolute change in total acceleration
+        accel_magnitude = np.linalg.norm(accel_data, axis=0)
+        motion_score = np.mean(np.abs(np.diff(accel_magnitude)))
+        if motion_score > self.threshold:
+            print("⚠️  High motion detected — skipping burst.")
+            return None
+        return burst
+
+
+class BandPowerStage:
+    """Delta–Gamma relative band powers, for the whole burst or in sliding windows"""
+
+    name = "bandpower"
+
+    def __init__(self, sampling_rate: int):
+        self.engine = BandPowerEngine(sampling_rate)
+
+    def __call__(self, burst: dict):
+        eeg_data = burst["eeg_data"]
+        window_seconds = burst["window_seconds"]
+
+        if window_seconds is None:
+            avgs, _ = self.engine.band_powers(eeg_data)
+            band_powers = avgs[None, :]
+        else:
+            win_len = int(window_seconds * self.engine.sampling_rate)
+            step = int(win_len * (1 - burst["overlap"]))
+            win_len -= win_len % 2
+            if eeg_data.shape[1] < win_len:
+                band_powers = np.empty((0, len(BANDS)))
+            else:
+                # (n_windows, channels, win_len) strided view, one stacked Welch call
+                windows = sliding_window_view(eeg_data, win_len, axis=1)[:, ::step]
+                band_powers, _ = self.engine.band_powers(windows.transpose(1, 0, 2))
+
+        if len(band_powers) == 0:
+            print("⚠️ Not enough clean samples for a bandpower window.")
+            return None
+
+        burst["band_powers"] = band_powers  # (n_windows, 5)
+        return burst
+
+
+class PreprocessingPipeline:
+    """
+    filter → amplitude rejection → motion rejection → bandpower.
+
+    One pipeline is shared by live inference (muse_streaming) and dataset
+    recording (data/process_muse_data.py), so training and inference features
+    come from identical code and thresholds. Each stage is timed on every run.
+    """
+
+    def __init__(self, sampling_rate: int, settings=None, streaming: bool = False):
+        """
+        Args:
+            sampling_rate: EEG sampling rate of the board
+            settings: `muse.preprocessing` config (DEFAULT_SETTINGS if None)
+            streaming: carry filter state between runs (contiguous live data)
+        """
+        settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.sampling_rate = sampling_rate
+        self.min_samples = settings["min_samples"]
+
+        self.filter_stage = FilterStage(sampling_rate, streaming)
+        self.stages = [
+            self.filter_stage,
+            AmplitudeRejectionStage(
+                settings["amplitude_threshold_uv"],
+                settings["variance_percentile"],
+                settings["min_samples"],
+            ),
+            MotionRejectionStage(settings["motion_threshold"]),
+            BandPowerStage(sampling_rate),
+        ]
+
+        # Smallest block that can give a full set of band powers: enough
+        # samples left after the variance cut (which drops the top
+        # (100 - percentile)% of samples) for min_samples and a Welch segment
+        clean = max(self.min_samples, self.stages[-1].engine.min_samples)
+        percentile = settings["variance_percentile"]
+        self.min_block_samples = (
+            clean if percentile is None else int(np.ceil(clean * 100 / percentile)) + 1
+        )
+
+        # Seconds spent per stage: last run, and running totals
+        self.last_timings = {}
+        self.total_timings = {stage.name: 0.0 for stage in self.stages}
+        self.stage_counts = {stage.name: 0 for stage in self.stages}
+        self.last_rejection = None
+        self._prefilter_time = 0.0
+
+    @property
+    def filter_bank(self) -> FilterBank:
+        return self.filter_stage.filter_bank
+
+    def prefilter(self, eeg_data: np.ndarray) -> np.ndarray:
+        """Stream-filter incoming samples ahead of run(..., prefiltered=True)"""
+        start = time.perf_counter()
+        eeg_data = self.filter_bank.stream(eeg_data)
+        elapsed = time.perf_counter() - start
+        self._record(self.filter_stage.name, elapsed)
+        self._prefilter_time += elapsed
+        return eeg_data
+
+    def run(
+        self,
+        eeg_data: np.ndarray,
+        aux_data: np.ndarray,
+        window_seconds: float = None,
+        overlap: float = 0.5,
+        prefiltered: bool = False,
+    ):
+        """
+        Runs every stage on one block of raw samples.
+
+        Args:
+            eeg_data: (n_eeg_channels, n_samples)
+            aux_data: (n_aux_rows, n_aux_samples), accel in rows 0–2, gyro in 3–5
+            window_seconds: None for one bandpower row over the whole block,
+                otherwise sliding windows of this length
+            overlap: fraction of overlap between adjacent windows
+            prefiltered: eeg_data already went through prefilter()
+
+        Returns:
+            dict with "eeg_data", "band_powers" (n_windows, 5), "gyro_mean",
+            "accel_mean", or None if the block was rejected.
+        """
+        self.last_timings = {}
+        self.last_rejection = None
+        if prefiltered:
+            # Filtering happened in prefilter() calls since the previous run
+            self.last_timings[self.filter_stage.name] = self._prefilter_time
+        self._prefilter_time = 0.0
+
+        if eeg_data.shape[1] < self.min_samples:
+            print(f"⚠️ Not enough EEG samples ({eeg_data.shape[1]}). Skipping burst.")
+            self.last_rejection = "too_few_samples"
+            return None
+
+        burst = {
+            "eeg_data": eeg_data,
+            "aux_data": aux_data,
+            "window_seconds": window_seconds,
+            "overlap": overlap,
+            "prefiltered": prefiltered,
+        }
+        for stage in self.stages:
+            start = time.perf_counter()
+            burst = stage(burst)
+            if not (prefiltered and stage is self.filter_stage):
+                self._record(stage.name, time.perf_counter() - start)
+            if burst is None:
+                self.last_rejection = stage.name
+                return None
+
+        return {
+            "eeg_data": burst["eeg_data"],
+            "band_powers": burst["band_powers"],
+            "gyro_mean": burst["gyro_mean"],
+            "accel_mean": burst["accel_mean"],
+        }
+
+    def reset(self):
+        """Forget streaming filter state (new stream or a gap in the data)"""
+        self.filter_bank.reset()
+
+    def timing_summary(self) -> dict:
+        """{stage: {"last_ms", "mean_ms", "count"}}"""
+        return {
+            name: {
+                "last_ms": self.last_timings.get(name, 0.0) * 1e3,
+                "mean_ms": total / max(self.stage_counts[name], 1) * 1e3,
+                "count": self.stage_counts[name],
+            }
+            for name, total in self.total_timings.items()
+        }
+
+    def _record(self, name: str, elapsed: float):
+        self.last_timings[name] = self.last_timings.get(name, 0.0) + elapsed
+        self.total_timings[name] += elapsed
+        self.stage_counts[name] += 1
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import threading
+
+
+class FocusStreamServer:
+    """
+    Server-Sent Events push of every published inference result.
+
+    Runs an asyncio HTTP server on its own port in a single background
+    thread, so any number of subscribers cost one coroutine each instead of
+    one server thread. publish() may be called from any thread; each client
+    is sent the newest result as soon as it is published. The newest result
+    is kept per "device" (several headsets, see session_manager.py), so a
+    client that can't keep up skips straight to each device's latest result
+    rather than building a backlog, but never misses a device.
+
+        GET /focus_stream  →  text/event-stream, one `data: {...}` per result
+    """
+
+    path = "/focus_stream"
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5002, heartbeat: float = 15.0):
+        """
+        Args:
+            host, port: where to listen
+            heartbeat: seconds between keep-alive comments on idle streams
+        """
+        self.host = host
+        self.port = port
+        self.heartbeat = heartbeat
+        self.n_subscribers = 0
+        self.n_published = 0
+
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._seq = 0
+        self._latest = {}  # device → (seq, encoded SSE event of its newest result)
+        self._new_result = None  # asyncio.Event, replaced after every publish
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._serve, name="focus-stream", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+        print(f"✅ Focus stream at http://{self.host}:{self.port}{self.path}")
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+    def publish(self, result: dict):
+        """Thread-safe: push `result` (JSON-serializable) to every subscriber"""
+        if self._loop is None:
+            return
+        payload = json.dumps(result)
+        self._loop.call_soon_threadsafe(self._publish, result.get("device"), payload)
+
+    # --- Event loop side ---
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._new_result = asyncio.Event()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port)
+        )
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            # Drop every open stream before closing the loop
+            self._server.close()
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.close()
+
+    def _publish(self, device, payload: str):
+        self._seq += 1
+        self.n_published += 1
+        self._latest[device] = (self._seq, f"id: {self._seq}\ndata: {payload}\n\n".encode())
+        event, self._new_result = self._new_result, asyncio.Event()
+        event.set()
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()).strip():
+                pass  # Headers are not needed
+
+            parts = request_line.decode(errors="replace").split()
+            if len(parts) < 2 or parts[0] != "GET" or parts[1].split("?")[0] != self.path:
+                writer.write(
+                    b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+                )
+                await writer.drain()
+                return
+
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/event-stream\r\n"
+                b"Cache-Control: no-cache\r\n"
+                b"Connection: keep-alive\r\n"
+                b"Access-Control-Allow-Origin: *\r\n\r\n"
+                b"retry: 1000\n\n"
+            )
+            await writer.drain()
+            await self._stream(writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # Client went away
+        except asyncio.CancelledError:
+            pass  # Server stopping
+        finally:
+            writer.close()
+
+    async def _stream(self, writer):
+        self.n_subscribers += 1
+        try:
+            sent = 0
+            while True:
+                if self._seq > sent:
+                    # Each device's newest result: intermediate ones are superseded
+                    events = sorted(latest for latest in self._latest.values() if latest[0] > sent)
+                    sent = self._seq
+                    writer.write(b"".join(event for _, event in events))
+                    await writer.drain()
+
+                event = self._new_result
+                try:
+                    await asyncio.wait_for(event.wait(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    writer.write(b": keep-alive\n\n")
+                    await writer.drain()
+        finally:
+            self.n_subscribers -= 1
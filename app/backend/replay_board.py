@@ -0,0 +1,264 @@
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+from brainflow.board_shim import BoardShim, BrainFlowInputParams, BrainFlowPresets
+
+DEFAULT = BrainFlowPresets.DEFAULT_PRESET
+AUXILIARY = BrainFlowPresets.AUXILIARY_PRESET
+
+
+class ReplayClock:
+    """
+    Time source shared by a ReplayBoard and whoever consumes it.
+
+    speed=1.0 runs in real time, speed=N at N× real time (sleeps are shortened),
+    and speed=None as fast as possible: sleep() just advances the virtual time,
+    so runs are fully deterministic.
+    """
+
+    def __init__(self, speed=1.0):
+        if speed is not None and speed <= 0:
+            raise ValueError(f"speed must be positive or None, got {speed}")
+        self.speed = speed
+        self._wall_start = time.monotonic()
+        self._virtual = 0.0
+
+    def monotonic(self) -> float:
+        if self.speed is None:
+            return self._virtual
+        return (time.monotonic() - self._wall_start) * self.speed
+
+    def sleep(self, seconds: float):
+        if seconds <= 0:
+            return
+        if self.speed is None:
+            self._virtual += seconds
+        else:
+            time.sleep(seconds / self.speed)
+
+
+class ReplayBoard:
+    """
+    Stand-in for BoardShim that streams a recording instead of a headset.
+
+    Exposes the subset of the BoardShim interface the Muse scripts use
+    (get_board_data with presets, channel/rate lookups, start/stop stream),
+    and hands out samples as the clock advances, like a live board buffer.
+
+    Recordings hold the raw preset arrays exactly as get_board_data returned
+    them, so rows keep the board's layout (package counter, channels,
+    timestamps).
+    """
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        aux_data: np.ndarray,
+        eeg_channels,
+        sampling_rate: int,
+        aux_sampling_rate: int,
+        speed=1.0,
+        loop: bool = True,
+    ):
+        self.presets = {
+            DEFAULT: (np.asarray(data, dtype=np.float64), sampling_rate),
+            AUXILIARY: (np.asarray(aux_data, dtype=np.float64), aux_sampling_rate),
+        }
+        self.eeg_channels = list(eeg_channels)
+        self.loop = loop
+        self.clock = ReplayClock(speed)
+        self._cursors = {DEFAULT: 0, AUXILIARY: 0}
+        self._stream_start = None
+
+    @classmethod
+    def from_file(cls, path, speed=1.0, loop: bool = True):
+        """Load a recording saved with save_recording()"""
+        rec = np.load(path)
+        return cls(
+            rec["data"],
+            rec["aux_data"],
+            rec["eeg_channels"],
+            int(rec["sampling_rate"]),
+            int(rec["aux_sampling_rate"]),
+            speed=speed,
+            loop=loop,
+        )
+
+    @classmethod
+    def from_synthetic(cls, seconds: float = 60.0, seed: int = 0, speed=None, loop=True):
+        """Replay synthetic_recording(); as fast as possible by default (CI)"""
+        return cls(**synthetic_recording(seconds, seed), speed=speed, loop=loop)
+
+    # --- BoardShim interface ---
+
+    def prepare_session(self):
+        pass
+
+    def release_session(self):
+        pass
+
+    def start_stream(self, *args, **kwargs):
+        self._stream_start = self.clock.monotonic()
+        self._cursors = {DEFAULT: 0, AUXILIARY: 0}
+
+    def stop_stream(self):
+        self._stream_start = None
+
+    def get_eeg_channels(self, board_id=None, preset=DEFAULT):
+        return self.eeg_channels
+
+    def get_sampling_rate(self, board_id=None, preset=DEFAULT):
+        return self.presets[preset][1]
+
+    def get_num_rows(self, board_id=None, preset=DEFAULT):
+        return self.presets[preset][0].shape[0]
+
+    def get_board_data_count(self, preset=DEFAULT):
+        """Samples 'recorded' and not yet drained by get_board_data"""
+        data, rate = self.presets[preset]
+        if self._stream_start is None:
+            return 0
+        available = int((self.clock.monotonic() - self._stream_start) * rate)
+        if not self.loop:
+            available = min(available, data.shape[1])
+        return max(available - self._cursors[preset], 0)
+
+    def get_board_data(self, num_samples=None, preset=DEFAULT):
+        """Drain every sample 'recorded' since the last call (or the oldest num_samples)"""
+        data, rate = self.presets[preset]
+        if self._stream_start is None:
+            return np.empty((data.shape[0], 0))
+
+        available = int((self.clock.monotonic() - self._stream_start) * rate)
+        if not self.loop:
+            available = min(available, data.shape[1])
+
+        start = self._cursors[preset]
+        stop = available if num_samples is None else min(available, start + num_samples)
+        self._cursors[preset] = max(stop, start)
+
+        idx = np.arange(start, stop)
+        if self.loop:
+            idx %= data.shape[1]
+        return data[:, idx]
+
+    # --- Replay helpers ---
+
+    @property
+    def exhausted(self) -> bool:
+        """True once a non-looping replay has handed out every EEG sample"""
+        data, _ = self.presets[DEFAULT]
+        return not self.loop and self._cursors[DEFAULT] >= data.shape[1]
+
+    @property
+    def duration(self) -> float:
+        data, rate = self.presets[DEFAULT]
+        return data.shape[1] / rate
+
+
+def synthetic_recording(seconds: float = 60.0, seed: int = 0) -> dict:
+    """
+    Deterministic Muse 2 shaped recording (same rows as board 38's presets).
+
+    EEG: theta/alpha/beta sines plus noise on TP9, AF7, AF8, TP10.
+    AUX: accel ≈ (0, 0, 1) g and small gyro noise; row 0 is the package
+    counter, advancing once per 3-sample packet like the real AUX stream.
+    """
+    rng = np.random.default_rng(seed)
+    descr = BoardShim.get_board_descr(38, DEFAULT)
+    aux_descr = BoardShim.get_board_descr(38, AUXILIARY)
+
+    rate = descr["sampling_rate"]
+    n = int(seconds * rate)
+    t = np.arange(n) / rate
+    data = np.zeros((descr["num_rows"], n))
+    data[descr["package_num_channel"]] = np.arange(n) // 12
+    for i, ch in enumerate(descr["eeg_channels"]):
+        data[ch] = (
+            8.0 * np.sin(2 * np.pi * 6.0 * t + i)
+            + 12.0 * np.sin(2 * np.pi * 10.0 * t + 2 * i)
+            + 5.0 * np.sin(2 * np.pi * 20.0 * t + 3 * i)
+            + rng.normal(0.0, 5.0, n)
+        )
+    data[descr["timestamp_channel"]] = t
+
+    aux_rate = aux_descr["sampling_rate"]
+    n_aux = int(seconds * aux_rate)
+    aux_data = np.zeros((aux_descr["num_rows"], n_aux))
+    aux_data[aux_descr["package_num_channel"]] = np.arange(n_aux) // 3
+    for ch, g in zip(aux_descr["accel_channels"], (0.0, 0.0, 1.0)):
+        aux_data[ch] = g + rng.normal(0.0, 0.01, n_aux)
+    for ch in aux_descr["gyro_channels"]:
+        aux_data[ch] = rng.normal(0.0, 1.0, n_aux)
+    aux_data[aux_descr["timestamp_channel"]] = np.arange(n_aux) / aux_rate
+
+    return {
+        "data": data,
+        "aux_data": aux_data,
+        "eeg_channels": descr["eeg_channels"],
+        "sampling_rate": rate,
+        "aux_sampling_rate": aux_rate,
+    }
+
+
+def capture_recording(board: BoardShim, board_id: int, seconds: float) -> dict:
+    """Stream `seconds` of raw data from a live board (Muse or BrainFlow's synthetic board)"""
+    board.start_stream()
+    time.sleep(seconds)
+    data = board.get_board_data()
+    aux_data = board.get_board_data(preset=AUXILIARY)
+    board.stop_stream()
+
+    return {
+        "data": data,
+        "aux_data": aux_data,
+        "eeg_channels": BoardShim.get_eeg_channels(board_id),
+        "sampling_rate": BoardShim.get_sampling_rate(board_id),
+        "aux_sampling_rate": BoardShim.get_sampling_rate(board_id, AUXILIARY),
+    }
+
+
+def save_recording(path, recording: dict):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(path, **recording)
+    print(f"Recording saved to {path}")
+
+
+def main():
+    """Capture a replayable recording: python replay_board.py out.npz --seconds 60"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("output", help="Path of the .npz recording to write")
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument(
+        "--source",
+        choices=["muse", "brainflow-synthetic", "synthetic"],
+        default="muse",
+        help="Muse 2 on muse.com_port, BrainFlow's synthetic board, or generated data",
+    )
+    args = parser.parse_args()
+
+    if args.source == "synthetic":
+        save_recording(args.output, synthetic_recording(args.seconds))
+        return
+
+    params = BrainFlowInputParams()
+    if args.source == "muse":
+        from config_loader import load_config
+
+        board_id = 38
+        params.serial_port = load_config().muse.com_port
+    else:
+        board_id = -1  # BoardIds.SYNTHETIC_BOARD
+
+    board = BoardShim(board_id, params)
+    board.prepare_session()
+    try:
+        save_recording(args.output, capture_recording(board, board_id, args.seconds))
+    finally:
+        board.release_session()
+
+
+if __name__ == "__main__":
+    main()
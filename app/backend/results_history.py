@@ -0,0 +1,185 @@
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from session_recorder import result_row
+
+
+class ResultsHistory:
+    """
+    Every result of a session, in fixed memory.
+
+    Results are flattened (session_recorder.result_row) into one typed column
+    per field: float64 for values, int64 for counters, and int16 codes for
+    strings such as class labels. The newest `memory_rows` results live in
+    preallocated arrays; when those are full the block is appended to one
+    raw binary file per column in `spill_path` (a new directory per history,
+    under `spill_dir`), so reading a range back only reads that range from
+    disk.
+
+        history.append(result)    # or append_row(result_row(result, labels))
+        history.read(-100)        # {column: array} of the last 100 results
+        history.rows(0, 10)       # first 10 results as flat dicts
+    """
+
+    def __init__(self, labels, memory_rows: int = 4096, spill_dir=None):
+        """
+        Args:
+            labels: class labels, as in the "class_probs" dict of a result
+            memory_rows: results kept in memory before spilling to disk
+            spill_dir: directory under which each history spills into its
+                own timestamped subdirectory, kept afterwards (default: a
+                temporary directory, created on the first spill and removed
+                with the history)
+        """
+        self.labels = labels
+        self.memory_rows = memory_rows
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self.spill_path = None  # This history's column files, set on the first spill
+        self._tmp_dir = None
+
+        self.columns = None  # {name: dtype}, fixed by the first result
+        self._categories = {}  # String columns: {name: [value, ...]} (code = index)
+        self._block = None
+        self._n_block = 0
+        self._n_spilled = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._n_spilled + self._n_block
+
+    def append(self, result: dict):
+        """Store one run_realtime_inference_generator() result"""
+        self.append_row(result_row(result, self.labels))
+
+    def append_row(self, row: dict):
+        """Store one result already flattened by session_recorder.result_row"""
+        with self._lock:
+            if self.columns is None:
+                self._init_columns(row)
+            for name, column in self._block.items():
+                value = row.get(name)
+                if name in self._categories:
+                    value = self._code(name, value)
+                elif value is None:
+                    value = np.nan if column.dtype.kind == "f" else 0
+                column[self._n_block] = value
+            self._n_block += 1
+            if self._n_block == self.memory_rows:
+                self._spill()
+
+    def read(self, start: int = 0, stop: int = None) -> dict:
+        """
+        {column: array} for results[start:stop] (Python slice semantics, so
+        negative indices count from the newest). String columns come back as
+        object arrays of the original values.
+        """
+        with self._lock:
+            start, stop, _ = slice(start, stop).indices(len(self))
+            stop = max(start, stop)
+            if self.columns is None:
+                return {}
+
+            out = {}
+            for name, dtype in self.columns.items():
+                parts = []
+                if start < self._n_spilled:
+                    parts.append(self._read_spilled(name, dtype, start, min(stop, self._n_spilled)))
+                if stop > self._n_spilled:
+                    lo = max(start - self._n_spilled, 0)
+                    parts.append(self._block[name][lo : stop - self._n_spilled].copy())
+                if not parts:
+                    values = np.empty(0, dtype=dtype)
+                else:
+                    values = np.concatenate(parts) if len(parts) > 1 else parts[0]
+                if name in self._categories:
+                    values = np.asarray(self._categories[name], dtype=object)[values]
+                out[name] = values
+            return out
+
+    def rows(self, start: int = 0, stop: int = None) -> list:
+        """results[start:stop] as flat dicts (see session_recorder.result_row)"""
+        columns = self.read(start, stop)
+        if not columns:
+            return []
+        names = list(columns)
+        return [
+            dict(zip(names, values))
+            for values in zip(*(columns[name].tolist() for name in names))
+        ]
+
+    def close(self):
+        """Drop the temporary spill directory, if one was created (forgetting the results in it)"""
+        with self._lock:
+            if self._tmp_dir is not None:
+                self._tmp_dir.cleanup()
+                self._tmp_dir = None
+                self.spill_path = None
+                self._n_spilled = 0
+
+    def _init_columns(self, row: dict):
+        self.columns = {}
+        for name, value in row.items():
+            if isinstance(value, str):
+                self._categories[name] = []
+                self.columns[name] = np.dtype(np.int16)
+            elif isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+                self.columns[name] = np.dtype(np.int64)
+            else:
+                self.columns[name] = np.dtype(np.float64)
+        self._block = {
+            name: np.zeros(self.memory_rows, dtype=dtype)
+            for name, dtype in self.columns.items()
+        }
+
+    def _code(self, name: str, value) -> int:
+        categories = self._categories[name]
+        try:
+            return categories.index(value)  # A handful of labels: a list is fastest
+        except ValueError:
+            categories.append(value)
+            return len(categories) - 1
+
+    def _column_path(self, name: str) -> Path:
+        return self._spill_path() / f"col_{list(self.columns).index(name):03d}.bin"
+
+    def _spill_path(self) -> Path:
+        if self.spill_path is None:
+            if self.spill_dir is None:
+                self._tmp_dir = tempfile.TemporaryDirectory(prefix="results_history_")
+                self.spill_path = Path(self._tmp_dir.name)
+            else:
+                # A fresh directory per session: earlier sessions' files are never touched
+                self.spill_dir.mkdir(parents=True, exist_ok=True)
+                self.spill_path = Path(
+                    tempfile.mkdtemp(prefix=time.strftime("%Y%m%d-%H%M%S-"), dir=self.spill_dir)
+                )
+        return self.spill_path
+
+    def _spill(self):
+        """Append the in-memory block to the column files and start a new one"""
+        for name, column in self._block.items():
+            with open(self._column_path(name), "ab") as f:
+                f.write(column[: self._n_block].tobytes())
+        self._n_spilled += self._n_block
+        self._n_block = 0
+
+        # Schema next to the columns, so a spill directory can be read on its own
+        schema = {
+            "rows": self._n_spilled,
+            "columns": {name: dtype.str for name, dtype in self.columns.items()},
+            "categories": self._categories,
+        }
+        (self._spill_path() / "schema.json").write_text(json.dumps(schema))
+
+    def _read_spilled(self, name: str, dtype, start: int, stop: int) -> np.ndarray:
+        return np.fromfile(
+            self._column_path(name),
+            dtype=dtype,
+            count=stop - start,
+            offset=start * dtype.itemsize,
+        )
@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-capacity per-channel sample buffer for streaming acquisition.
+
+    Samples are stored as a (n_channels, capacity) array and overwritten
+    oldest-first once the buffer is full, so memory stays constant no matter
+    how long the stream runs.
+    """
+
+    def __init__(self, n_channels: int, capacity: int, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.n_channels = n_channels
+        self.capacity = capacity
+        self._data = np.zeros((n_channels, capacity), dtype=dtype)
+        self._write_pos = 0
+        self._size = 0
+        self.total_written = 0  # Samples ever appended (monotonic)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def is_full(self) -> bool:
+        return self._size == self.capacity
+
+    def extend(self, block: np.ndarray):
+        """Append a (n_channels, n_samples) block, dropping the oldest samples if needed."""
+        if block.ndim != 2 or block.shape[0] != self.n_channels:
+            raise ValueError(
+                f"Expected block of shape ({self.n_channels}, n), got {block.shape}"
+            )
+
+        n = block.shape[1]
+        if n == 0:
+            return
+        self.total_written += n
+
+        # Only the newest `capacity` samples can survive
+        if n >= self.capacity:
+            self._data[:] = block[:, -self.capacity :]
+            self._write_pos = 0
+            self._size = self.capacity
+            return
+
+        end = self._write_pos + n
+        if end <= self.capacity:
+            self._data[:, self._write_pos : end] = block
+        else:
+            first = self.capacity - self._write_pos
+            self._data[:, self._write_pos :] = block[:, :first]
+            self._data[:, : n - first] = block[:, first:]
+        self._write_pos = end % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def latest(self, n_samples: int) -> np.ndarray:
+        """Return a contiguous copy of the newest `n_samples` in chronological order."""
+        n_samples = min(n_samples, self._size)
+        start = (self._write_pos - n_samples) % self.capacity
+        end = start + n_samples
+        if end <= self.capacity:
+            return self._data[:, start:end].copy()
+        return np.concatenate(
+            (self._data[:, start:], self._data[:, : end - self.capacity]), axis=1
+        )
+
+    def segments(self):
+        """
+        The stored samples in chronological order as at most two views (no copy).
+        Views are only valid until the next extend().
+        """
+        start = (self._write_pos - self._size) % self.capacity
+        if start + self._size <= self.capacity:
+            return [self._data[:, start : start + self._size]]
+        return [self._data[:, start:], self._data[:, : self._write_pos]]
+
+    def clear(self):
+        self._write_pos = 0
+        self._size = 0
+        self.total_written = 0
@@ -0,0 +1,224 @@
+import threading
+import time
+
+import torch
+
+from bandpower import BAND_NAMES
+from bounded_queue import DropOldestQueue
+from muse_streaming import ERRORS, PUBLISH_LAG, MuseRealtimeInference, load_model, make_recorder
+from replay_board import ReplayBoard
+from session_recorder import result_row
+from shared_state import publish
+
+
+class MuseSessionManager:
+    """
+    Several Muse headsets on one host, sharing one model.
+
+    Each device gets its own MuseRealtimeInference running acquisition and
+    preprocessing in a thread. Whenever windows are ready, the manager packs
+    all of them into one (n_ready, 11) batch and runs a single
+    MultiTaskEEGModel forward, so inference cost grows with ticks rather than
+    with the number of headsets.
+    """
+
+    def __init__(self, model, cfg, devices):
+        """
+        Args:
+            model: MultiTaskEEGModel in eval mode, shared by every device
+            cfg: full config (muse.* settings apply to every device)
+            devices: list of {"name", "com_port"} or {"name", "replay_file"}
+        """
+        self.model = model
+        self.cfg = cfg
+        self.device_cfgs = {device["name"]: device for device in devices}
+        self.devices = {
+            name: MuseRealtimeInference(device.get("com_port"), model, cfg)
+            for name, device in self.device_cfgs.items()
+        }
+
+        # Latest clean window per device (drop-oldest: only the freshest matters)
+        self.queues = {name: DropOldestQueue(1) for name in self.devices}
+        self._ready = threading.Event()
+
+        # Preallocated batch input, one row per device
+        self._feature_tensor = torch.zeros(len(self.devices), 11)
+        self._feature_array = self._feature_tensor.numpy()
+        self._lengths = torch.zeros(len(self.devices))
+
+        self.batch_sizes = []  # Devices per forward, for monitoring
+        self.iterations = dict.fromkeys(self.devices, 0)
+
+    def connect(self, retry_seconds: float = 2.0):
+        """Connects every device, retrying headsets until they respond"""
+        for name, muse in self.devices.items():
+            device = self.device_cfgs[name]
+            if device.get("replay_file"):
+                muse.connect_replay(
+                    ReplayBoard.from_file(
+                        device["replay_file"],
+                        speed=self.cfg.muse.replay_speed,
+                        loop=self.cfg.muse.get("replay_loop", True),
+                    )
+                )
+                print(f"🔁 {name}: replaying {device['replay_file']}")
+                continue
+
+            while not muse.connect_muse():
+                print(f"{name}: retrying in {retry_seconds} seconds...")
+                time.sleep(retry_seconds)
+            print(f"✅ {name}: connected on {device['com_port']}")
+
+    def run_generator(self, burst_duration: float = 1.0, hop_duration: float = None):
+        """
+        Yields (device_name, result) for every prediction, in the same result
+        format as MuseRealtimeInference.run_realtime_inference_generator().
+        """
+        stop = threading.Event()
+        workers = [
+            threading.Thread(
+                target=self._device_worker,
+                args=(name, stop, burst_duration, hop_duration),
+                name=f"muse-{name}",
+                daemon=True,
+            )
+            for name in self.devices
+        ]
+        for worker in workers:
+            worker.start()
+
+        self.iterations = dict.fromkeys(self.devices, 0)
+        try:
+            while not all(queue.drained for queue in self.queues.values()):
+                # Woken by any device; everything ready by then shares the forward
+                self._ready.wait(timeout=0.1)
+                self._ready.clear()
+
+                ready = []
+                for name, queue in self.queues.items():
+                    item = queue.get(timeout=0)
+                    if item is not None:
+                        ready.append((name, *item))
+                if not ready:
+                    continue
+
+                yield from self._predict_batch(ready)
+
+        except KeyboardInterrupt:
+            print("🛑 Stopping multi-headset inference...")
+
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+    def _device_worker(self, name, stop, burst_duration, hop_duration):
+        """Acquisition + preprocessing for one headset"""
+        muse = self.devices[name]
+        bursts = muse.iter_clean_bursts(burst_duration, hop_duration)
+        try:
+            for burst in bursts:
+                if stop.is_set():
+                    break
+                self.queues[name].put((burst, muse.last_timings))
+                self._ready.set()
+        except Exception as e:
+            print(f"❌ {name}: acquisition failed: {e}")
+        finally:
+            bursts.close()  # Stops the device's stream
+            self.queues[name].close()
+            self._ready.set()
+
+    def _predict_batch(self, ready):
+        """One forward for every (name, burst, timings) in `ready`"""
+        n = len(ready)
+        self.batch_sizes.append(n)
+
+        start = time.perf_counter()
+        for row, (_, burst, _) in enumerate(ready):
+            MuseRealtimeInference.write_features(
+                self._feature_array[row],
+                burst["band_powers"],
+                burst["gyro_mean"],
+                burst["accel_mean"],
+            )
+            self._lengths[row] = burst["eeg_data"].shape[1]
+        tensor_build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            with torch.no_grad():
+                class_out, reg_out = self.model.forward_constant(
+                    self._feature_tensor[:n], self._lengths[:n]
+                )
+                probs = torch.softmax(class_out, dim=1)
+        except Exception as e:
+            print(f"❌ Model inference failed: {e}")
+            ERRORS.inc(n, stage="inference")
+            return []
+        forward = time.perf_counter() - start
+
+        results = []
+        for row, (name, burst, timings) in enumerate(ready):
+            muse = self.devices[name]
+            muse.last_timings = timings
+            muse._add_timing("tensor_build", tensor_build)
+            muse._add_timing("forward", forward)
+            class_probs, class_label, reg_output, feature_dict = muse.decode_prediction(
+                probs[row],
+                reg_out[row],
+                burst["band_powers"],
+                burst["gyro_mean"],
+                burst["accel_mean"],
+            )
+            result = muse._make_result(
+                self.iterations[name], class_probs, class_label, reg_output, feature_dict
+            )
+            result["batch_size"] = n
+            self.iterations[name] += 1
+            results.append((name, result))
+        return results
+
+    def queue_stats(self) -> dict:
+        """{device: {"depth", "maxsize", "put", "dropped"}}"""
+        return {name: queue.stats() for name, queue in self.queues.items()}
+
+    def disconnect(self):
+        for muse in self.devices.values():
+            muse.disconnect_muse()
+
+
+def start_multi_muse_inference(latest_focus_data, cfg, model=None, on_result=None):
+    """
+    start_muse_inference() for `muse.devices`: publishes each headset's
+    latest result under its own key, e.g. latest_focus_data["muse-1"].
+    `on_result` gets each snapshot with a "device" key added.
+    """
+    if model is None:
+        model = load_model(cfg)
+
+    manager = MuseSessionManager(model, cfg, cfg.muse.devices)
+    manager.connect()
+
+    print(f"🎧 Starting inference for {len(manager.devices)} headsets...")
+    recorder = make_recorder(cfg)
+    try:
+        for name, result in manager.run_generator(
+            burst_duration=cfg.muse.window_seconds, hop_duration=cfg.muse.hop_seconds
+        ):
+            snapshot = {
+                "class_label": result["class_label"],
+                "probabilities": result["class_probs"],
+                "reg_output": result["reg_output"],
+                "band_powers": {band: result["features"][band] for band in BAND_NAMES},
+                "timestamp": result["timestamp"],
+            }
+            publish(latest_focus_data, {name: snapshot})
+            PUBLISH_LAG.observe(time.time() - result["timestamp"])
+            if on_result is not None:
+                on_result({"device": name, **snapshot})
+            if recorder is not None:
+                recorder.append({"device": name, **result_row(result, MuseRealtimeInference.labels)})
+    finally:
+        if recorder is not None:
+            recorder.close()
@@ -0,0 +1,128 @@
+import datetime
+import os
+import threading
+from pathlib import Path
+
+from focus_history import REG_NAMES
+
+
+def result_row(result: dict, labels) -> dict:
+    """
+    Flattens one run_realtime_inference_generator() result into a row of
+    scalars: timestamp, iteration, class_label, one column per class
+    probability and regression output, then the feature columns.
+    """
+    row = {
+        "timestamp": result["timestamp"],
+        "iteration": result["iteration"],
+        "class_label": result["class_label"],
+    }
+    for label in labels:
+        row[f"p_{label}"] = result["class_probs"].get(label)
+    reg_output = result["reg_output"]
+    for i, name in enumerate(REG_NAMES):
+        row[f"reg_{name}"] = reg_output[i] if i < len(reg_output) else None
+    for name, value in result["features"].items():
+        row[name] = value.item() if hasattr(value, "item") else value
+    return row
+
+
+class SessionRecorder:
+    """
+    Records inference results of one session as Parquet, off the acquisition
+    thread.
+
+    append() only adds the row to an in-memory buffer. A background thread
+    swaps the buffer out whenever it holds `flush_rows` rows, and at least
+    every `flush_seconds`, and writes it as one part file of the session
+    directory:
+
+        <root>/session_<YYYY-mm-dd_HH-MM-SS>/part-00000.parquet, part-00001...
+
+    Each part is written under a hidden temporary name and renamed into
+    place, so readers (pd.read_parquet(recorder.path)) only ever see
+    complete files, and a crash loses at most the rows not yet flushed.
+    """
+
+    def __init__(self, root, flush_rows: int = 256, flush_seconds: float = 5.0, session: str = None):
+        """
+        Args:
+            root: directory the session directories are created in
+            flush_rows: write as soon as this many rows are buffered
+            flush_seconds: ...and at least this often
+            session: session name (default: start time)
+        """
+        session = session or datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        self.path = Path(root) / f"session_{session}"
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.rows_written = 0
+        self.parts_written = 0
+
+        self._rows = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = None
+
+    def start(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._flush_loop, name="session-recorder", daemon=True
+        )
+        self._thread.start()
+        print(f"📝 Recording session to {self.path}")
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, row: dict):
+        """Buffer one row (dict of scalars); never touches the disk"""
+        with self._lock:
+            self._rows.append(row)
+            n = len(self._rows)
+        if n >= self.flush_rows:
+            self._wake.set()
+
+    def close(self):
+        """Flush what's left and stop the background thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _flush_loop(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self._flush()
+            if self._closed:
+                self._flush()  # Rows appended while closing
+                return
+
+    def _flush(self):
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if not rows:
+            return
+
+        part = self.path / f"part-{self.parts_written:05d}.parquet"
+        tmp = part.with_name(f".{part.name}.tmp")  # Hidden from readers
+        try:
+            import pandas as pd  # Not needed until the first flush
+
+            pd.DataFrame(rows).to_parquet(tmp, index=False)
+            os.replace(tmp, part)
+        except Exception as e:
+            print(f"❌ Failed to write {part}: {e}")
+            with self._lock:
+                self._rows[:0] = rows  # Retry with the next flush
+            return
+        self.parts_written += 1
+        self.rows_written += len(rows)
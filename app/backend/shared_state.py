@@ -0,0 +1,207 @@
+import json
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+
+
+class ResultSnapshot:
+    """
+    Latest published result, shared between threads of one process.
+
+    publish() builds a new dict, encodes it to JSON once, and swaps both in
+    with a single reference assignment, so readers always see one complete
+    result (never a mix of old and new fields) and never take a lock.
+    Published dicts are never mutated afterwards; treat what read() returns
+    as read-only.
+    """
+
+    def __init__(self, initial: dict = None):
+        self._write_lock = threading.Lock()  # Serializes writers only
+        self._state = (-1, {}, b"{}")  # (version, data, JSON payload)
+        self.publish(initial or {})
+
+    def publish(self, fields: dict):
+        """Atomically merge `fields` into the snapshot"""
+        with self._write_lock:
+            version, data, _ = self._state
+            data = {**data, **fields}
+            self._state = (version + 1, data, json.dumps(data).encode())
+
+    def read(self) -> dict:
+        return self._state[1]
+
+    def read_bytes(self):
+        """(version, JSON payload) of the current snapshot, encoded at publish time"""
+        version, _, payload = self._state
+        return version, payload
+
+    @property
+    def version(self) -> int:
+        """Increments on every publish"""
+        return self._state[0]
+
+    def get(self, key, default=None):
+        return self._state[1].get(key, default)
+
+    def __getitem__(self, key):
+        return self._state[1][key]
+
+
+class SharedMemorySnapshot:
+    """
+    ResultSnapshot for readers in other processes, backed by shared memory.
+
+    The result is stored as JSON in a fixed-size block guarded by a seqlock:
+    the (single) writer makes the sequence number odd, writes the payload,
+    then makes it even again, and readers retry until they copy the payload
+    under the same even sequence number. Reads don't block the writer or
+    each other, and a reader re-decodes only when the version changed.
+
+    A writer killed mid-update (terminate(), SIGKILL, OOM) leaves the
+    sequence number odd. Readers then give up after `read_timeout` seconds
+    and serve the last payload they copied, and the next writer to attach
+    makes the sequence number even again before publishing.
+
+    Layout: seq (u64) | payload length (u32) | padding | JSON payload
+    """
+
+    HEADER = struct.Struct("<QI")
+    PAYLOAD_OFFSET = 16
+
+    def __init__(
+        self,
+        name: str = None,
+        create: bool = True,
+        capacity: int = 64 * 1024,
+        initial: dict = None,
+        read_timeout: float = 0.05,
+    ):
+        """
+        Args:
+            name: shared memory block name (random if None and create=True)
+            create: allocate a new block (writer side) or attach to `name`
+            capacity: max JSON payload bytes
+            initial: first snapshot (create=True only)
+            read_timeout: seconds a read waits for a consistent snapshot
+        """
+        if create:
+            self._shm = shared_memory.SharedMemory(
+                name, create=True, size=self.PAYLOAD_OFFSET + capacity
+            )
+        else:
+            self._shm = shared_memory.SharedMemory(name)
+        self._owner = create
+        self.read_timeout = read_timeout
+        self.capacity = self._shm.size - self.PAYLOAD_OFFSET
+
+        self._data = {}  # Writer: current fields. Reader: cached decode
+        self._cached_seq = -1
+        self._bytes = (-1, b"")  # (seq, payload) last copied out by read_bytes
+        self._stuck_seq = None  # Odd seq a read already timed out on
+        if create:
+            self.HEADER.pack_into(self._shm.buf, 0, 0, 0)
+            self._cached_seq = 0
+            self.publish(initial or {})
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def __reduce__(self):
+        # Pickles (e.g. into a multiprocessing.Process) as an attached reader/writer
+        return (self.__class__, (self.name, False, 0, None, self.read_timeout))
+
+    def publish(self, fields: dict):
+        """Merge `fields` and write the whole snapshot (one writer process only)"""
+        buf = self._shm.buf
+        if self._cached_seq < 0:
+            # Attached writer: start from what's in the block
+            seq = self.HEADER.unpack_from(buf, 0)[0]
+            if seq % 2:
+                # The previous writer died mid-update and the payload may be
+                # torn: make the block consistent again and start from scratch
+                struct.pack_into("<Q", buf, 0, seq + 1)
+                self._cached_seq = seq + 1
+            else:
+                self.read()
+        data = {**self._data, **fields}
+        payload = json.dumps(data).encode()
+        if len(payload) > self.capacity:
+            raise ValueError(
+                f"Snapshot is {len(payload)} bytes, capacity is {self.capacity}"
+            )
+
+        seq = self.HEADER.unpack_from(buf, 0)[0]
+        struct.pack_into("<Q", buf, 0, seq + 1)  # Odd: write in progress
+        buf[self.PAYLOAD_OFFSET : self.PAYLOAD_OFFSET + len(payload)] = payload
+        self.HEADER.pack_into(buf, 0, seq + 1, len(payload))
+        struct.pack_into("<Q", buf, 0, seq + 2)  # Even: consistent again
+        self._data, self._cached_seq = data, seq + 2
+        self._bytes = (seq + 2, payload)  # Also the fallback if a later writer dies
+
+    def read_bytes(self):
+        """
+        (version, JSON payload) of a consistent snapshot. If none can be read
+        within `read_timeout` (writer died mid-update), the last payload
+        copied out; TimeoutError if there is none.
+        """
+        buf = self._shm.buf
+        deadline = None
+        while True:
+            seq, length = self.HEADER.unpack_from(buf, 0)
+            cached_seq, payload = self._bytes
+            if seq == cached_seq:
+                return seq // 2, payload  # Unchanged since the last copy
+            if not seq % 2:
+                length = min(length, self.capacity)
+                payload = bytes(buf[self.PAYLOAD_OFFSET : self.PAYLOAD_OFFSET + length])
+                if struct.unpack_from("<Q", buf, 0)[0] == seq:
+                    self._bytes = (seq, payload)
+                    return seq // 2, payload
+
+            # Writer mid-update (or the copy raced one)
+            now = time.monotonic()
+            if deadline is None:
+                # Known dead writer: don't wait again on every read
+                deadline = now if seq == self._stuck_seq else now + self.read_timeout
+            if now >= deadline:
+                self._stuck_seq = seq
+                if cached_seq < 0:
+                    raise TimeoutError(f"No consistent snapshot in {self.name}")
+                return cached_seq // 2, payload
+            time.sleep(0)  # Let the writer finish
+
+    def read(self) -> dict:
+        seq = struct.unpack_from("<Q", self._shm.buf, 0)[0]
+        if seq == self._cached_seq:
+            return self._data
+        version, payload = self.read_bytes()
+        self._data, self._cached_seq = json.loads(payload), version * 2
+        return self._data
+
+    @property
+    def version(self) -> int:
+        return struct.unpack_from("<Q", self._shm.buf, 0)[0] // 2
+
+    def get(self, key, default=None):
+        return self.read().get(key, default)
+
+    def __getitem__(self, key):
+        return self.read()[key]
+
+    def close(self):
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def publish(target, fields: dict):
+    """
+    Publish one result into `target` in a single operation: a snapshot's
+    publish(), or update() for a plain / Manager dict (one IPC round trip).
+    """
+    if hasattr(target, "publish"):
+        target.publish(fields)
+    else:
+        target.update(fields)
@@ -12,19 +12,19 @@ const Home: React.FC = observer(() => {
 
   // Home.tsx
   useEffect(() => {
-    const interval = setInterval(async () => {
-      try {
-        const res = await fetch('http://localhost:5001/focus_data')
-        const data = await res.json()
-        console.log("EEG focus:", data)
-        // You could store this in MobX or React state
-        projectStore.focusLabel = data.class_label
-      } catch (e) {
-        console.error("Failed to fetch focus data:", e)
-      }
-    }, 2000) // poll every 2 seconds
+    // Pushed as soon as a new result is published (EventSource reconnects on its own)
+    const stream = new EventSource('http://localhost:5001/focus_stream')
+    stream.onmessage = (event) => {
+      const data = JSON.parse(event.data)
+      console.log("EEG focus:", data)
+      // You could store this in MobX or React state
+      projectStore.focusLabel = data.class_label
+    }
+    stream.onerror = (e) => {
+      console.error("Focus stream interrupted:", e)
+    }
 
-    return () => clearInterval(interval)
+    return () => stream.close()
   }, [])
 
   useEffect(() => {
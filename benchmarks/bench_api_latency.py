@@ -0,0 +1,206 @@
+"""
+/focus_data latency while inference is busy: debug vs. production server mode.
+
+Starts api_server.py in each mode with inference replaying a recording in a
+loop as fast as possible (so the model is never idle), hammers /focus_data
+from several client threads and reports request latency percentiles and how
+many distinct results the clients saw.
+
+Then measures what handing results to the API process costs there (the
+production supervisor thread): CPU time and wake-ups per second of the old
+per-result hand-off (queue get → FocusHistory.append → stream publish for
+every result) vs. the batched one (InferenceSupervisor drains the queue every
+drain_interval and calls api_server.on_results once per batch), with a
+producer process putting --rate results/s into the queue.
+
+Run from the project root:
+    python benchmarks/bench_api_latency.py [--recording rec.npz] [--seconds 10] [--clients 8] [--rate 200]
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+# Hack to get access to the backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "app" / "backend"))
+from bandpower import BAND_NAMES
+from push_stream import FocusStreamServer
+from replay_board import save_recording, synthetic_recording
+
+BACKEND = project_root / "app" / "backend"
+
+
+def start_server(mode, port, recording_path):
+    overrides = [
+        f"server.mode={mode}",
+        f"server.port={port}",
+        f"server.stream_port={port + 100}",
+        f"muse.replay_file={recording_path}",
+        "muse.replay_speed=null",
+        "muse.replay_loop=true",
+    ]
+    env = {**os.environ, "PYTHONPATH": str(BACKEND)}
+    process = subprocess.Popen(
+        [sys.executable, str(BACKEND / "api_server.py"), *overrides],
+        cwd=project_root, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}/focus_data"
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if json.loads(response.read()).get("timestamp") is not None:
+                    return process, url  # Serving, and inference is producing results
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"api_server ({mode}) did not come up")
+
+
+def hammer(url, seconds, n_clients):
+    latencies, payloads = [], set()
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def client():
+        local, seen = [], set()
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            with urllib.request.urlopen(url, timeout=10) as response:
+                body = response.read()
+            local.append(time.perf_counter() - start)
+            seen.add(body)
+        with lock:
+            latencies.extend(local)
+            payloads.update(seen)
+
+    threads = [threading.Thread(target=client) for _ in range(n_clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return np.asarray(latencies) * 1e3, len(payloads)
+
+
+def produce(results, rate, seconds):
+    """Producer process: `rate` result dicts/s, like the inference child's on_result"""
+    labels = ["Focus-NotFatigued", "Focus-Fatigued", "UnFocus-NotFatigued", "UnFocus-Fatigued"]
+    deadline = time.perf_counter() + seconds
+    next_at = time.perf_counter()
+    while next_at < deadline:
+        results.put({
+            "class_label": labels[0],
+            "probabilities": {label: 0.25 for label in labels},
+            "reg_output": [0.1, 0.2, 0.3, 0.4],
+            "band_powers": {name: 1.0 for name in BAND_NAMES},
+            "timestamp": time.time(),
+        })
+        next_at += 1 / rate
+        time.sleep(max(0.0, next_at - time.perf_counter()))
+    results.put(None)
+
+
+def handoff(consume, rate, seconds):
+    """(API-thread CPU ms per second, wake-ups per second) while consuming `rate` results/s"""
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue(256)
+    producer = ctx.Process(target=produce, args=(results, rate, seconds))
+    producer.start()
+    results.get()  # Producer is up; drop one to sync
+    start_cpu, start = time.thread_time(), time.perf_counter()
+    wakeups = consume(results)
+    cpu, elapsed = time.thread_time() - start_cpu, time.perf_counter() - start
+    producer.join()
+    return cpu / elapsed * 1e3, wakeups / elapsed
+
+
+def compare_handoff(rate, seconds):
+    import api_server
+    from focus_history import FocusHistory
+
+    api_server.focus_stream = FocusStreamServer(port=5103).start()
+
+    def per_result(results):
+        """_drain before batching: wake up for every result"""
+        history, wakeups = None, 0
+        while True:
+            result = results.get(timeout=0.2)
+            wakeups += 1
+            if result is None:
+                return wakeups
+            if history is None:
+                history = FocusHistory(list(result["probabilities"]))
+            history.append(result)
+            api_server.focus_stream.publish(result)
+
+    def batched(results, drain_interval=0.05):
+        """InferenceSupervisor._drain: wake up every drain_interval, one on_results per batch"""
+        wakeups = 0
+        while True:
+            time.sleep(drain_interval)
+            wakeups += 1
+            batch = []
+            try:
+                while True:
+                    batch.append(results.get_nowait())
+            except queue.Empty:
+                pass
+            done = bool(batch) and batch[-1] is None
+            if done:
+                batch.pop()
+            if batch:
+                api_server.on_results(batch)
+            if done:
+                return wakeups
+
+    print(f"\nHand-off to the API process at {rate:g} results/s")
+    print(f"{'':<11} {'CPU ms/s':>10} {'wake-ups/s':>11}")
+    for name, consume in [("per result", per_result), ("batched", batched)]:
+        cpu, wakeups = handoff(consume, rate, seconds)
+        print(f"{name:<11} {cpu:10.2f} {wakeups:11.0f}")
+    api_server.focus_stream.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recording", help=".npz from replay_board.py (default: synthetic)")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Load duration per mode")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent client threads")
+    parser.add_argument("--rate", type=float, default=200.0, help="Results/s for the hand-off comparison")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recording_path = args.recording
+        if recording_path is None:
+            recording_path = Path(tmp, "synthetic.npz")
+            save_recording(recording_path, synthetic_recording(60.0))
+
+        print(f"{'mode':<11} {'requests/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'results seen':>13}")
+        for mode, port in [("debug", 5101), ("production", 5102)]:
+            process, url = start_server(mode, port, recording_path)
+            try:
+                ms, n_results = hammer(url, args.seconds, args.clients)
+            finally:
+                process.terminate()
+                process.wait(10)
+            p50, p99 = np.percentile(ms, [50, 99])
+            print(f"{mode:<11} {len(ms) / args.seconds:10.0f} {p50:8.2f} {p99:8.2f} {ms.max():8.2f} {n_results:13d}")
+
+    compare_handoff(args.rate, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
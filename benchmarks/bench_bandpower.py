@@ -0,0 +1,78 @@
+"""
+Microbenchmark: BandPowerEngine vs. one DataFilter.get_avg_band_powers call per window.
+
+Run from the project root:
+    python benchmarks/bench_bandpower.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+from brainflow.data_filter import DataFilter
+
+# Hack to get access to the backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "app" / "backend"))
+from bandpower import BandPowerEngine
+from preprocessing import BandPowerStage
+
+SAMPLING_RATE = 256  # Muse 2
+N_CHANNELS = 4
+
+
+def per_window_loop(eeg_data, win_len, step):
+    """The original get_avg_wave_data loop"""
+    rows = []
+    for start in range(0, eeg_data.shape[1] - win_len + 1, step):
+        window = np.ascontiguousarray(eeg_data[:, start : start + win_len])
+        avgs, _ = DataFilter.get_avg_band_powers(
+            window,
+            channels=np.arange(window.shape[0]),
+            sampling_rate=SAMPLING_RATE,
+            apply_filter=False,
+        )
+        rows.append(avgs)
+    return np.array(rows)
+
+
+def bench(label, fn, repeat=5, number=20):
+    best = min(timeit.repeat(fn, repeat=repeat, number=number)) / number
+    print(f"  {label:<32} {best * 1e3:9.3f} ms/call")
+    return best
+
+
+def main():
+    rng = np.random.default_rng(0)
+    engine = BandPowerEngine(SAMPLING_RATE)
+
+    # Recorder: 90 s block, 2 s windows with 50% overlap
+    eeg_data = rng.normal(0.0, 20.0, size=(N_CHANNELS, 90 * SAMPLING_RATE))
+    for win_sec, overlap in ((2, 0.5), (4, 0.5), (4, 0.75)):
+        win_len = win_sec * SAMPLING_RATE
+        step = int(win_len * (1 - overlap))
+        ref = per_window_loop(eeg_data, win_len, step)
+        starts = np.arange(0, eeg_data.shape[1] - win_len + 1, step)
+        stack = eeg_data[:, starts[:, None] + np.arange(win_len)].transpose(1, 0, 2)
+
+        stage = BandPowerStage(SAMPLING_RATE)
+        burst = {"eeg_data": eeg_data, "window_seconds": win_sec, "overlap": overlap}
+
+        max_err = np.max(np.abs(stage(dict(burst))["band_powers"] - ref))
+        print(f"\n90 s block, {win_sec} s windows, {overlap:.0%} overlap ({len(ref)} windows)")
+        print(f"  max |engine - DataFilter| = {max_err:.2e}")
+        t_ref = bench("per-window DataFilter loop", lambda: per_window_loop(eeg_data, win_len, step))
+        t_stack = bench("engine.band_powers(stack)", lambda: engine.band_powers(stack))
+        t_stage = bench("BandPowerStage (strided view)", lambda: stage(dict(burst)))
+        print(f"  speedup stack: {t_ref / t_stack:.1f}x, stage: {t_ref / t_stage:.1f}x")
+
+    # Live path: one 2 s window per call
+    window = np.ascontiguousarray(eeg_data[:, : 2 * SAMPLING_RATE])
+    print("\nSingle 2 s window (live inference)")
+    t_ref = bench("DataFilter.get_avg_band_powers", lambda: DataFilter.get_avg_band_powers(window, np.arange(N_CHANNELS), SAMPLING_RATE, False), number=500)
+    t_eng = bench("engine.band_powers", lambda: engine.band_powers(window), number=500)
+    print(f"  speedup: {t_ref / t_eng:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+MuseEEGDataset construction and sample access on synthetic sessions.
+
+First compares window construction on one session of --rows rows held
+in memory: the old per-window Python loop (np.mean per window, a 5-tuple
+per sample) vs. session_windows() (arange, cumulative sums, fancy
+indexing, typed arrays), with the memory each keeps per sample.
+
+Then writes --sessions parquet files with --rows rows in total
+(training.yaml columns), and times building the dataset in memory,
+building the window cache (cold), and opening it again (warm), plus the
+cost of one __getitem__ and DataLoader throughput.
+
+Run from the project root:
+    python benchmarks/bench_dataset.py [--rows 10000000] [--sessions 10]
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+from omegaconf import OmegaConf
+
+# Hack to get access to the training modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "training"))
+from musedataloader import MuseEEGDataset, collate_fn, session_windows
+
+
+def loop_windows(file_path, reg_data, class_labels, window_size, step_size):
+    """What MuseEEGDataset.__init__ used to do for each session"""
+    samples = []
+    for start in range(0, len(reg_data) - window_size, step_size):
+        end = start + window_size
+        reg_target = np.mean(reg_data[start:end], axis=0).astype(np.float32)
+        class_target = int(class_labels[end - 1])
+        samples.append((file_path, start, end, reg_target, class_target))
+    return samples
+
+
+def write_sessions(data_dir: Path, cfg, rows: int, sessions: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    n_labels = len(cfg.model.labels)
+    for i, n in enumerate(np.diff(np.linspace(0, rows, sessions + 1).astype(int))):
+        df = pd.DataFrame(
+            rng.random((n, len(cfg.model.channel_labels)), dtype=np.float32),
+            columns=list(cfg.model.channel_labels),
+        )
+        for target in cfg.model.reg_targets:
+            df[target] = rng.random(n, dtype=np.float32)
+        df["Label_Class"] = rng.integers(0, n_labels, n)
+        df.to_parquet(data_dir / f"session_{i}_muse2_data.parquet", index=False)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def traced(fn):
+    """(result, seconds, bytes still allocated by fn)"""
+    tracemalloc.start()
+    result, seconds = timed(fn)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, seconds, held
+
+
+def compare_window_construction(cfg, rows: int):
+    rng = np.random.default_rng(0)
+    reg_data = rng.random((rows, len(cfg.model.reg_targets)), dtype=np.float32)
+    class_labels = rng.integers(0, len(cfg.model.labels), rows)
+    window_size, step_size = cfg.train.window_size, cfg.train.step_size
+    path = Path("data/session_0_muse2_data.parquet")
+
+    samples, loop_s = timed(
+        lambda: loop_windows(path, reg_data, class_labels, window_size, step_size)
+    )
+    (starts, reg, labels), array_s = timed(
+        lambda: session_windows(reg_data, class_labels, window_size, step_size)
+    )
+    # Memory per sample on a tenth of the rows (tracing slows both down)
+    sub = rows // 10
+    loop_samples, _, loop_bytes = traced(
+        lambda: loop_windows(path, reg_data[:sub], class_labels[:sub], window_size, step_size)
+    )
+    _, _, array_bytes = traced(
+        lambda: session_windows(reg_data[:sub], class_labels[:sub], window_size, step_size)
+    )
+    n_sub = len(loop_samples)
+    del loop_samples
+    # The cumulative sum keeps long sessions as precise as the per-window mean
+    loop_reg = np.stack([sample[3] for sample in samples])
+    assert len(samples) == len(starts)
+    assert np.array_equal([sample[4] for sample in samples], labels)
+    max_error = np.abs(loop_reg - reg).max()
+    del samples, loop_reg
+
+    n = len(starts)
+    print(f"Window construction, {rows} rows → {n} windows")
+    print(f"{'':<18} {'seconds':>9} {'bytes/sample':>13}")
+    print(f"{'Python loop':<18} {loop_s:9.3f} {loop_bytes / n_sub:13.1f}")
+    print(f"{'session_windows':<18} {array_s:9.3f} {array_bytes / n_sub:13.1f}")
+    print(f"(max |loop - cumsum| regression target difference: {max_error:.2e})\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2, help="DataLoader workers")
+    parser.add_argument("--batches", type=int, default=500, help="Batches to time the DataLoader over")
+    args = parser.parse_args()
+
+    cfg = OmegaConf.load(project_root / "configs" / "training.yaml")
+    compare_window_construction(cfg, args.rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp, "data")
+        data_dir.mkdir()
+        write_sessions(data_dir, cfg, args.rows, args.sessions)
+
+        kwargs = dict(
+            data_dir=data_dir,
+            labels=cfg.model.labels,
+            channel_labels=list(cfg.model.channel_labels),
+            regression_targets=list(cfg.model.reg_targets),
+            window_size=cfg.train.window_size,
+            step_size=cfg.train.step_size,
+        )
+        cache_dir = Path(tmp, "cache")
+        _, in_memory = timed(lambda: MuseEEGDataset(**kwargs))
+        _, cold = timed(lambda: MuseEEGDataset(**kwargs, cache_dir=cache_dir))
+        dataset, warm = timed(lambda: MuseEEGDataset(**kwargs, cache_dir=cache_dir))
+
+        indices = np.random.default_rng(1).integers(0, len(dataset), 10_000)
+        start = time.perf_counter()
+        for i in indices:
+            dataset[i]
+        getitem_us = (time.perf_counter() - start) / len(indices) * 1e6
+
+        loader = torch.utils.data.DataLoader(
+            dataset, batch_size=cfg.train.batch_size, shuffle=True,
+            num_workers=args.workers, collate_fn=collate_fn,
+        )
+        batches = iter(loader)
+        next(batches)  # Worker startup
+        start = time.perf_counter()
+        loaded = sum(len(next(batches)[0]) for _ in range(min(args.batches, len(loader) - 1)))
+        loader_rate = loaded / (time.perf_counter() - start)
+        del batches
+
+    print(f"\n{args.rows} rows in {args.sessions} sessions → {len(dataset)} windows")
+    print(f"{'construction, in memory':<30} {in_memory:9.3f} s")
+    print(f"{'construction, cache cold':<30} {cold:9.3f} s")
+    print(f"{'construction, cache warm':<30} {warm:9.3f} s")
+    print(f"{'__getitem__':<30} {getitem_us:9.1f} µs")
+    print(f"{f'DataLoader, {args.workers} workers':<30} {loader_rate:9.0f} samples/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+End-to-end latency benchmark for the acquisition → inference → publish path.
+
+Replays a recording as fast as possible (deterministic virtual clock) through
+MuseRealtimeInference.run_realtime_inference_generator and start_muse_inference,
+then writes per-stage p50/p95/p99 latency and throughput to a JSON file so runs
+can be compared between commits.
+
+Run from the project root:
+    python benchmarks/bench_end_to_end.py [--recording rec.npz] [--seconds 300]
+        [--pipelined] [--speed 10]
+
+In pipelined mode, replay at a finite --speed: as fast as possible the
+acquisition thread outruns DSP and most windows are dropped by design.
+"""
+import argparse
+import datetime
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Hack to get access to the backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "app" / "backend"))
+from config_loader import load_config
+from muse_streaming import MuseRealtimeInference, load_model, start_muse_inference
+from replay_board import ReplayBoard, save_recording, synthetic_recording
+from shared_state import ResultSnapshot, publish
+
+# Stages timed inside MuseRealtimeInference, in pipeline order
+# (amplitude + motion together are the artifact rejection)
+STAGES = ["pull", "filter", "amplitude", "motion", "bandpower", "tensor_build", "forward"]
+
+
+class TimedPublishTarget:
+    """Wraps the shared snapshot and times each publish in start_muse_inference"""
+
+    def __init__(self, target):
+        self.target = target
+        self.publish_seconds = []
+        self.publish_times = []
+
+    def publish(self, fields):
+        start = time.perf_counter()
+        publish(self.target, fields)
+        now = time.perf_counter()
+        self.publish_seconds.append(now - start)
+        self.publish_times.append(now)
+
+
+def summarize(seconds) -> dict:
+    ms = np.asarray(seconds, dtype=np.float64) * 1e3
+    if len(ms) == 0:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": int(len(ms)),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(ms.max()),
+    }
+
+
+def bench_generator(cfg, model, recording_path) -> dict:
+    """Drive run_realtime_inference_generator directly and collect per-stage timings"""
+    muse = MuseRealtimeInference(con_port=None, model=model, cfg=cfg)
+    board = ReplayBoard.from_file(recording_path, speed=cfg.muse.replay_speed, loop=False)
+    muse.connect_replay(board)
+
+    per_stage = {stage: [] for stage in STAGES + ["total"]}
+    n_results = 0
+    start = time.perf_counter()
+    for result in muse.run_realtime_inference_generator(
+        burst_duration=cfg.muse.window_seconds,
+        hop_duration=cfg.muse.hop_seconds,
+        pipelined=cfg.muse.pipelined,
+        queue_size=cfg.muse.queue_size,
+    ):
+        timings = result["timings"]
+        for stage in STAGES:
+            per_stage[stage].append(timings.get(stage, 0.0))
+        per_stage["total"].append(sum(timings.values()))
+        n_results += 1
+    wall = time.perf_counter() - start
+
+    return {
+        "results": n_results,
+        "wall_seconds": wall,
+        "results_per_second": n_results / wall,
+        "realtime_factor": board.duration / wall,
+        "stages": {stage: summarize(values) for stage, values in per_stage.items()},
+        "queues": muse.queue_stats(),
+    }
+
+
+def bench_service(cfg, recording_path) -> dict:
+    """Run start_muse_inference end to end, publishing into a ResultSnapshot like api_server"""
+    cfg.muse.replay_file = str(recording_path)
+    cfg.muse.replay_loop = False
+
+    target = TimedPublishTarget(ResultSnapshot())
+    start = time.perf_counter()
+    start_muse_inference(target, cfg=cfg)
+    wall = time.perf_counter() - start
+
+    n_results = len(target.publish_seconds)
+    return {
+        "results": n_results,
+        "wall_seconds": wall,
+        "results_per_second": n_results / wall,
+        "stages": {
+            "publish": summarize(target.publish_seconds),
+            "publish_interval": summarize(np.diff(target.publish_times)),
+        },
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def print_stages(title, report):
+    print(f"\n{title}: {report['results']} results in {report['wall_seconds']:.2f}s "
+          f"({report['results_per_second']:.0f}/s)")
+    for stage, s in report["stages"].items():
+        if s["count"]:
+            print(f"  {stage:<16} p50 {s['p50_ms']:8.3f} ms  p95 {s['p95_ms']:8.3f} ms  p99 {s['p99_ms']:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recording", help=".npz from replay_board.py (default: synthetic)")
+    parser.add_argument("--seconds", type=float, default=300.0, help="Length of the synthetic recording")
+    parser.add_argument("--pipelined", action="store_true", help="Threaded acquisition/DSP/inference")
+    parser.add_argument("--speed", type=float, default=None, help="Replay speed (default: as fast as possible)")
+    parser.add_argument("--output", help="JSON path (default: benchmarks/results/end_to_end_<commit>.json)")
+    args = parser.parse_args()
+
+    cfg = load_config()
+    cfg.muse.replay_speed = args.speed
+    cfg.muse.pipelined = args.pipelined
+    commit = git_commit()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recording_path = args.recording
+        if recording_path is None:
+            recording_path = Path(tmp, "synthetic.npz")
+            save_recording(recording_path, synthetic_recording(args.seconds))
+
+        model = load_model(cfg)
+        report = {
+            "commit": commit,
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "recording": str(args.recording or f"synthetic ({args.seconds}s)"),
+            "window_seconds": cfg.muse.window_seconds,
+            "hop_seconds": cfg.muse.hop_seconds,
+            "pipelined": args.pipelined,
+            "replay_speed": args.speed,
+            "generator": bench_generator(cfg, model, recording_path),
+            "service": bench_service(cfg, recording_path),
+        }
+
+    print_stages("run_realtime_inference_generator", report["generator"])
+    print(f"  realtime factor: {report['generator']['realtime_factor']:.0f}x")
+    for name, stats in report["generator"]["queues"].items():
+        print(f"  queue {name:<10} put {stats['put']:6d}  dropped {stats['dropped']:6d}")
+    print_stages("start_muse_inference", report["service"])
+
+    output = Path(args.output or project_root / "benchmarks" / "results" / f"end_to_end_{commit or 'local'}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
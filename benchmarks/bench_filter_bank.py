@@ -0,0 +1,82 @@
+"""
+Microbenchmark: FilterBank vs. the per-channel DataFilter chain, plus how
+soon streamed output matches apply() on the same 90 s block.
+
+Run from the project root:
+    python benchmarks/bench_filter_bank.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+from brainflow.data_filter import DataFilter, DetrendOperations, FilterTypes
+
+# Hack to get access to the backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "app" / "backend"))
+from filter_bank import FilterBank
+
+SAMPLING_RATE = 256  # Muse 2
+N_CHANNELS = 4
+
+
+def per_channel_chain(eeg_data, sampling_rate):
+    """The original detrend → bandpass → bandstop → bandstop loop"""
+    eeg_data = np.ascontiguousarray(eeg_data.copy())
+    for ch in range(eeg_data.shape[0]):
+        DataFilter.detrend(eeg_data[ch], DetrendOperations.CONSTANT.value)
+        DataFilter.perform_bandpass(
+            eeg_data[ch], sampling_rate, 1.0, 50.0, 2, FilterTypes.BUTTERWORTH.value, 0
+        )
+        DataFilter.perform_bandstop(
+            eeg_data[ch], sampling_rate, 58.0, 62.0, 2, FilterTypes.BUTTERWORTH.value, 0
+        )
+        DataFilter.perform_bandstop(
+            eeg_data[ch], sampling_rate, 48.0, 52.0, 2, FilterTypes.BUTTERWORTH.value, 0
+        )
+    return eeg_data
+
+
+def bench(label, fn, repeat=5, number=200):
+    best = min(timeit.repeat(fn, repeat=repeat, number=number)) / number
+    print(f"  {label:<28} {best * 1e6:10.1f} µs/call")
+    return best
+
+
+def stream_vs_apply(block):
+    """The same block streamed in 0.25 s pieces matches apply() once apply()'s cold start has settled"""
+    stream_bank = FilterBank(SAMPLING_RATE)
+    streamed = np.concatenate(
+        [stream_bank.stream(piece) for piece in np.array_split(block, block.shape[1] // 64, axis=1)],
+        axis=1,
+    )
+    diff = np.abs(streamed - FilterBank(SAMPLING_RATE).apply(block)).max(axis=0)
+    for seconds in (0.5, 1, 2, 5):
+        print(f"  max |stream - apply| after {seconds:>3} s = {diff[int(seconds * SAMPLING_RATE):].max():.2e}")
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    for seconds in (0.25, 1, 2, 90):
+        n_samples = int(seconds * SAMPLING_RATE)
+        block = rng.normal(800.0, 30.0, size=(N_CHANNELS, n_samples))
+        bank = FilterBank(SAMPLING_RATE)
+
+        ref = per_channel_chain(block, SAMPLING_RATE)
+        max_err = np.max(np.abs(bank.apply(block) - ref))
+
+        print(f"\n{N_CHANNELS} channels x {n_samples} samples ({seconds}s)")
+        print(f"  max |FilterBank - DataFilter| = {max_err:.2e}")
+        if seconds >= 90:
+            stream_vs_apply(block)
+        number = 20 if seconds >= 90 else 200
+        t_ref = bench("per-channel DataFilter", lambda: per_channel_chain(block, SAMPLING_RATE), number=number)
+        t_apply = bench("FilterBank.apply", lambda: bank.apply(block), number=number)
+        t_stream = bench("FilterBank.stream", lambda: bank.stream(block), number=number)
+        print(f"  speedup apply: {t_ref / t_apply:.1f}x, stream: {t_ref / t_stream:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
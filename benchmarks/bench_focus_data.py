@@ -0,0 +1,71 @@
+"""
+Per-request cost of /focus_data: jsonify on every poll (the old handler) vs.
+the bytes encoded at publish time, and a conditional GET answered with 304.
+
+Times each view function on its own (inside a request context) and whole
+requests through Flask's test client (framework + CORS, no sockets).
+
+Run from the project root:
+    python benchmarks/bench_focus_data.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+from flask import jsonify
+
+# Hack to get access to the backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "app" / "backend"))
+import api_server
+from bandpower import BAND_NAMES
+from muse_streaming import MuseRealtimeInference
+
+
+@api_server.app.route("/focus_data_jsonify")
+def focus_data_jsonify():
+    """The handler before results were pre-serialized"""
+    return jsonify(dict(api_server.latest_focus_data.read()))
+
+
+def make_result(i):
+    return {
+        "class_label": MuseRealtimeInference.labels[i % 4],
+        "probabilities": {label: 0.25 for label in MuseRealtimeInference.labels},
+        "reg_output": [0.4, 0.3, 0.2, 0.1],
+        "band_powers": {band: 0.2 for band in BAND_NAMES},
+        "timestamp": 1_700_000_000.0 + i,
+    }
+
+
+def bench(fn, number=5000):
+    return min(timeit.repeat(fn, repeat=5, number=number)) / number * 1e6
+
+
+def main():
+    api_server.latest_focus_data.publish(make_result(1))
+    client = api_server.app.test_client()
+
+    etag = client.get("/focus_data").headers["ETag"]
+    assert client.get("/focus_data", headers={"If-None-Match": etag}).status_code == 304
+    api_server.latest_focus_data.publish(make_result(2))
+    assert client.get("/focus_data", headers={"If-None-Match": etag}).status_code == 200
+    etag = client.get("/focus_data").headers["ETag"]
+
+    cases = [
+        ("jsonify per request", "/focus_data_jsonify", {}, focus_data_jsonify),
+        ("pre-serialized bytes", "/focus_data", {}, api_server.get_focus_data),
+        ("If-None-Match → 304", "/focus_data", {"If-None-Match": etag}, api_server.get_focus_data),
+    ]
+    print(f"{'handler':<24} {'view µs':>9} {'request µs':>11}")
+    for label, path, headers, view in cases:
+        with api_server.app.test_request_context(path, headers=headers):
+            t_view = bench(view)
+        t_request = bench(lambda: client.get(path, headers=headers), number=1000)
+        print(f"{label:<24} {t_view:9.1f} {t_request:11.1f}")
+
+    print(f"\n{'publish (encode once)':<24} {bench(lambda: api_server.latest_focus_data.publish(make_result(3))):11.1f}")
+
+
+if __name__ == "__main__":
+    main()
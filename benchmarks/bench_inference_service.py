@@ -0,0 +1,75 @@
+"""
+Throughput of InferenceService micro-batching vs. one forward per request.
+
+N producer threads each submit predictions back to back; the baseline runs
+each request as its own batch-1 forward_constant() call.
+
+Run from the project root:
+    python benchmarks/bench_inference_service.py [--producers 1 4 16 64] [--requests 500]
+"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+# Hack to get access to the backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "app" / "backend"))
+sys.path.insert(0, str(project_root))
+from inference_service import InferenceService
+from training.networks import MultiTaskEEGModel
+
+N_SAMPLES = 512  # 2 s window at 256 Hz
+
+
+def run_producers(n_producers, n_requests, predict):
+    features = np.random.default_rng(0).normal(size=(n_producers, 11)).astype(np.float32)
+
+    def produce(i):
+        for _ in range(n_requests):
+            predict(features[i], N_SAMPLES)
+
+    threads = [threading.Thread(target=produce, args=(i,)) for i in range(n_producers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return n_producers * n_requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--producers", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=500, help="Per producer")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    model = MultiTaskEEGModel(n_channels=11, hidden_dims=(16, 32), n_classes=4, n_outputs=4).eval()
+
+    def batch_one(features, n_samples):
+        with torch.no_grad():
+            class_out, reg_out = model.forward_constant(torch.from_numpy(features)[None], n_samples)
+            return torch.softmax(class_out, dim=1)[0], reg_out[0]
+
+    print(f"{'producers':>9} {'batch-1 req/s':>14} {'batched req/s':>14} {'speedup':>8} "
+          f"{'mean batch':>11} {'delay p50 ms':>13} {'delay p99 ms':>13}")
+    for n in args.producers:
+        baseline = run_producers(n, args.requests, batch_one)
+        with InferenceService(model, args.max_batch_size, args.max_latency_ms / 1e3) as service:
+            batched = run_producers(n, args.requests, service.predict)
+            stats = service.stats()
+        mean_batch = stats["requests"] / stats["batches"]
+        delay = stats["queue_delay"]
+        print(f"{n:9d} {baseline:14.0f} {batched:14.0f} {batched / baseline:7.1f}x "
+              f"{mean_batch:11.1f} {delay['p50_ms']:13.2f} {delay['p99_ms']:13.2f}")
+        print(f"          batch sizes: {stats['batch_sizes']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Overhead of the hot-path instrumentation (metrics.py): cost of one counter
+increment / histogram observation, with and without labels, uncontended and
+with several threads recording at once, and the cost of rendering /metrics.
+
+Run from the project root:
+    python benchmarks/bench_metrics.py
+"""
+import sys
+import threading
+import timeit
+from pathlib import Path
+
+# Hack to get access to the backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "app" / "backend"))
+from metrics import Registry
+
+STAGES = ["pull", "filter", "amplitude", "motion", "bandpower", "tensor_build", "forward"]
+
+
+def bench(fn, number=200_000):
+    return min(timeit.repeat(fn, repeat=5, number=number)) / number * 1e9
+
+
+def contended(fn, n_threads=4, number=100_000):
+    """ns per call with `n_threads` threads calling fn concurrently"""
+    def worker():
+        for _ in range(number):
+            fn()
+
+    threads = [threading.Thread(target=worker) for _ in range(n_threads)]
+    start = timeit.default_timer()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return (timeit.default_timer() - start) / (n_threads * number) * 1e9
+
+
+def main():
+    registry = Registry()
+    counter = registry.counter("c_total", "unlabelled counter")
+    labelled = registry.counter("l_total", "labelled counter", ["reason"])
+    histogram = registry.histogram("h_seconds", "labelled histogram", ["stage"])
+
+    cases = [
+        ("Counter.inc()", lambda: counter.inc()),
+        ("Counter.inc(reason=...)", lambda: labelled.inc(reason="motion")),
+        ("Histogram.observe(stage=...)", lambda: histogram.observe(0.0012, stage="forward")),
+    ]
+    print(f"{'operation':<30} {'ns/call':>8} {'ns/call, 4 threads':>19}")
+    for label, fn in cases:
+        print(f"{label:<30} {bench(fn):8.0f} {contended(fn):19.0f}")
+
+    for stage in STAGES:
+        histogram.observe(0.001, stage=stage)
+    render_us = bench(registry.render, number=2000) / 1e3
+    print(f"\nrender() with {len(STAGES)} histogram series: {render_us:.0f} µs, "
+          f"{len(registry.render())} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+PiP overlay toggle latency: a fresh renderer process per /start_pip (what
+the API used to do) vs. showing the long-lived PipRenderer again.
+
+- imports a fresh PiP process pays (tkinter, matplotlib TkAgg, requests),
+  each in a new interpreter
+- time for show() / hide() to return (what the /start_pip and /stop_pip
+  handlers wait for)
+- time until the window reports it is on screen: cold (new process) vs
+  warm (hidden window shown again), and the cold stop (process join)
+
+The window timings need a display (on a headless box: xvfb-run).
+
+Run from the project root:
+    python benchmarks/bench_pip_launch.py [--repeat 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Hack to get access to the backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "app" / "backend"))
+from pip_renderer import PipRenderer
+
+IMPORT_SNIPPET = """
+import sys, time
+sys.path.insert(0, {backend!r})
+start = time.perf_counter()
+import pip_window
+print(time.perf_counter() - start)
+"""
+
+# Nothing listens there: the window comes up and waits for data
+OPTIONS = {"window_title": "bench", "stream_url": "http://127.0.0.1:9/focus_stream"}
+
+
+def wait_for(renderer, event, timeout=30.0) -> bool:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        events = renderer.events()
+        if event in events:
+            return True
+        if "error" in events or not renderer.alive:
+            return False
+        time.sleep(0.001)
+    return False
+
+
+def ms(seconds) -> str:
+    return f"{np.median(seconds) * 1e3:9.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    snippet = IMPORT_SNIPPET.format(backend=str(project_root / "app" / "backend"))
+    imports = [
+        float(subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True, check=True).stdout)
+        for _ in range(args.repeat)
+    ]
+    print(f"{'measurement':<44} {'median ms':>9}")
+    print(f"{'imports of a fresh PiP process':<44} {ms(imports)}")
+
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        print("\nNo $DISPLAY: run under xvfb-run for the window timings")
+        return
+
+    # Cold: new process per toggle, as the API used to do
+    cold_call, cold_shown, cold_stop = [], [], []
+    for _ in range(args.repeat):
+        renderer = PipRenderer(**OPTIONS)
+        start = time.perf_counter()
+        renderer.show()
+        cold_call.append(time.perf_counter() - start)
+        if not wait_for(renderer, "shown"):
+            print(f"❌ Window did not come up: {renderer.error}")
+            return
+        cold_shown.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        renderer.close()
+        cold_stop.append(time.perf_counter() - start)
+
+    # Warm: one renderer, hidden and shown again
+    renderer = PipRenderer(**OPTIONS).start()
+    wait_for(renderer, "ready")
+    warm_show, warm_hide, warm_shown = [], [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        renderer.show()
+        warm_show.append(time.perf_counter() - start)
+        wait_for(renderer, "shown")
+        warm_shown.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        renderer.hide()
+        warm_hide.append(time.perf_counter() - start)
+        wait_for(renderer, "hidden")
+    renderer.close()
+
+    print(f"{'cold: show() returns (process start)':<44} {ms(cold_call)}")
+    print(f"{'cold: window on screen':<44} {ms(cold_shown)}")
+    print(f"{'cold: stop (quit + join)':<44} {ms(cold_stop)}")
+    print(f"{'warm: show() returns':<44} {ms(warm_show)}")
+    print(f"{'warm: hide() returns':<44} {ms(warm_hide)}")
+    print(f"{'warm: window on screen':<44} {ms(warm_shown)}")
+
+
+if __name__ == "__main__":
+    main()
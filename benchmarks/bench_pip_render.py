@@ -0,0 +1,114 @@
+"""
+Per-frame cost of the PiP graph: the old update (growing lists, rescaled
+y-limits, full canvas.draw()) vs. LiveGraph (RingBuffer + blitting).
+
+Both run on an offscreen Agg canvas of the PiP window's size, so this
+measures the matplotlib work a frame costs, without Tk. Each is measured
+at the start of a session and after --hours of results at 4/s (the old
+lists are prefilled to that length; LiveGraph holds max_points values
+whatever the session length).
+
+Run from the project root:
+    python benchmarks/bench_pip_render.py [--frames 200] [--max-points 120] [--hours 8]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+# Hack to get access to the backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "app" / "backend"))
+from pip_window import LiveGraph
+
+LABELS = ["FO-NF", "FO-FA", "UF-NF", "UF-FA"]
+COLORS = ["lime", "orange", "cyan", "magenta"]
+
+
+def make_axes():
+    fig, ax = plt.subplots(figsize=(5, 3.2), dpi=100)
+    return fig, ax
+
+
+class OldGraph:
+    """update_graph() as pip_window did it before LiveGraph"""
+
+    def __init__(self, max_points, prefill):
+        self.fig, self.ax = make_axes()
+        self.max_points = max_points
+        self.x_data = list(range(len(prefill)))
+        self.y_data = [prefill[:, i].tolist() for i in range(4)]
+        self.lines = [self.ax.plot([], [], color=c, label=l, linewidth=2)[0] for l, c in zip(LABELS, COLORS)]
+        self.ax.legend()
+
+    def append(self, reg_output):
+        x_data, y_data, max_points, ax = self.x_data, self.y_data, self.max_points, self.ax
+        x_data.append(len(x_data))
+        for i in range(4):
+            y_data[i].append(float(reg_output[i]))
+        x_disp = x_data[-max_points:]
+        for i in range(4):
+            self.lines[i].set_data(x_disp, y_data[i][-max_points:])
+        all_vals = [v for ch in y_data for v in ch[-max_points:]]
+        if all_vals:
+            ax.set_ylim(min(all_vals) - 0.01, max(all_vals) + 0.01)
+        ax.relim()
+        ax.autoscale_view(True, True, True)
+        self.fig.canvas.draw()
+
+
+def new_graph(max_points, prefill):
+    fig, ax = make_axes()
+    graph = LiveGraph(fig.canvas, ax, LABELS, COLORS, max_points)
+    ax.legend()
+    for values in prefill[-max_points:]:
+        graph.append(values)
+    return graph
+
+
+def time_frames(graph, values) -> np.ndarray:
+    seconds = []
+    for row in values:
+        start = time.perf_counter()
+        graph.append(row)
+        seconds.append(time.perf_counter() - start)
+    return np.asarray(seconds) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--max-points", type=int, default=120)
+    parser.add_argument("--hours", type=float, default=8.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Slowly drifting outputs with small fluctuations, like the regression heads
+    def series(n):
+        return 0.5 + np.cumsum(rng.normal(0, 1e-3, (n, 4)), axis=0)
+
+    frames = series(args.frames)
+    print(f"{'graph':<10} {'session':>9} {'p50 ms':>8} {'p99 ms':>8} {'data MB':>8}")
+    for session_rows in [0, int(args.hours * 3600 * 4)]:
+        prefill = series(session_rows)
+        for name, build in [("old", OldGraph), ("LiveGraph", new_graph)]:
+            tracemalloc.start()
+            graph = build(args.max_points, prefill)
+            held = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            ms = time_frames(graph, frames)
+            p50, p99 = np.percentile(ms, [50, 99])
+            hours = session_rows / 4 / 3600
+            print(f"{name:<10} {hours:8.1f}h {p50:8.2f} {p99:8.2f} {held / 1e6:8.1f}")
+            plt.close("all")
+
+
+if __name__ == "__main__":
+    main()
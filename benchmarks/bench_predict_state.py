@@ -0,0 +1,75 @@
+"""
+Microbenchmark: predict_state fast path vs. broadcasting features over n_samples.
+
+Run from the project root:
+    python benchmarks/bench_predict_state.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import torch
+
+# Hack to get access to the backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "app" / "backend"))
+from training.networks import MultiTaskEEGModel
+from muse_streaming import MuseRealtimeInference
+
+MODEL_PATH = project_root / "models" / "models" / "2025-11-10-model.pt"
+
+
+def load_model():
+    model = MultiTaskEEGModel(n_channels=11, hidden_dims=[16, 32], n_classes=4, n_outputs=4)
+    state_dict = torch.load(MODEL_PATH, map_location="cpu")
+    model.load_state_dict({k.replace("model.", ""): v for k, v in state_dict.items()})
+    return model.eval()
+
+
+def broadcast_forward(model, features, n_samples):
+    """The original path: np.full each scalar across the burst, full Conv1d forward"""
+    x = np.array([np.full(n_samples, v) for v in features])
+    x = torch.from_numpy(x).float().unsqueeze(0)
+    with torch.no_grad():
+        return model(x)
+
+
+def best_of(fn, repeat=5, number=200):
+    return min(timeit.repeat(fn, repeat=repeat, number=number)) / number
+
+
+def main():
+    torch.set_num_threads(1)
+    model = load_model()
+    muse = MuseRealtimeInference(con_port=None, model=model, cfg=None)
+
+    band_powers = {"Delta": 0.3, "Theta": 0.2, "Alpha": 0.2, "Beta": 0.2, "Gamma": 0.1}
+    gyro_mean, accel_mean = np.array([0.1, -0.2, 0.3]), np.array([0.0, 0.1, 0.98])
+    features = list(band_powers.values()) + list(gyro_mean) + list(accel_mean)
+
+    for n_samples in (256, 512, 2560, 23040):
+        eeg_data = np.zeros((4, n_samples))
+        _, _, reg_fast, _ = muse.predict_state(eeg_data, band_powers, gyro_mean, accel_mean)
+        _, reg_ref = broadcast_forward(model, features, n_samples)
+        max_err = np.max(np.abs(reg_fast - reg_ref[0].numpy()))
+
+        feature_tensor = torch.tensor([features], dtype=torch.float32)
+
+        def constant_forward():
+            with torch.no_grad():
+                return model.forward_constant(feature_tensor, n_samples)
+
+        t_ref = best_of(lambda: broadcast_forward(model, features, n_samples))
+        t_const = best_of(constant_forward)
+        t_full = best_of(lambda: muse.predict_state(eeg_data, band_powers, gyro_mean, accel_mean))
+        print(
+            f"n_samples={n_samples:>6}: broadcast forward {t_ref * 1e6:8.1f} µs, "
+            f"forward_constant {t_const * 1e6:6.1f} µs ({t_ref / t_const:5.1f}x), "
+            f"full predict_state {t_full * 1e6:6.1f} µs, max reg diff {max_err:.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
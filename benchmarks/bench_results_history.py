@@ -0,0 +1,96 @@
+"""
+Memory and access cost of keeping every result of a long session:
+the old list of result dicts vs. ResultsHistory (typed columns, fixed
+in-memory block, older results spilled to disk).
+
+Reports Python heap growth (tracemalloc), append cost, and the time to read
+a 1000-result range back from the spilled part and from the newest block.
+
+Run from the project root:
+    python benchmarks/bench_results_history.py [--results 200000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+# Hack to get access to the backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "app" / "backend"))
+from bandpower import BAND_NAMES
+from muse_streaming import MuseRealtimeInference
+from results_history import ResultsHistory
+
+LABELS = MuseRealtimeInference.labels
+FEATURES = BAND_NAMES + ["GyroX", "GyroY", "GyroZ", "AccelX", "AccelY", "AccelZ",
+                         "FO-NF", "FO-FA", "UF-NF", "UF-FA"]
+
+
+def make_result(i, values):
+    """Same shape as a run_realtime_inference_generator() result"""
+    features = dict(zip(FEATURES, values[:15].tolist()))
+    features["Label_Class"] = LABELS[i % 4]
+    return {
+        "timestamp": 1_700_000_000.0 + i / 4,
+        "iteration": i,
+        "class_probs": dict(zip(LABELS, values[15:19].tolist())),
+        "class_label": LABELS[i % 4],
+        "reg_output": values[19:23].tolist(),
+        "features": features,
+        "timings": {"pull": 1e-4, "forward": 3e-4},
+    }
+
+
+def measure(store_fn, results):
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = store_fn(results)
+    seconds = time.perf_counter() - start
+    heap = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return store, seconds, heap
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=200_000, help="Results in the session (4/s → 200k ≈ 14 h)")
+    args = parser.parse_args()
+
+    values = np.random.default_rng(0).random((args.results, 23))
+
+    def as_list(n):
+        return [make_result(i, values[i]) for i in range(n)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def as_history(n):
+            history = ResultsHistory(LABELS, memory_rows=4096, spill_dir=tmp)
+            for i in range(n):
+                history.append(make_result(i, values[i]))
+            return history
+
+        _, list_seconds, list_heap = measure(as_list, args.results)
+        history, history_seconds, history_heap = measure(as_history, args.results)
+
+        spilled = sum(f.stat().st_size for f in history.spill_path.iterdir())
+        print(f"{'store':<16} {'heap MB':>8} {'disk MB':>8} {'µs/append':>10}")
+        print(f"{'list of dicts':<16} {list_heap / 1e6:8.1f} {0:8.1f} {list_seconds / args.results * 1e6:10.1f}")
+        print(f"{'ResultsHistory':<16} {history_heap / 1e6:8.1f} {spilled / 1e6:8.1f} "
+              f"{history_seconds / args.results * 1e6:10.1f}")
+        print("(list of dicts: µs/append includes building the result dicts, like ResultsHistory's)")
+
+        for label, start in [("spilled range", args.results // 3), ("newest range", -1000)]:
+            t = time.perf_counter()
+            columns = history.read(start, start + 1000 if start >= 0 else None)
+            ms = (time.perf_counter() - t) * 1e3
+            print(f"read 1000 results, {label:<14} {ms:6.2f} ms ({len(columns)} columns)")
+
+        first = history.rows(0, 1)[0]
+        assert first["iteration"] == 0 and first["class_label"] == LABELS[0]
+
+
+if __name__ == "__main__":
+    main()
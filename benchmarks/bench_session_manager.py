@@ -0,0 +1,86 @@
+"""
+CPU cost of MuseSessionManager as the number of headsets grows.
+
+Replays N synthetic recordings at a fixed speed and reports process CPU time
+per device, the forward batch sizes, and what N independent single-headset
+loops would cost for comparison.
+
+Run from the project root:
+    python benchmarks/bench_session_manager.py [--devices 1 2 4 8] [--seconds 30] [--speed 10]
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Hack to get access to the backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "app" / "backend"))
+from config_loader import load_config
+from muse_streaming import MuseRealtimeInference, load_model
+from replay_board import ReplayBoard, save_recording, synthetic_recording
+from session_manager import MuseSessionManager
+
+
+def run_manager(cfg, model, paths):
+    devices = [{"name": f"muse-{i}", "replay_file": str(p)} for i, p in enumerate(paths)]
+    manager = MuseSessionManager(model, cfg, devices)
+    manager.connect()
+    cpu = time.process_time()
+    n_results = sum(1 for _ in manager.run_generator(cfg.muse.window_seconds, cfg.muse.hop_seconds))
+    return time.process_time() - cpu, n_results, manager.batch_sizes
+
+
+def run_independent(cfg, model, paths):
+    """One MuseRealtimeInference loop per headset, each with its own forward"""
+
+    def consume(path):
+        muse = MuseRealtimeInference(None, model, cfg)
+        muse.connect_replay(ReplayBoard.from_file(path, speed=cfg.muse.replay_speed, loop=False))
+        for _ in muse.run_realtime_inference_generator(cfg.muse.window_seconds, cfg.muse.hop_seconds):
+            pass
+
+    cpu = time.process_time()
+    threads = [threading.Thread(target=consume, args=(p,)) for p in paths]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.process_time() - cpu
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--speed", type=float, default=10.0)
+    args = parser.parse_args()
+
+    cfg = load_config()
+    cfg.muse.replay_speed = args.speed
+    cfg.muse.replay_loop = False
+    model = load_model(cfg)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(max(args.devices)):
+            paths.append(Path(tmp, f"muse-{i}.npz"))
+            save_recording(paths[-1], synthetic_recording(args.seconds, seed=i))
+
+        for n in args.devices:
+            cpu, n_results, batch_sizes = run_manager(cfg, model, paths[:n])
+            cpu_independent = run_independent(cfg, model, paths[:n])
+            rows.append((n, n_results, cpu, cpu_independent, np.mean(batch_sizes)))
+
+    print(f"\n{'devices':>8} {'results':>8} {'manager CPU s':>14} {'independent CPU s':>18} {'mean batch':>11}")
+    for n, n_results, cpu, cpu_independent, mean_batch in rows:
+        print(f"{n:8d} {n_results:8d} {cpu:14.2f} {cpu_independent:18.2f} {mean_batch:11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Cost on the acquisition thread of recording each result: the old per-row
+CSV append (open, format, write, close) vs. SessionRecorder.append(), whose
+Parquet writes happen in a background thread. Reports p50 / p99 / max per
+row, so flushes that stall the caller would show up in the tail.
+
+Run from the project root:
+    python benchmarks/bench_session_recorder.py [--rows 20000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Hack to get access to the backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "app" / "backend"))
+from muse_streaming import MuseRealtimeInference
+from session_recorder import SessionRecorder, result_row
+
+CSV_COLUMNS = [
+    "Delta", "Theta", "Alpha", "Beta", "Gamma", "GyroX", "GyroY", "GyroZ",
+    "AccelX", "AccelY", "AccelZ", "FO-NF", "FO-FA", "UF-NF", "UF-FA", "Label_Class",
+]
+
+
+def make_result(i, rng):
+    features = {name: float(v) for name, v in zip(CSV_COLUMNS[:-1], rng.random(15))}
+    features["Label_Class"] = MuseRealtimeInference.labels[i % 4]
+    return {
+        "timestamp": time.time(),
+        "iteration": i,
+        "class_probs": dict(zip(MuseRealtimeInference.labels, rng.random(4).tolist())),
+        "class_label": features["Label_Class"],
+        "reg_output": rng.random(4).tolist(),
+        "features": features,
+    }
+
+
+def csv_append(path, result):
+    """What run_realtime_inference used to do for every result"""
+    with open(path, "a") as f:
+        f.write(",".join(str(result["features"][k]) for k in CSV_COLUMNS) + "\n")
+
+
+def percentiles(seconds):
+    us = np.asarray(seconds) * 1e6
+    p50, p99 = np.percentile(us, [50, 99])
+    return f"{p50:8.1f} {p99:8.1f} {us.max():9.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = [make_result(i, rng) for i in range(args.rows)]
+    labels = MuseRealtimeInference.labels
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp, "realtime_inference.csv")
+        csv_times = []
+        for result in results:
+            start = time.perf_counter()
+            csv_append(csv_path, result)
+            csv_times.append(time.perf_counter() - start)
+
+        recorder = SessionRecorder(tmp, flush_rows=256, flush_seconds=5.0).start()
+        recorder_times = []
+        for result in results:
+            start = time.perf_counter()
+            recorder.append(result_row(result, labels))
+            recorder_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        recorder.close()
+        close_seconds = time.perf_counter() - start
+
+        n_read = len(pd.read_parquet(recorder.path))
+
+    print(f"{'per row (µs)':<28} {'p50':>8} {'p99':>8} {'max':>9}")
+    print(f"{'CSV open + append':<28} {percentiles(csv_times)}")
+    print(f"{'SessionRecorder.append':<28} {percentiles(recorder_times)}")
+    print(f"\n{recorder.parts_written} parts, {n_read}/{args.rows} rows read back, "
+          f"close() {close_seconds * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
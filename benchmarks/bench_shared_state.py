@@ -0,0 +1,108 @@
+"""
+Shared result snapshot vs. the multiprocessing Manager dict proxy.
+
+For each backend: latency of publishing one result (the old code did four
+`d[key] = value` round trips), latency of a reader taking a copy, and how
+many torn reads (fields from different results) a concurrent reader sees.
+
+Run from the project root:
+    python benchmarks/bench_shared_state.py
+"""
+import multiprocessing as mp
+import sys
+import time
+import timeit
+from pathlib import Path
+
+# Hack to get access to the backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "app" / "backend"))
+from shared_state import ResultSnapshot, SharedMemorySnapshot, publish
+
+FIELDS = ("class_label", "probabilities", "reg_output", "timestamp")
+
+
+def make_result(i):
+    return {
+        "class_label": f"label-{i}",
+        "probabilities": {"a": i, "b": i, "c": i, "d": i},
+        "reg_output": [i, i, i, i],
+        "timestamp": i,
+    }
+
+
+def publish_per_key(target, result):
+    """What start_muse_inference used to do"""
+    for key in FIELDS:
+        target[key] = result[key]
+
+
+def read_copy(target):
+    return target.read() if hasattr(target, "read") else dict(target)
+
+
+def is_torn(result):
+    i = result["timestamp"]
+    return (
+        result["class_label"] != f"label-{i}"
+        or result["reg_output"] != [i, i, i, i]
+        or result["probabilities"]["a"] != i
+    )
+
+
+def writer(target, publish_fn, stop):
+    i = 0
+    while not stop.is_set():
+        i += 1
+        publish_fn(target, make_result(i))
+
+
+def count_torn_reads(target, publish_fn, n_reads=2000):
+    """Writer in another process (or thread for ResultSnapshot), reads here"""
+    stop = mp.Event()
+    use_thread = isinstance(target, ResultSnapshot)
+    if use_thread:
+        import threading
+
+        stop = threading.Event()
+        worker = threading.Thread(target=writer, args=(target, publish_fn, stop))
+    else:
+        worker = mp.Process(target=writer, args=(target, publish_fn, stop))
+    worker.start()
+    time.sleep(0.2)
+
+    torn = sum(is_torn(read_copy(target)) for _ in range(n_reads))
+    stop.set()
+    worker.join()
+    return torn
+
+
+def bench(label, fn, number):
+    best = min(timeit.repeat(fn, repeat=5, number=number)) / number
+    return best * 1e6
+
+
+def main():
+    manager = mp.Manager()
+    backends = [
+        ("Manager dict, 4 x setitem", manager.dict(make_result(0)), publish_per_key),
+        ("Manager dict, update()", manager.dict(make_result(0)), publish),
+        ("ResultSnapshot (in-process)", ResultSnapshot(make_result(0)), publish),
+        ("SharedMemorySnapshot", SharedMemorySnapshot(initial=make_result(0)), publish),
+    ]
+
+    print(f"{'backend':<30} {'publish µs':>11} {'read µs':>9} {'torn reads':>11}")
+    for label, target, publish_fn in backends:
+        number = 200 if "Manager" in label else 20_000
+        result = make_result(1)
+        t_publish = bench(label, lambda: publish_fn(target, result), number)
+        t_read = bench(label, lambda: read_copy(target), number)
+        torn = count_torn_reads(target, publish_fn)
+        print(f"{label:<30} {t_publish:11.1f} {t_read:9.1f} {torn:8d}/2000")
+
+    backends[3][1].close()
+    manager.shutdown()
+
+
+if __name__ == "__main__":
+    main()
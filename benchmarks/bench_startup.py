@@ -0,0 +1,110 @@
+"""
+Cold-start benchmark: how long until the backend is up and the first
+prediction is out.
+
+- import time of api_server and muse_streaming, each in a fresh interpreter
+- load_model() with the converted weights cache cold (first start) and warm
+- time to the first result when replaying at real time (speed 1.0), in burst
+  mode and in sliding-window mode, next to the fixed warm-up the loop used to
+  wait (two bursts plus one, or one full window)
+
+Run from the project root:
+    python benchmarks/bench_startup.py [--repeat 3]
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Hack to get access to the backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "app" / "backend"))
+
+BACKEND = project_root / "app" / "backend"
+
+IMPORT_SNIPPET = """
+import sys, time
+sys.path.insert(0, {backend!r})
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+LOAD_SNIPPET = """
+import sys, time
+sys.path.insert(0, {backend!r})
+from config_loader import load_config
+from muse_streaming import load_model
+cfg = load_config(overrides=["inference.model_cache_dir={cache_dir}"])
+start = time.perf_counter()
+load_model(cfg)
+print(time.perf_counter() - start)
+"""
+
+
+def run_snippet(snippet: str) -> float:
+    """Seconds printed on the last line of a fresh interpreter running `snippet`"""
+    out = subprocess.run(
+        [sys.executable, "-c", snippet], cwd=project_root, capture_output=True, text=True, check=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def first_result_seconds(cfg, model, hop_duration) -> float:
+    """Wall time from starting the stream to the first result, replaying at speed 1.0"""
+    from muse_streaming import MuseRealtimeInference
+    from replay_board import ReplayBoard
+
+    muse = MuseRealtimeInference(con_port=None, model=model, cfg=cfg)
+    muse.connect_replay(ReplayBoard.from_synthetic(seconds=30.0, speed=1.0))
+    start = time.perf_counter()
+    results = muse.run_realtime_inference_generator(
+        burst_duration=cfg.muse.window_seconds, hop_duration=hop_duration
+    )
+    next(results)
+    seconds = time.perf_counter() - start
+    results.close()
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (median reported)")
+    args = parser.parse_args()
+
+    print(f"{'measurement':<36} {'median s':>9}")
+    for module in ["api_server", "muse_streaming"]:
+        snippet = IMPORT_SNIPPET.format(backend=str(BACKEND), module=module)
+        seconds = [run_snippet(snippet) for _ in range(args.repeat)]
+        print(f"{'import ' + module:<36} {np.median(seconds):9.3f}")
+
+    cold, warm = [], []
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            snippet = LOAD_SNIPPET.format(backend=str(BACKEND), cache_dir=cache_dir)
+            cold.append(run_snippet(snippet))
+            warm.append(run_snippet(snippet))
+    print(f"{'load_model, cache cold':<36} {np.median(cold):9.3f}")
+    print(f"{'load_model, cache warm':<36} {np.median(warm):9.3f}")
+
+    from config_loader import load_config
+    from muse_streaming import load_model
+
+    cfg = load_config()
+    model = load_model(cfg)
+    window = cfg.muse.window_seconds
+    hop = cfg.muse.hop_seconds or 0.25
+    for mode, hop_duration, fixed in [
+        ("burst", None, window * 3),
+        ("sliding window", hop, window),
+    ]:
+        seconds = [first_result_seconds(cfg, model, hop_duration) for _ in range(args.repeat)]
+        print(f"{'first result, ' + mode:<36} {np.median(seconds):9.3f}  (fixed warm-up was {fixed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,6 @@ from brainflow.board_shim import (
     BoardIds,
     BrainFlowPresets,
 )
-from brainflow.data_filter import (
-    DataFilter,
-    FilterTypes,
-    WindowOperations,
-    DetrendOperations,
-)
 from matplotlib import pyplot as plt
 import numpy as np
 import pandas as pd
@@ -18,6 +12,13 @@ from pprint import pprint
 from pathlib import Path
 import hydra
 from omegaconf import DictConfig
+import sys
+
+# Hack to share the backend signal processing with the recorder
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "app" / "backend"))
+from bandpower import BAND_NAMES
+from preprocessing import PreprocessingPipeline
 
 
 class MuseBoard:
@@ -25,8 +26,10 @@ class MuseBoard:
     boardId = 38
     con_port: str
 
-    def __init__(self, con_port):
+    def __init__(self, con_port, preprocessing_cfg=None):
         self.con_port = con_port
+        self.preprocessing_cfg = preprocessing_cfg  # muse.preprocessing
+        self.pipeline = None
 
     def connect_muse(self):
         try:
@@ -42,7 +45,7 @@ class MuseBoard:
         """
         Collects EEG + AUX data from Muse 2 and performs full post-processing.
 
-        Includes:
+        Includes (see app/backend/preprocessing.py):
             - Filtering (bandpass, notch)
             - Artifact rejection (amplitude + motion)
             - Bandpower extraction in overlapping windows
@@ -67,119 +70,34 @@ class MuseBoard:
             print("❌ No data was recorded, returning early")
             return pd.DataFrame()
 
-        if eeg_data.shape[1] < 16:
-            print(f"❌ Insufficient data: {eeg_data.shape[1]} samples (need >= {16})")
-            return pd.DataFrame()
-
-        if aux_data.shape[0] >= 6:
-            accel_data = aux_data[0:3, :]
-            gyro_data = aux_data[3:6, :]
-            gyro_mean = np.mean(gyro_data, axis=1)
-            accel_mean = np.mean(accel_data, axis=1)
-        else:
-            gyro_mean = [0, 0, 0]
-            accel_mean = [0, 0, 0]
-
         # POST PROCESSING
-        # --- 🧹 Step 1: Clean EEG (Filtering) ---
-        # Removes drift, muscle noise, and powerline hum
-        sampling_rate = self.board.get_sampling_rate(self.boardId)
-        eeg_data = np.ascontiguousarray(eeg_data)
-
-        for ch in range(eeg_data.shape[0]):
-            DataFilter.detrend(eeg_data[ch], DetrendOperations.CONSTANT.value)
-            DataFilter.perform_bandpass(
-                eeg_data[ch],
-                sampling_rate,
-                1.0,
-                50.0,
-                2,
-                FilterTypes.BUTTERWORTH.value,
-                0,
-            )  # Keep brainwave frequencies only
-            DataFilter.perform_bandstop(
-                eeg_data[ch],
-                sampling_rate,
-                58.0,
-                62.0,
-                2,
-                FilterTypes.BUTTERWORTH.value,
-                0,
-            )  # Remove 60 Hz noise (North America)
-            DataFilter.perform_bandstop(
-                eeg_data[ch],
-                sampling_rate,
-                48.0,
-                52.0,
-                2,
-                FilterTypes.BUTTERWORTH.value,
-                0,
-            )  # Remove 50 Hz noise (Europe)
-
-        # --- ⚠️ Step 2: Artifact Rejection (Eye Blinks / Spikes) ---
-        # Eye blinks can cause 100–300 µV spikes; remove extreme samples
-        amplitude_mask = np.all(np.abs(eeg_data) < 100.0, axis=0)
-        eeg_data = eeg_data[:, amplitude_mask]
-
-        # Optional: remove top 5% variance windows
-        std_per_sample = np.std(eeg_data, axis=0)
-        mask_std = std_per_sample < np.percentile(std_per_sample, 95)
-        eeg_data = eeg_data[:, mask_std]
-
-        # --- 🚫 Step 3: Reject motion-contaminated data ---
-        # accel_data shape: (3, n_samples)
-        accel_magnitude = np.linalg.norm(
-            accel_data, axis=0
-        )  # total acceleration each sample
-        delta_accel = np.diff(accel_magnitude)  # change in acceleration
-        motion_score = np.mean(np.abs(delta_accel))  # average absolute change
-        if motion_score > 0.5:  # Adjust threshold if too sensitive
-            print("⚠️  High motion detected — skipping this segment.")
-            return pd.DataFrame()  # return empty, skip recording
-
-        # --- 🪟 Step 4: Rolling Bandpower Extraction ---
-        n_samples = eeg_data.shape[1]
-        win_len = int(window_size_sec * sampling_rate)
-        step = int(win_len * (1 - overlap))  # step size in samples
-
-        rows = []
-        for start in range(0, n_samples - win_len + 1, step):
-            end = start + win_len
-            window = eeg_data[:, start:end]
-
-            # ⚙️ Ensure contiguous memory and even-length inside each window too
-            if window.shape[1] % 2 == 1:
-                window = window[:, :-1]
-            window = np.ascontiguousarray(window)
-
-            # --- Compute average band powers ---
-            # Returns mean bandpower per frequency band across channels
-            avgs, stds = DataFilter.get_avg_band_powers(
-                window,
-                channels=np.arange(window.shape[0]),
-                sampling_rate=sampling_rate,
-                apply_filter=False,
+        # Filtering → amplitude rejection → motion rejection → rolling bandpower,
+        # shared with live inference so training features match exactly
+        if self.pipeline is None:
+            self.pipeline = PreprocessingPipeline(
+                self.board.get_sampling_rate(self.boardId),
+                settings=self.preprocessing_cfg,
+                streaming=False,  # 90 s blocks are separated by labelling pauses
             )
 
-            rows.append(
-                {
-                    "timestamp": pd.Timestamp.now(),
-                    "Delta": avgs[0],
-                    "Theta": avgs[1],
-                    "Alpha": avgs[2],
-                    "Beta": avgs[3],
-                    "Gamma": avgs[4],
-                    "GyroX": gyro_mean[0],
-                    "GyroY": gyro_mean[1],
-                    "GyroZ": gyro_mean[2],
-                    "AccelX": accel_mean[0],
-                    "AccelY": accel_mean[1],
-                    "AccelZ": accel_mean[2],
-                }
-            )
+        burst = self.pipeline.run(
+            eeg_data, aux_data, window_seconds=window_size_sec, overlap=overlap
+        )
+        if burst is None:
+            return pd.DataFrame()  # return empty, skip recording
 
-        # Convert to DataFrame
-        df = pd.DataFrame(rows)
+        gyro_mean = burst["gyro_mean"]
+        accel_mean = burst["accel_mean"]
+
+        # Mean bandpower per frequency band across channels, one row per window
+        df = pd.DataFrame(burst["band_powers"], columns=BAND_NAMES)
+        df.insert(0, "timestamp", pd.Timestamp.now())
+        df["GyroX"] = gyro_mean[0]
+        df["GyroY"] = gyro_mean[1]
+        df["GyroZ"] = gyro_mean[2]
+        df["AccelX"] = accel_mean[0]
+        df["AccelY"] = accel_mean[1]
+        df["AccelZ"] = accel_mean[2]
         return df
 
     def start_muse_stream(self):
@@ -268,7 +186,7 @@ def main(cfg: DictConfig):
 
     # Attempt to connect to use
     com_port_path = cfg.muse.com_port  # "/dev/ttyACM0"  # Or COM7
-    board = MuseBoard(com_port_path)
+    board = MuseBoard(com_port_path, cfg.muse.get("preprocessing"))
     conn_status = False
     while not conn_status:
         try:
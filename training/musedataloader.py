@@ -1,3 +1,9 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
 import torch
 from torch.utils.data import Dataset, DataLoader
 import pandas as pd
@@ -6,61 +12,176 @@ from pathlib import Path
 from omegaconf import DictConfig
 
 
+def session_windows(reg_data, class_labels, window_size: int, step_size: int):
+    """
+    Windows of one session with array ops: start rows from arange, window-mean
+    regression targets from a cumulative sum (float64, so long sessions
+    keep their precision), class targets (last label of each window) by
+    fancy indexing.
+
+    Returns:
+        starts (n,) int64, reg (n, n_outputs) float32, labels (n,) int64
+    """
+    starts = np.arange(0, max(len(reg_data) - window_size, 0), step_size, dtype=np.int64)
+    cumsum = np.zeros((len(reg_data) + 1, reg_data.shape[1]), dtype=np.float64)
+    np.cumsum(reg_data, axis=0, dtype=np.float64, out=cumsum[1:])
+    reg = ((cumsum[starts + window_size] - cumsum[starts]) / window_size).astype(np.float32)
+    return starts, reg, class_labels[starts + window_size - 1].astype(np.int64)
+
+
 class MuseEEGDataset(Dataset):
+    """
+    Overlapping windows of every session parquet in `data_dir`.
+
+    The windows are built once into contiguous .npy files in
+    `cache_dir/<key>/`, where the key hashes the source files (path, size,
+    mtime) and the window config:
+
+        data.npy     (n_rows, n_channels) float32, every session back to back
+        starts.npy   (n_windows,) int64, first row of each window in data
+        session.npy  (n_windows,) int32, index of the window's file in `files`
+        reg.npy      (n_windows, n_outputs) float32, window-mean regression targets
+        labels.npy   (n_windows,) int64, class label of each window's last row
+
+    Later constructions with the same files and config only open them
+    memory-mapped, and __getitem__ returns windows as strided views of the
+    mapping, so DataLoader workers share the page cache instead of each
+    holding a copy. Without a cache_dir the same arrays are built in memory.
+    """
+
     def __init__(
         self, data_dir, labels, channel_labels, regression_targets, window_size=512, step_size=256, transform=None,
+        cache_dir=None,
     ):
         self.data_dir = data_dir
         self.labels = labels
         self.window_size = window_size
         self.step_size = step_size
         self.transform = transform
-        self.samples = []
         self.regression_targets = regression_targets
         self.channel_labels = channel_labels
-        self.sessions = {}
-
-        # Get parquet files of each session
-        for file_path in Path(self.data_dir).glob("*.parquet"):
-            df = pd.read_parquet(file_path)
-            
-            data = df[self.channel_labels].to_numpy(dtype=np.float32)
-            reg_data = df[self.regression_targets].to_numpy(dtype=np.float32)
-            class_labels = df["Label_Class"].to_numpy(dtype=np.int64)
-            self.sessions[file_path] = data
-            print(f"Loaded {len(df)} rows from {file_path}")
+        self.cache_dir = cache_dir
+
+        files = sorted(Path(self.data_dir).glob("*.parquet"))
+        self.files = files
+        if cache_dir is None:
+            self.cache_path = None
+            self._arrays = self._build(files)
+        else:
+            self.cache_path = Path(cache_dir) / self._cache_key(files)
+            if not self.cache_path.exists():
+                self._write_cache(self._build(files))
+            self._arrays = None  # Opened on first use, in each worker
 
-            # Create overlapping windows
-            for start in range(0, len(data) - window_size, step_size):
-                end = start + window_size
+    def __len__(self):
+        return len(self.arrays["starts"])
 
-                # Use the mean target values over the window
-                reg_target = np.mean(reg_data[start:end], axis=0).astype(np.float32)
-                class_target = int(class_labels[end - 1])  # last label in window
+    def __getitem__(self, idx):
+        arrays = self.arrays
+        start = arrays["starts"][idx]
+        x = arrays["data"][start : start + self.window_size]
+        x = torch.from_numpy(x.T)  # (n_channels, window_size) view, no copy
 
-                self.samples.append((file_path, start, end, reg_target, class_target))
+        # Classification label
+        y_class = torch.tensor(arrays["labels"][idx], dtype=torch.long)
 
+        # Mean of the continuous labels over the window
+        y_reg = torch.from_numpy(arrays["reg"][idx])
 
+        return x, (y_class, y_reg)
 
-    def __len__(self):
-        return len(self.samples)
+    @property
+    def arrays(self) -> dict:
+        if self._arrays is None:
+            # Copy-on-write: writable for torch, pages shared until written
+            self._arrays = {
+                name: self._load(self.cache_path / f"{name}.npy")
+                for name in ("data", "starts", "session", "reg", "labels")
+            }
+        return self._arrays
+
+    @staticmethod
+    def _load(path):
+        try:
+            return np.load(path, mmap_mode="c")
+        except ValueError:
+            return np.load(path)  # Empty arrays can't be mapped
+
+    def __getstate__(self):
+        # Workers reopen the memory map instead of receiving a pickled copy
+        state = self.__dict__.copy()
+        if self.cache_path is not None:
+            state["_arrays"] = None
+        return state
+
+    def _cache_key(self, files) -> str:
+        key = {
+            "layout": 2,  # Bump when the cached arrays change
+            "files": [
+                (str(path.resolve()), path.stat().st_size, path.stat().st_mtime_ns)
+                for path in files
+            ],
+            "channel_labels": list(self.channel_labels),
+            "regression_targets": list(self.regression_targets),
+            "window_size": self.window_size,
+            "step_size": self.step_size,
+        }
+        return hashlib.sha1(json.dumps(key).encode()).hexdigest()[:16]
+
+    def _build(self, files) -> dict:
+        """Reads every session and computes its windows"""
+        data, starts, session_ids, reg, labels = [], [], [], [], []
+        offset = 0
+        for session_id, file_path in enumerate(files):
+            df = pd.read_parquet(file_path)
 
-    def __getitem__(self, idx):
-        session_path, start, end, reg_target, class_target = self.samples[idx]
-        data = self.sessions[session_path]
-        x = data[start:end]
-        x = torch.from_numpy(x).float().T  # (4, 512)
+            session = df[self.channel_labels].to_numpy(dtype=np.float32)
+            reg_data = df[self.regression_targets].to_numpy(dtype=np.float32)
+            class_labels = df["Label_Class"].to_numpy(dtype=np.int64)
+            print(f"Loaded {len(df)} rows from {file_path}")
 
-        # Classification label
-        # y_class = torch.tensor(label_id, dtype=torch.long)
-        y_class = torch.tensor(class_target, dtype=torch.long)
-        
-        # Regression target TODO (replace this with your actual continuous label data)
-        # e.g. normalized focus/unfocus/fatigue levels in [0, 1]
-        # y_reg = torch.rand(11, dtype=torch.float32)
-        y_reg = torch.tensor(reg_target, dtype=torch.float32)  # shape (3,)
-        
-        return x, (y_class, y_reg)
+            # Overlapping windows, never crossing into the next session
+            session_starts, session_reg, session_labels = session_windows(
+                reg_data, class_labels, self.window_size, self.step_size
+            )
+            starts.append(session_starts + offset)
+            session_ids.append(np.full(len(session_starts), session_id, dtype=np.int32))
+            reg.append(session_reg)
+            labels.append(session_labels)
+
+            data.append(session)
+            offset += len(session)
+
+        n_channels, n_outputs = len(self.channel_labels), len(self.regression_targets)
+        if not data:
+            return {
+                "data": np.empty((0, n_channels), np.float32),
+                "starts": np.empty(0, np.int64),
+                "session": np.empty(0, np.int32),
+                "reg": np.empty((0, n_outputs), np.float32),
+                "labels": np.empty(0, np.int64),
+            }
+        return {
+            "data": np.concatenate(data),
+            "starts": np.concatenate(starts),
+            "session": np.concatenate(session_ids),
+            "reg": np.concatenate(reg),
+            "labels": np.concatenate(labels),
+        }
+
+    def _write_cache(self, arrays: dict):
+        """Writes the arrays to a temporary directory and renames it into place"""
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_path.parent))
+        try:
+            for name, array in arrays.items():
+                np.save(tmp / f"{name}.npy", np.ascontiguousarray(array))
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not self.cache_path.exists():  # Not just another process winning the race
+                raise
+        print(f"Cached {len(arrays['starts'])} windows in {self.cache_path}")
 
 
 
@@ -1,3 +1,9 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
@@ -18,6 +24,55 @@ class MultiTaskEEGModel(nn.Module):
         self.fc_class = nn.Linear(hidden_dims[1], n_classes)
         self.fc_reg = nn.Linear(hidden_dims[1], n_outputs)
 
+    @classmethod
+    def load(cls, path, map_location="cpu", cache_dir=None, **kwargs):
+        """
+        Model built with `kwargs` (n_channels, hidden_dims, ...) with the
+        weights saved by train.py (with or without the Lightning "model."
+        prefix), in eval mode.
+
+        With `cache_dir`, the converted weights (renamed keys, exactly this
+        model's state dict) are saved there once, keyed by the weights file
+        and kwargs, and later loads memory-map that copy instead.
+        """
+        model = cls(**kwargs)
+        cached = None
+        if cache_dir is not None:
+            cached = cls._artifact_path(path, cache_dir, kwargs)
+            if cached.exists():
+                state_dict = torch.load(cached, map_location=map_location, mmap=True, weights_only=True)
+                model.load_state_dict(state_dict)
+                return model.eval()
+
+        state_dict = torch.load(path, map_location=map_location)
+        model.load_state_dict({k.replace("model.", ""): v for k, v in state_dict.items()})
+
+        if cached is not None:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            # Unique temp file per process, renamed into place: concurrent
+            # starts never see (or write into) a partial file
+            fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".pt", dir=cached.parent)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    torch.save(model.state_dict(), f)
+                os.replace(tmp, cached)
+            except OSError:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        return model.eval()
+
+    @staticmethod
+    def _artifact_path(path, cache_dir, kwargs) -> Path:
+        """Cache file for these weights (changes whenever the file or kwargs change)"""
+        stat = Path(path).stat()
+        key = json.dumps(
+            [str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns, kwargs],
+            sort_keys=True,
+            default=list,
+        )
+        digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+        return Path(cache_dir) / f"{Path(path).stem}-{digest}.pt"
+
     def forward(self, x):
         # Shared encoding
         x = self.relu(self.bn1(self.conv1(x)))
@@ -29,3 +84,42 @@ class MultiTaskEEGModel(nn.Module):
         reg_outputs = self.fc_reg(x)
 
         return class_logits, reg_outputs
+
+    def forward_constant(self, features, n_samples):
+        """
+        Same output as forward() on an input whose every time step equals
+        `features` (B, n_channels), without building the (B, n_channels, n_samples)
+        tensor. Cost does not depend on n_samples. Eval mode only, since
+        BatchNorm must use its running statistics.
+
+        n_samples is an int shared by the batch, or one length per row (B,),
+        so windows of different lengths can go through a single call.
+        """
+        # Only time steps within `edge` of either end see the zero padding
+        edge = self.conv1.padding[0] + self.conv2.padding[0]
+        length = 2 * edge + 1
+        if isinstance(n_samples, int):
+            x = features.unsqueeze(-1).expand(-1, -1, min(length, n_samples))
+            if n_samples <= length:
+                return self.forward(x)
+        else:
+            n_samples = torch.as_tensor(n_samples, dtype=features.dtype).reshape(-1, 1)
+            if (n_samples <= length).any():
+                # Rare very short windows: no interior to pool, run rows one by one
+                outputs = [
+                    self.forward_constant(features[i : i + 1], int(n))
+                    for i, n in enumerate(n_samples.flatten())
+                ]
+                return tuple(torch.cat(parts) for parts in zip(*outputs))
+            x = features.unsqueeze(-1).expand(-1, -1, length)
+
+        x = self.relu(self.bn1(self.conv1(x)))
+        x = self.relu(self.bn2(self.conv2(x)))  # (B, hidden_dims[1], length)
+
+        # Every interior step equals the centre one, so pool analytically
+        x = (x.sum(-1) + (n_samples - length) * x[..., edge]) / n_samples
+
+        class_logits = self.fc_class(x)
+        reg_outputs = self.fc_reg(x)
+
+        return class_logits, reg_outputs
@@ -0,0 +1,203 @@
+"""
+Batch-scores recorded sessions with a trained MultiTaskEEGModel.
+
+Every data/session_*_muse2_data.parquet is cut into the same windows as
+MuseEEGDataset (window_size rows every step_size rows, class target = last
+label of the window, regression targets = window mean), all windows of a
+session go through the model in large batched forwards, and the files are
+split across a process pool. Writes, per session, the predictions next to
+their targets, and a summary.json with accuracy / MAE per session and
+overall.
+
+Run from the project root:
+    python training/score_sessions.py [--workers 4] [--output data/scores/run]
+        [hydra overrides, e.g. inference.model_filepath=models/models/x.pt]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Hack to get access to the project and backend modules
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "app" / "backend"))
+from config_loader import load_config
+from training.musedataloader import session_windows
+from training.networks import MultiTaskEEGModel
+
+# Set in each worker by _init_worker
+_model = None
+_settings = None
+
+
+def window_session(df: pd.DataFrame, channel_labels, reg_targets, window_size: int, step_size: int):
+    """
+    All MuseEEGDataset windows of one session at once.
+
+    Returns:
+        starts (n,), windows, class_targets (n,) int64,
+        reg_targets (n, n_outputs) float32
+
+    `windows` is a strided view of the session with a window starting at
+    every row, (n_rows - window_size + 1, n_channels, window_size) float32:
+    windows[starts] are the dataset's windows, copied one batch at a time
+    by score_windows.
+    """
+    data = df[channel_labels].to_numpy(dtype=np.float32)
+    starts, reg, class_targets = session_windows(
+        df[reg_targets].to_numpy(dtype=np.float32),
+        df["Label_Class"].to_numpy(dtype=np.int64),
+        window_size,
+        step_size,
+    )
+    if len(starts) == 0:
+        return starts, np.empty((0, len(channel_labels), window_size), np.float32), class_targets, reg
+
+    windows = sliding_window_view(data, window_size, axis=0)
+    return starts, windows, class_targets, reg
+
+
+def score_windows(model, windows: np.ndarray, starts: np.ndarray, batch_size: int):
+    """
+    Class probabilities and regression outputs for windows[starts], where
+    windows is (n, n_channels, window); only one batch is copied at a time
+    """
+    probs, reg = [], []
+    with torch.no_grad():
+        for b in range(0, len(starts), batch_size):
+            batch = torch.from_numpy(np.ascontiguousarray(windows[starts[b : b + batch_size]]))
+            class_out, reg_out = model(batch)
+            probs.append(torch.softmax(class_out, dim=1).numpy())
+            reg.append(reg_out.numpy())
+    return np.concatenate(probs), np.concatenate(reg)
+
+
+def _init_worker(model_path, model_kwargs, settings):
+    global _model, _settings
+    torch.set_num_threads(1)  # One process per core already
+    _model = MultiTaskEEGModel.load(model_path, **model_kwargs)
+    _settings = settings
+
+
+def score_session(path: str):
+    """Scores one session file in a worker: (predictions DataFrame, metrics dict)"""
+    s = _settings
+    starts, windows, class_targets, reg_targets = window_session(
+        pd.read_parquet(path), s["channel_labels"], s["reg_targets"], s["window_size"], s["step_size"]
+    )
+    n_outputs = len(s["reg_targets"])
+    if len(starts):
+        probs, reg = score_windows(_model, windows, starts, s["batch_size"])
+    else:
+        probs = np.empty((0, len(s["labels"])), np.float32)
+        reg = np.empty((0, n_outputs), np.float32)
+    predicted = probs.argmax(axis=1)
+
+    predictions = pd.DataFrame({"start": starts, "Label_Class": class_targets, "predicted": predicted})
+    for i, label in enumerate(s["labels"]):
+        predictions[f"p_{label}"] = probs[:, i]
+    for i, target in enumerate(s["reg_targets"]):
+        predictions[target] = reg_targets[:, i]
+        predictions[f"pred_{target}"] = reg[:, i]
+
+    abs_error = np.abs(reg - reg_targets)
+    metrics = {
+        "windows": int(len(starts)),
+        "correct": int((predicted == class_targets).sum()),
+        "abs_error_sum": abs_error.sum(axis=0).tolist(),
+    }
+    return predictions, metrics
+
+
+def summarize(metrics: dict, reg_targets) -> dict:
+    """accuracy / MAE from the sums returned by score_session"""
+    n = metrics["windows"]
+    mae = [e / n if n else None for e in metrics["abs_error_sum"]]
+    return {
+        "windows": n,
+        "accuracy": metrics["correct"] / n if n else None,
+        "mae": dict(zip(reg_targets, mae)),
+        "mae_mean": float(np.mean(mae)) if n else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", help="Directory of session parquet files (default: system.data_filepath)")
+    parser.add_argument("--pattern", default="session_*_muse2_data.parquet")
+    parser.add_argument("--output", help="Output directory (default: data/scores/<model name>)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes (1 = score in this process)")
+    parser.add_argument("--batch-size", type=int, default=8192, help="Windows per forward")
+    parser.add_argument("overrides", nargs="*", help="Hydra config overrides")
+    args = parser.parse_args()
+
+    cfg = load_config(overrides=args.overrides)
+    data_dir = Path(args.data_dir or project_root / cfg.system.data_filepath)
+    files = sorted(data_dir.glob(args.pattern))
+    if not files:
+        print(f"❌ No {args.pattern} in {data_dir}")
+        return
+
+    model_path = Path(cfg.inference.model_filepath)
+    output = Path(args.output or project_root / "data" / "scores" / model_path.stem)
+    output.mkdir(parents=True, exist_ok=True)
+
+    model_kwargs = dict(
+        n_channels=cfg.model.n_channels,
+        hidden_dims=list(cfg.model.hidden_dims),
+        n_classes=cfg.model.n_classes,
+        n_outputs=cfg.model.n_outputs,
+    )
+    settings = {
+        "labels": list(cfg.model.labels),
+        "channel_labels": list(cfg.model.channel_labels),
+        "reg_targets": list(cfg.model.reg_targets),
+        "window_size": cfg.train.window_size,
+        "step_size": cfg.train.step_size,
+        "batch_size": args.batch_size,
+    }
+
+    start = time.perf_counter()
+    workers = max(1, min(args.workers or 1, len(files)))
+    if workers == 1:
+        _init_worker(model_path, model_kwargs, settings)
+        results = map(score_session, map(str, files))
+    else:
+        pool = ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(model_path, model_kwargs, settings)
+        )
+        results = pool.map(score_session, map(str, files))
+
+    summary = {"model": str(model_path), "sessions": {}}
+    total = {"windows": 0, "correct": 0, "abs_error_sum": [0.0] * len(settings["reg_targets"])}
+    for path, (predictions, metrics) in zip(files, results):
+        predictions.to_parquet(output / f"{path.stem}_predictions.parquet", index=False)
+        summary["sessions"][path.stem] = summarize(metrics, settings["reg_targets"])
+        total["windows"] += metrics["windows"]
+        total["correct"] += metrics["correct"]
+        total["abs_error_sum"] = [a + b for a, b in zip(total["abs_error_sum"], metrics["abs_error_sum"])]
+    if workers > 1:
+        pool.shutdown()
+    summary["overall"] = summarize(total, settings["reg_targets"])
+    seconds = time.perf_counter() - start
+
+    (output / "summary.json").write_text(json.dumps(summary, indent=2))
+    for name, s in {**summary["sessions"], "overall": summary["overall"]}.items():
+        if s["windows"]:
+            print(f"{name:<28} {s['windows']:8d} windows  accuracy {s['accuracy']:.3f}  MAE {s['mae_mean']:.4f}")
+        else:
+            print(f"{name:<28} {0:8d} windows")
+    print(f"\n✅ Scored {len(files)} sessions with {workers} workers in {seconds:.2f}s → {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,11 @@ def main(cfg: DictConfig):
         regression_targets=cfg.model.reg_targets,
         window_size=cfg.train.window_size,
         step_size=cfg.train.step_size,
+        cache_dir=(
+            Path(get_original_cwd(), cfg.system.window_cache_filepath)
+            if cfg.system.get("window_cache_filepath")
+            else None
+        ),
     )
 
     train_dataset, val_dataset = random_split(dataset, [0.8, 0.2])